@@ -0,0 +1,60 @@
+"""Correlação vetorizada de vários anos contra ``DataFrame.corr`` ano a ano."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from healthdata.correlation import CORRELATION_COLS, METHODS, correlate
+
+pytest.importorskip("pytest_benchmark")
+
+ROWS = 180
+YEARS = 4
+MISSING = 0.02  # fração de células ausentes (NaN)
+RESAMPLES = 500
+
+
+def synthetic(rows: int, years: int, missing: float = 0.0, seed: int = 0) -> dict[int, pd.DataFrame]:
+    """Anos com ``rows`` linhas; uma fração ``missing`` das células vira NaN."""
+    rng = np.random.default_rng(seed)
+    cols = list(CORRELATION_COLS)
+    frames = {}
+    for year in range(2021, 2021 + years):
+        data = rng.normal(size=(rows, len(cols)))
+        data[:, -1] += 0.5 * data[:, -2]  # eficiência correlacionada com produtividade
+        data[rng.random(data.shape) < missing] = np.nan
+        frames[year] = pd.DataFrame(data, columns=cols)
+    return frames
+
+
+@pytest.fixture(scope="module")
+def frames() -> dict[int, pd.DataFrame]:
+    return synthetic(ROWS, YEARS, MISSING)
+
+
+@pytest.mark.benchmark(group="correlation")
+@pytest.mark.parametrize("method", METHODS)
+def test_dataframe_corr(benchmark, frames, method):
+    benchmark(lambda: {year: df.corr(method=method) for year, df in frames.items()})
+
+
+@pytest.mark.benchmark(group="correlation")
+@pytest.mark.parametrize("method", METHODS)
+def test_batched(benchmark, frames, method):
+    result = benchmark(correlate, frames, method=method)
+    for year, df in frames.items():
+        np.testing.assert_allclose(result.matrix(year).to_numpy(), df.corr(method=method).to_numpy(), atol=1e-12)
+
+
+@pytest.mark.benchmark(group="correlation-resampling")
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("resampling", ["n_boot", "n_perm"])
+def test_resampling(benchmark, frames, method, resampling):
+    result = benchmark.pedantic(
+        correlate, args=(frames,), kwargs={"method": method, resampling: RESAMPLES, "seed": 0}, rounds=3
+    )
+    table = result.to_frame()
+    if resampling == "n_boot":
+        assert ((table["ci_low"] <= table["r"]) & (table["r"] <= table["ci_high"])).all()
+    else:
+        productivity = table[(table["x"] == "productivity") & (table["y"] == "efficiency")]
+        assert (productivity["p_values"] <= 1 / (RESAMPLES + 1) + 1e-12).all()
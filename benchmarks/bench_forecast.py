@@ -0,0 +1,96 @@
+"""Ajuste vetorizado dos modelos de previsão contra um laço por cidade."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from healthdata.forecast import SES_ALPHAS, Panel, backtest, build_panel, forecast
+
+pytest.importorskip("pytest_benchmark")
+
+YEARS = 4
+HORIZON = 1
+
+
+def synthetic(cities: int, years: int, seed: int = 0) -> dict[int, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.3, 0.9, cities)
+    season = np.array([0.0, 0.05, -0.03])
+    frames = {}
+    for y, year in enumerate(range(2021, 2021 + years)):
+        efficiency = base[:, None] + 0.02 * y + season + rng.normal(0, 0.05, (cities, 3))
+        efficiency[rng.random(efficiency.shape) < 0.02] = np.nan  # alguns bimestres sem valor
+        frames[year] = pd.DataFrame({
+            "cityId": np.repeat(np.arange(cities), 3),
+            "cityName": np.repeat([f"Cidade {c}" for c in range(cities)], 3),
+            "bimonthly": np.tile([1, 2, 3], cities),
+            "efficiency": efficiency.ravel(),
+        })
+    return frames
+
+
+def loop_ses(series: np.ndarray) -> float:
+    """Suavização exponencial de uma cidade, alfa a alfa e período a período."""
+    observed = series[~np.isnan(series)]
+    if not len(observed):
+        return np.nan
+    best = None
+    for alpha in SES_ALPHAS:
+        level, sse = observed[0], 0.0
+        for value in observed:
+            sse += (value - level) ** 2
+            level += alpha * (value - level)
+        if best is None or sse < best[0]:
+            best = (sse, level)
+    return best[1]
+
+
+def loop_linear(history: pd.DataFrame, future: tuple[int, int], season: int) -> pd.Series:
+    """Mesmo modelo agrupado com dummies de cidade, montado com pandas e ``lstsq``."""
+    df = history.assign(t=(history["year"] - history["year"].min()) * season + history["bimonthly"] - 1)
+    X = pd.get_dummies(df["cityId"], dtype=float)
+    X["t"] = df["t"]
+    for b in range(2, season + 1):
+        X[f"b{b}"] = (df["bimonthly"] == b).astype(float)
+    beta = pd.Series(np.linalg.lstsq(X.to_numpy(), df["efficiency"].to_numpy(), rcond=None)[0], index=X.columns)
+    t = (future[0] - history["year"].min()) * season + future[1] - 1
+    extra = beta["t"] * t + (beta.get(f"b{future[1]}", 0.0))
+    return beta.drop(["t", *(f"b{b}" for b in range(2, season + 1))]) + extra
+
+
+@pytest.fixture(scope="module", params=[185, 5000], ids=lambda cities: f"cities={cities}")
+def frames(request) -> dict[int, pd.DataFrame]:
+    return synthetic(request.param, YEARS)
+
+
+@pytest.fixture(scope="module")
+def panel(frames) -> Panel:
+    return build_panel(frames)
+
+
+def step_forecast(predictions: pd.DataFrame, model: str) -> np.ndarray:
+    return predictions.loc[(predictions["model"] == model) & (predictions["step"] == 1), "forecast"].to_numpy()
+
+
+@pytest.mark.benchmark(group="forecast")
+def test_forecast(benchmark, frames):
+    predictions = benchmark(lambda: forecast(build_panel(frames), horizon=HORIZON))
+    panel = build_panel(frames)
+    reference = np.array([loop_ses(series) for series in panel.values])
+    np.testing.assert_allclose(step_forecast(predictions, "ses"), reference)
+    if len(panel.city_ids) <= 1000:  # a matriz de dummies da referência cresce com cidades²
+        future = tuple(int(part[0]) for part in panel.periods(panel.next_index(1)))
+        reference = loop_linear(panel.to_frame(), future, panel.season).to_numpy()
+        np.testing.assert_allclose(step_forecast(predictions, "linear"), reference)
+
+
+@pytest.mark.benchmark(group="forecast")
+def test_ses_loop(benchmark, panel):
+    benchmark.pedantic(lambda: [loop_ses(series) for series in panel.values], rounds=3)
+
+
+@pytest.mark.benchmark(group="forecast-backtest")
+def test_backtest(benchmark, panel):
+    errors = benchmark(backtest, panel, horizon=HORIZON)
+    assert errors["train"].nunique() > 0
+    assert (errors[["mae", "rmse"]] >= 0).all().all()
+    assert (errors["rmse"] >= errors["mae"] - 1e-12).all()
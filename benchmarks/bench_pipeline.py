@@ -0,0 +1,82 @@
+"""Busca, transformação e renderização de cada família de gráfico contra a API falsa.
+
+Para cada escala (``--cities``, padrão 185) sobe ``benchmarks.fake_api``
+numa thread e, para cada família, mede separadamente:
+
+- ``fetch``: requisições HTTP, leitura do JSON e montagem dos DataFrames
+  (cliente sem cache em disco);
+- ``transform``: recortes de rank, geometria, correlação e montagem dos jobs;
+- ``render``: desenho e ``savefig`` de todos os gráficos da família, no
+  perfil de saída ``--output-profile``.
+"""
+import os
+from dataclasses import replace
+
+import matplotlib
+import pytest
+
+matplotlib.use("Agg")
+
+from benchmarks.fake_api import serve  # noqa: E402
+from healthdata import pipeline  # noqa: E402
+from healthdata.client import DeaClient  # noqa: E402
+
+pytest.importorskip("pytest_benchmark")
+
+YEARS = [2021, 2022, 2023, 2024]
+# famílias cujo gráfico desenha uma linha por município
+PER_CITY_FAMILIES = {"line"}
+# acima disso essas famílias não são renderizadas
+RENDER_LIMIT = 5000
+
+
+@pytest.fixture(scope="module")
+def client(cities):
+    with serve(cities) as base_url, DeaClient(base_url, cache=False) as client:
+        yield client
+
+
+@pytest.fixture(scope="module", params=list(pipeline.FAMILIES))
+def family(request) -> str:
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def stages(client, family, output_profile, tmp_path_factory) -> dict:
+    """Plano, dados buscados e jobs de uma família, preparados uma vez para os três estágios."""
+    charts = pipeline.plan([family], YEARS, profiles={family: output_profile})
+    datasets = [ds for chart in charts for ds in chart.datasets()]
+    load_plan = pipeline.plan_loads(datasets, columns=pipeline.columns_by_dataset(charts))
+    fetched = pipeline.fetch_datasets(client, load_plan)  # aquece também os corpos montados pela API falsa
+    out_dir = tmp_path_factory.mktemp(family)
+    return {"charts": charts, "load_plan": load_plan, "fetched": fetched, "out_dir": str(out_dir)}
+
+
+def transform(stages: dict) -> list:
+    loaded = pipeline.derive_datasets(stages["load_plan"], stages["fetched"])
+    return [
+        pipeline.render_job(replace(chart, output=os.path.join(stages["out_dir"], chart.output)), loaded)
+        for chart in stages["charts"]
+        if not pipeline.missing_datasets(chart, loaded)
+    ]
+
+
+@pytest.mark.benchmark(group="pipeline-fetch")
+def test_fetch(benchmark, client, stages):
+    fetched = benchmark.pedantic(pipeline.fetch_datasets, args=(client, stages["load_plan"]), rounds=3)
+    assert set(fetched) == set(stages["load_plan"].jobs)
+
+
+@pytest.mark.benchmark(group="pipeline-transform")
+def test_transform(benchmark, stages):
+    jobs = benchmark.pedantic(transform, args=(stages,), rounds=3)
+    assert len(jobs) == len(stages["charts"])
+
+
+@pytest.mark.benchmark(group="pipeline-render")
+def test_render(benchmark, stages, family, cities):
+    if family in PER_CITY_FAMILIES and cities > RENDER_LIMIT:
+        pytest.skip(f"{family} desenha uma linha por município; não renderizado acima de {RENDER_LIMIT}")
+    jobs = transform(stages)
+    benchmark.pedantic(lambda: [job.run() for job in jobs], rounds=3)
+    assert all(os.path.getsize(job.output) > 0 for job in jobs)
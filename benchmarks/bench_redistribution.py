@@ -0,0 +1,75 @@
+"""Redistribuição vetorizada contra o laço original de old/redistribute.py."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from healthdata.redistribution import redistribute
+
+pytest.importorskip("pytest_benchmark")
+
+CITIES = 185
+YEARS = 10
+RANK = 30
+
+
+def legacy_redistribute(original_df, top_cities, bottom_cities, max_efficiency=1.0):
+    """Cópia da função de old/redistribute.py, usada como referência."""
+    adjusted_df = original_df.copy()
+
+    for month in range(1, 13):
+        month_mask = adjusted_df['month'] == month
+        top_mask = adjusted_df['city'].isin(top_cities) & month_mask
+        bottom_mask = adjusted_df['city'].isin(bottom_cities) & month_mask
+
+        top_month = adjusted_df[top_mask].copy()
+        bottom_month = adjusted_df[bottom_mask]
+
+        top_month['surplus'] = (top_month['efficiency'] - max_efficiency).clip(lower=0)
+        total_surplus = top_month['surplus'].sum()
+
+        for idx, row in top_month.iterrows():
+            adjusted_df.at[idx, 'efficiency'] = min(row['efficiency'], max_efficiency)
+
+        if not bottom_month.empty and total_surplus > 0:
+            gain_per_city = total_surplus / len(bottom_month)
+            for idx, row in bottom_month.iterrows():
+                adjusted_df.at[idx, 'efficiency'] = row['efficiency'] + gain_per_city
+
+    return adjusted_df
+
+
+def synthetic(cities: int, years: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    year, city, month = np.meshgrid(
+        np.arange(2021 - years + 1, 2022), np.arange(cities), np.arange(1, 13), indexing="ij"
+    )
+    return pd.DataFrame({
+        "year": year.ravel(),
+        "city": [f"Cidade {c}" for c in city.ravel()],
+        "month": month.ravel(),
+        "efficiency": rng.uniform(0, 1.4, year.size),
+    })
+
+
+@pytest.fixture(scope="module")
+def scenario() -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    df = synthetic(CITIES, YEARS)
+    names = df["city"].unique()
+    return df, names[:RANK], names[-RANK:]
+
+
+def legacy_by_year(df: pd.DataFrame, top, bottom) -> pd.DataFrame:
+    return pd.concat(legacy_redistribute(year_df, top, bottom) for _, year_df in df.groupby("year", sort=False))
+
+
+@pytest.mark.benchmark(group="redistribution")
+def test_legacy_loop(benchmark, scenario):
+    benchmark.pedantic(legacy_by_year, args=scenario, rounds=3)
+
+
+@pytest.mark.benchmark(group="redistribution")
+def test_vectorized(benchmark, scenario):
+    df, top, bottom = scenario
+    vectorized = benchmark(redistribute, df, top, bottom, by=["year", "month"])
+    legacy = legacy_by_year(df, top, bottom)
+    np.testing.assert_allclose(vectorized["efficiency"], legacy.sort_index()["efficiency"])
@@ -0,0 +1,68 @@
+"""Contiguidade por ``STRtree`` contra o teste de todos os pares, e o LISA vetorizado."""
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+from healthdata.spatial import Weights, contiguity, moran_lisa
+
+pytest.importorskip("pytest_benchmark")
+
+BRUTE_SIDE = 30  # lado da grade usada na comparação O(n²)
+SIDE = 75  # lado da grade grande (SIDE² polígonos)
+PERMUTATIONS = 999
+
+
+def grid(side: int, seed: int = 0) -> np.ndarray:
+    """``side²`` quadrados com vértices levemente deslocados (fronteiras compartilhadas exatas)."""
+    rng = np.random.default_rng(seed)
+    nodes = np.stack(np.meshgrid(np.arange(side + 1.0), np.arange(side + 1.0), indexing="ij"), axis=-1)
+    nodes[1:-1, 1:-1] += rng.uniform(-0.3, 0.3, (side - 1, side - 1, 2))
+    i, j = np.meshgrid(np.arange(side), np.arange(side), indexing="ij")
+    i, j = i.ravel(), j.ravel()
+    rings = np.stack([nodes[i, j], nodes[i + 1, j], nodes[i + 1, j + 1], nodes[i, j + 1]], axis=1)
+    return shapely.polygons(rings)
+
+
+def brute_force(geoms: np.ndarray) -> set[tuple[int, int]]:
+    """Todos os pares testados com ``intersects``, como um laço O(n²) faria."""
+    n = len(geoms)
+    left, right = np.triu_indices(n, k=1)
+    hit = shapely.intersects(geoms[left], geoms[right])
+    return {(int(a), int(b)) for a, b in zip(left[hit], right[hit])}
+
+
+def pairs(indptr: np.ndarray, indices: np.ndarray) -> set[tuple[int, int]]:
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    return {(int(a), int(b)) for a, b in zip(rows, indices) if a < b}
+
+
+@pytest.mark.benchmark(group="contiguity")
+def test_brute_force(benchmark):
+    benchmark.pedantic(brute_force, args=(grid(BRUTE_SIDE),), rounds=3)
+
+
+@pytest.mark.benchmark(group="contiguity")
+@pytest.mark.parametrize("side", [BRUTE_SIDE, SIDE], ids=lambda side: f"polygons={side * side}")
+def test_strtree(benchmark, side):
+    geoms = grid(side)
+    indptr, indices = benchmark(contiguity, geoms, "queen")
+    if side == BRUTE_SIDE:
+        assert pairs(indptr, indices) == brute_force(geoms)
+    assert np.diff(indptr).max() == 8  # vizinhos queen de uma célula interna
+
+
+@pytest.mark.benchmark(group="lisa")
+def test_moran_lisa(benchmark):
+    geoms = grid(SIDE)
+    indptr, indices = contiguity(geoms)
+    n = len(geoms)
+    weights = Weights(np.arange(1_000_000, 1_000_000 + n), indptr, indices)
+    df = pd.DataFrame({
+        "cityId": weights.codes,
+        "efficiency": shapely.get_x(shapely.centroid(geoms)) / SIDE + np.random.default_rng(0).normal(0, 0.2, n),
+    })
+    result = benchmark.pedantic(moran_lisa, args=(weights, df, 0, PERMUTATIONS), kwargs={"seed": 0}, rounds=3)
+    assert result.moran > 0.5
+    assert result.p_value == pytest.approx(1 / (PERMUTATIONS + 1))
+    assert set(np.unique(result.clusters)) >= {1, 3}
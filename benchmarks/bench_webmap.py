@@ -0,0 +1,105 @@
+"""Tamanho e tempo de leitura do GeoJSON original contra o TopoJSON exportado."""
+import gzip
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from healthdata.geometry import GEOJSON_FILE
+from healthdata.webmap import DEFAULT_QUANTIZE, DEFAULT_TOLERANCE, attributes, build_topology, write_tiles, year_topology
+
+pytest.importorskip("pytest_benchmark")
+
+TOLERANCES = (0.0, 100.0, DEFAULT_TOLERANCE, 500.0)
+MAX_KB = 100  # meta de tamanho de um ano na tolerância padrão
+
+
+def decode_arcs(topology: dict) -> list[np.ndarray]:
+    """Arcos delta-quantizados -> coordenadas, o trabalho principal do ``topojson.feature`` no navegador."""
+    scale, translate = np.asarray(topology["transform"]["scale"]), np.asarray(topology["transform"]["translate"])
+    return [np.cumsum(np.asarray(arc, dtype=float), axis=0) * scale + translate for arc in topology["arcs"]]
+
+
+def synthetic_year(geojson: dict, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ids = np.array([int(feature["properties"]["id"]) // 10 for feature in geojson["features"]])
+    return pd.DataFrame({
+        "cityId": np.repeat(ids, 3),
+        "bimonthly": np.tile([1, 2, 3], len(ids)),
+        "efficiency": rng.uniform(0, 1.3, 3 * len(ids)),
+    })
+
+
+def dumps(data) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+@pytest.fixture(scope="module")
+def geojson() -> tuple[bytes, dict]:
+    with open(GEOJSON_FILE, "rb") as f:
+        raw = f.read()
+    return raw, json.loads(raw)
+
+
+@pytest.fixture(scope="module")
+def year(geojson) -> pd.DataFrame:
+    return synthetic_year(geojson[1])
+
+
+@pytest.fixture(scope="module")
+def bodies(geojson, year) -> dict[str, bytes]:
+    """Corpo de cada variante: o GeoJSON original, com atributos por ano e o TopoJSON por tolerância."""
+    raw, data = geojson
+    codes = np.array([int(feature["properties"]["id"]) for feature in data["features"]])
+    with_attributes = {**data, "features": [
+        {**feature, "properties": {**feature["properties"], **props}}
+        for feature, props in zip(data["features"], attributes(codes, year))
+    ]}
+    variants = {"geojson": raw, "geojson+attributes": dumps(with_attributes)}
+    for tolerance in TOLERANCES:
+        variants[f"topojson-{tolerance:g}m"] = dumps(year_topology(build_topology(GEOJSON_FILE, tolerance), year))
+    return variants
+
+
+@pytest.mark.benchmark(group="webmap-build")
+@pytest.mark.parametrize("tolerance", TOLERANCES, ids=lambda tolerance: f"{tolerance:g}m")
+def test_build_topology(benchmark, year, tolerance):
+    topology = benchmark.pedantic(
+        lambda: year_topology(build_topology(GEOJSON_FILE, tolerance, DEFAULT_QUANTIZE), year), rounds=3
+    )
+    body = dumps(topology)
+    print(f"\n{tolerance:g} m: {len(body) / 1024:.0f} KB, {len(gzip.compress(body)) / 1024:.0f} KB gzip")
+    if tolerance == DEFAULT_TOLERANCE:
+        assert len(body) <= MAX_KB * 1024
+
+
+@pytest.mark.benchmark(group="webmap-parse")
+@pytest.mark.parametrize("variant", ["geojson", "geojson+attributes", *(f"topojson-{t:g}m" for t in TOLERANCES)])
+def test_parse(benchmark, bodies, variant):
+    parsed = benchmark(json.loads, bodies[variant])
+    if variant.startswith("topojson"):
+        assert len(decode_arcs(parsed)) == len(parsed["arcs"])
+
+
+@pytest.mark.benchmark(group="webmap-parse")
+def test_decode_arcs(benchmark, bodies):
+    topology = json.loads(bodies[f"topojson-{DEFAULT_TOLERANCE:g}m"])
+    arcs = benchmark(decode_arcs, topology)
+    lon, lat = np.concatenate(arcs).T
+    assert (-42 < lon).all() and (lon < -32).all() and (-10 < lat).all() and (lat < -3).all()
+
+
+@pytest.mark.benchmark(group="webmap-tiles")
+@pytest.mark.filterwarnings("ignore:The 'shapely.ops.transform\\(\\)' function is deprecated:DeprecationWarning")
+def test_tiles(benchmark, year, tmp_path):
+    pytest.importorskip("mapbox_vector_tile")
+    from healthdata.geometry import load_geometry
+
+    geo_df = load_geometry()
+    properties = attributes(geo_df["code"].to_numpy(dtype=np.int64), year)
+    count = benchmark.pedantic(write_tiles, args=(geo_df, properties, str(tmp_path)), rounds=1)
+    size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(tmp_path) for name in names)
+    print(f"\nvector tiles z0-8: {count} tiles, {size / 1024:.0f} KB")
+    assert count > 0
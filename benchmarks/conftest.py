@@ -0,0 +1,35 @@
+"""Benchmarks de regressão com pytest-benchmark.
+
+Cada ``bench_*.py`` mede uma parte do pacote e confere o resultado contra
+uma referência (laço original, ``DataFrame.corr``, teste de todos os pares).
+Ficam fora do ``pytest`` padrão (``testpaths = tests``) e rodam à parte
+(na raiz do repositório)::
+
+    python -m pytest benchmarks --benchmark-only        # mede e confere
+    python -m pytest benchmarks --benchmark-disable     # só confere, uma rodada
+    python -m pytest benchmarks --benchmark-only --cities 185 5000
+    python -m pytest benchmarks --benchmark-only --benchmark-autosave
+    python -m pytest benchmarks --benchmark-only --benchmark-compare --benchmark-compare-fail=median:25%
+
+``--benchmark-autosave`` grava em ``.benchmarks/`` (fora do git): a linha de
+base é da máquina em que se compara, não do repositório.
+"""
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("healthdata", "benchmarks do healthdata")
+    group.addoption("--cities", type=int, nargs="+", default=[185],
+                    help="municípios da API falsa em bench_pipeline (padrão: 185)")
+    group.addoption("--output-profile", default="publication",
+                    help="perfil de saída dos gráficos renderizados em bench_pipeline")
+
+
+def pytest_generate_tests(metafunc):
+    if "cities" in metafunc.fixturenames:
+        metafunc.parametrize("cities", metafunc.config.getoption("cities"), scope="module")
+
+
+@pytest.fixture(scope="session")
+def output_profile(request) -> str:
+    return request.config.getoption("output_profile")
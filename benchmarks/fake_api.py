@@ -0,0 +1,235 @@
+"""Substituto local da API DEA (localhost:8080) com payloads sintéticos.
+
+Serve os mesmos endpoints que os scripts consomem, com dados gerados de
+forma determinística por ano. Até 185 municípios usa os códigos e nomes
+reais de ``resources/data/pe.json``; acima disso cria municípios fictícios,
+para medir o pipeline com até dezenas de milhares de cidades. Respostas
+levam ``ETag`` e respeitam ``If-None-Match``.
+
+Uso (na raiz do repositório)::
+
+    python -m benchmarks.fake_api --cities 5000 --port 8080
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from healthdata.client import (
+    CITY_PATH,
+    FIRST_SEMESTER_PATH,
+    LEGACY_EFFICIENCY_PATH,
+    LEGACY_REDISTRIBUTE_PATH,
+    RANKED_PATH,
+    REDISTRIBUTED_PATH,
+)
+from healthdata.geometry import GEOJSON_FILE
+
+LEGACY_RANK = 5
+METRICS = ("apsPerCapita", "teamsDensity", "healthCareVisitsPerThousandReais", "cobertura", "productivity")
+
+
+class FakeData:
+    """Indicadores sintéticos de ``cities`` municípios, gerados por ano com semente fixa."""
+
+    def __init__(self, cities: int = 185, seed: int = 0):
+        with open(GEOJSON_FILE, encoding="utf-8") as f:
+            features = json.load(f)["features"]
+        real = [(int(feat["properties"]["id"]) // 10, feat["properties"]["name"]) for feat in features]
+        extra = [(900000 + i, f"Município {i}") for i in range(max(cities - len(real), 0))]
+        pairs = (real + extra)[:cities]
+        self.ids = np.array([cid for cid, _ in pairs], dtype=np.int64)
+        self.names = [name for _, name in pairs]
+        self.seed = seed
+
+    @lru_cache(maxsize=16)
+    def indicators(self, year: int) -> dict[str, np.ndarray]:
+        """Colunas dos 3 bimestres de todas as cidades (linhas cidade-major)."""
+        rng = np.random.default_rng([self.seed, year])
+        rows = len(self.ids) * 3
+        return {
+            "cityId": np.repeat(self.ids, 3),
+            "city": np.repeat(np.arange(len(self.ids)), 3),
+            "bimonthly": np.tile([1, 2, 3], len(self.ids)),
+            "apsPerCapita": rng.uniform(10, 100, rows),
+            "teamsDensity": rng.uniform(1, 50, rows),
+            "healthCareVisitsPerThousandReais": rng.uniform(1, 20, rows),
+            "cobertura": rng.uniform(20, 120, rows),
+            "productivity": rng.uniform(100, 5000, rows),
+            "efficiency": rng.uniform(0, 1.3, rows),
+        }
+
+    def records(self, year: int, cities: np.ndarray | None = None) -> list[dict]:
+        cols = self.indicators(year)
+        rows = np.arange(len(cols["cityId"])) if cities is None else np.flatnonzero(np.isin(cols["city"], cities))
+        return [
+            {
+                "cityId": int(cols["cityId"][i]),
+                "cityName": self.names[cols["city"][i]],
+                "bimonthly": int(cols["bimonthly"][i]),
+                "year": year,
+                **{name: float(cols[name][i]) for name in METRICS},
+                "efficiency": float(cols["efficiency"][i]),
+            }
+            for i in rows
+        ]
+
+    def ranked_cities(self, year: int, rank: int) -> tuple[np.ndarray, np.ndarray]:
+        """Índices das ``rank`` melhores e piores cidades pela eficiência média.
+
+        Empates saem por ``cityId`` crescente nas duas pontas, a mesma regra
+        de ``healthdata.ranking``.
+        """
+        means = self.indicators(year)["efficiency"].reshape(-1, 3).mean(axis=1)
+        rank = min(rank, len(means))
+        top = np.lexsort((self.ids, -means))
+        bottom = np.lexsort((self.ids, means))
+        return top[:rank], bottom[:rank]
+
+    def ranked(self, year: int, rank: int) -> list[dict]:
+        top, bottom = self.ranked_cities(year, rank)
+        return self.records(year, np.concatenate([top, bottom]))
+
+    def redistributed(self, year: int, rank: int) -> list[dict]:
+        return [
+            {"cityId": row["cityId"], "bimonthly": row["bimonthly"], "efficiency": min(row["efficiency"], 1.0)}
+            for row in self.ranked(year, rank)
+        ]
+
+    def cities(self) -> list[dict]:
+        return [{"id": int(cid), "name": name} for cid, name in zip(self.ids, self.names)]
+
+    def legacy_blocks(self, year: int, cities=None, cap: float | None = None) -> list[dict]:
+        """Formato aninhado antigo: ``{city, efficiencies[12], avgEfficiency}`` por cidade."""
+        rng = np.random.default_rng([self.seed, year, 12])
+        values = rng.uniform(0, 1.3, (len(self.ids), 12))
+        if cap is not None:
+            values = np.minimum(values, cap)
+        indices = range(len(self.ids)) if cities is None else cities
+        return [
+            {
+                "city": {"id": int(self.ids[c]), "name": self.names[c]},
+                "efficiencies": [
+                    {"month": month + 1, "efficiency": float(values[c, month])} for month in range(12)
+                ],
+                "avgEfficiency": float(values[c].mean()),
+            }
+            for c in indices
+        ]
+
+    def legacy_ranked(self, year: int, cap: float | None = None) -> dict:
+        rng = np.random.default_rng([self.seed, year, 12])
+        means = rng.uniform(0, 1.3, (len(self.ids), 12)).mean(axis=1)
+        order = np.argsort(-means, kind="stable")
+        return {
+            "top": self.legacy_blocks(year, order[:LEGACY_RANK], cap),
+            "down": self.legacy_blocks(year, order[len(order) - LEGACY_RANK:][::-1], cap),
+        }
+
+
+def make_handler(data: FakeData) -> type[BaseHTTPRequestHandler]:
+    bodies: dict[tuple, bytes] = {}
+    lock = threading.Lock()
+
+    def body(key: tuple, build) -> bytes:
+        with lock:
+            cached = bodies.get(key)
+        if cached is None:
+            cached = json.dumps(build()).encode()
+            with lock:
+                bodies[key] = cached
+        return cached
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, key: tuple, build):
+            payload = body(key, build)
+            etag = '"' + hashlib.sha256(payload).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _query(self) -> tuple[str, dict[str, int]]:
+            url = urlparse(self.path)
+            return url.path, {k: int(v[0]) for k, v in parse_qs(url.query).items()}
+
+        def do_GET(self):
+            path, q = self._query()
+            if path == FIRST_SEMESTER_PATH:
+                return self._send(("indicators", q["year"]), lambda: data.records(q["year"]))
+            if path == RANKED_PATH:
+                return self._send(("ranked", q["year"], q["rank"]), lambda: data.ranked(q["year"], q["rank"]))
+            if path == CITY_PATH:
+                return self._send(("cities",), data.cities)
+            if match := re.fullmatch(rf"{LEGACY_EFFICIENCY_PATH}/ranked/(\d+)", path):
+                year = int(match[1])
+                return self._send(("legacy-ranked", year), lambda: data.legacy_ranked(year))
+            if match := re.fullmatch(rf"{LEGACY_EFFICIENCY_PATH}/(\d+)", path):
+                year = int(match[1])
+                return self._send(("legacy", year), lambda: data.legacy_blocks(year))
+            self.send_error(404)
+
+        def do_POST(self):
+            path, q = self._query()
+            if path == REDISTRIBUTED_PATH:
+                key = ("redistributed", q["year"], q["rank"])
+                return self._send(key, lambda: data.redistributed(q["year"], q["rank"]))
+            if match := re.fullmatch(rf"{LEGACY_REDISTRIBUTE_PATH}/(\d+)", path):
+                year = int(match[1])
+                return self._send(("legacy-redistribute", year), lambda: {
+                    "real": data.legacy_ranked(year),
+                    "redistributed": data.legacy_ranked(year, cap=1.0),
+                })
+            self.send_error(404)
+
+    return Handler
+
+
+@contextmanager
+def serve(cities: int = 185, port: int = 0, seed: int = 0):
+    """Sobe a API falsa numa thread e devolve a URL base (porta livre se ``port=0``)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(FakeData(cities, seed)))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cities", type=int, default=185)
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(FakeData(args.cities, args.seed)))
+    print(f"API falsa com {args.cities} municípios em http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""Utilitários compartilhados pelos scripts de visualização da API DEA.
+
+Os módulos importam pandas, matplotlib, geopandas e scipy só quando um
+estágio precisa deles. O backend não interativo Agg é fixado aqui (sem
+importar o matplotlib), antes de qualquer ``pyplot``; ``MPLBACKEND`` no
+ambiente tem precedência.
+"""
+import os
+
+os.environ.setdefault("MPLBACKEND", "Agg")
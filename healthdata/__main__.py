@@ -0,0 +1,5 @@
+import sys
+
+from healthdata.cli import main
+
+sys.exit(main())
@@ -0,0 +1,148 @@
+"""Cache em disco das respostas da API DEA.
+
+Cada resposta GET é guardada como tabela Arrow IPC (``<chave>.arrow``), com
+um arquivo ``<chave>.json`` de metadados (endpoint, parâmetros, ETag, hash
+do corpo e horário da busca). A chave é o hash do endpoint e dos parâmetros.
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import time
+from collections.abc import Callable
+from typing import Any
+
+DEFAULT_CACHE_DIR = ".cache/healthdata"
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class CacheMissError(LookupError):
+    """Resposta ausente do cache em modo offline."""
+
+
+class ResponseCache:
+    """Cache de respostas com TTL, revalidação por ETag e modo offline.
+
+    ``ttl`` em segundos (``None`` nunca expira). Em modo ``offline`` as
+    entradas são servidas mesmo vencidas e nenhuma requisição é feita.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, ttl: float | None = DEFAULT_TTL, offline: bool = False):
+        self.directory = directory
+        self.ttl = ttl
+        self.offline = offline
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache | None":
+        """Configuração via HEALTHDATA_CACHE, HEALTHDATA_CACHE_DIR, HEALTHDATA_CACHE_TTL e HEALTHDATA_OFFLINE.
+
+        Devolve ``None`` (cache desligado) se HEALTHDATA_CACHE=0 ou se o
+        pyarrow não estiver instalado.
+        """
+        if os.environ.get("HEALTHDATA_CACHE", "1") == "0" or importlib.util.find_spec("pyarrow") is None:
+            return None
+        ttl = os.environ.get("HEALTHDATA_CACHE_TTL")
+        return cls(
+            directory=os.environ.get("HEALTHDATA_CACHE_DIR", DEFAULT_CACHE_DIR),
+            ttl=float(ttl) if ttl else DEFAULT_TTL,
+            offline=os.environ.get("HEALTHDATA_OFFLINE", "0") == "1",
+        )
+
+    @staticmethod
+    def key(path: str, params: dict | None = None) -> str:
+        raw = json.dumps([path, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def meta(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key, "json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def entries(self, path: str) -> list[tuple[str, dict]]:
+        """``(chave, metadados)`` das entradas gravadas do endpoint ``path``."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        found = []
+        for name in names:
+            key, ext = os.path.splitext(name)
+            if ext == ".json":
+                meta = self.meta(key)
+                if meta is not None and meta.get("path") == path:
+                    found.append((key, meta))
+        return found
+
+    def is_fresh(self, meta: dict) -> bool:
+        return self.ttl is None or time.time() - meta["fetched_at"] < self.ttl
+
+    def load(self, key: str) -> list[dict[str, Any]]:
+        return self.load_table(key).to_pylist()
+
+    def load_table(self, key: str, columns: list[str] | None = None):
+        """Tabela Arrow da entrada, lida só nas ``columns`` existentes (todas se ``None``)."""
+        import pyarrow as pa
+
+        with pa.memory_map(self._path(key, "arrow")) as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select([name for name in columns if name in table.column_names])
+        return table
+
+    def store(self, key: str, path: str, params: dict | None, data: Any, body: bytes, etag: str | None):
+        """Grava ``data`` se for uma lista de registros; outros formatos não são guardados."""
+        if not isinstance(data, list):
+            return
+        import pyarrow as pa
+
+        def build():
+            try:
+                return pa.Table.from_pylist(data)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                return None
+
+        self.store_table(key, path, params, build, hashlib.sha256(body).hexdigest(), etag)
+
+    def store_table(self, key: str, path: str, params: dict | None, build: Callable, content_hash: str, etag: str | None):
+        """Grava a tabela devolvida por ``build()`` (``None`` não grava nada).
+
+        Se ``content_hash`` for igual ao já gravado, ``build`` não é chamado
+        e só os metadados são atualizados.
+        """
+        import pyarrow as pa
+
+        old = self.meta(key)
+        if old is None or old.get("sha256") != content_hash or not os.path.exists(self._path(key, "arrow")):
+            table = build()
+            if table is None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._path(key, f"arrow.{os.getpid()}.tmp")
+            options = pa.ipc.IpcWriteOptions(compression="zstd")
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+            os.replace(tmp, self._path(key, "arrow"))
+
+        self._write_meta(key, {
+            "path": path,
+            "params": params or {},
+            "etag": etag,
+            "sha256": content_hash,
+            "fetched_at": time.time(),
+        })
+
+    def touch(self, key: str, meta: dict):
+        """Marca a entrada como revalidada (ex.: após um 304 Not Modified)."""
+        self._write_meta(key, {**meta, "fetched_at": time.time()})
+
+    def _write_meta(self, key: str, meta: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(key, f"json.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path(key, "json"))
@@ -0,0 +1,442 @@
+"""Funções de renderização de cada família de gráficos.
+
+Cada função recebe DataFrames já buscados e o caminho de saída; nenhuma faz
+requisições. São usadas tanto pelos scripts da raiz quanto pelo pipeline.
+"""
+from statistics import mode, StatisticsError
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.colors import ListedColormap
+from matplotlib.patches import Patch
+
+from healthdata import output
+from healthdata.correlation import CORRELATION_COLS, CorrelationResult
+from healthdata.geometry import check_codes
+from healthdata.maps import add_municipalities, renderer_for, values_by_code
+from healthdata.spatial import CLUSTERS, SpatialResult
+from healthdata.templates import ranked_figure, ranked_panels
+
+
+def _savefig(filename: str, **kwargs):
+    output.save(plt.gcf(), filename, **kwargs)
+
+
+def _require_efficiency(df: pd.DataFrame, year: int):
+    if "efficiency" not in df.columns:
+        raise ValueError(f"O JSON do ano {year} precisa conter o campo 'efficiency'.")
+
+
+def plot_line(df: pd.DataFrame, year: int, filename: str):
+    """Eficiência de todas as cidades ao longo dos bimestres (resources/all)."""
+    _require_efficiency(df, year)
+
+    plt.figure(figsize=(14, 8))
+
+    for city, city_data in df.groupby("cityName"):
+        plt.plot(
+            city_data["bimonthly"],
+            city_data["efficiency"],
+            marker="o",
+            linewidth=1,
+            label=city
+        )
+
+    plt.xlabel("Bimestre")
+    plt.ylabel("Eficiência")
+    plt.title(f"Eficiência por Cidade ao longo dos Bimestres - 1º Semestre {year}")
+    plt.grid(True)
+
+    plt.legend(
+        loc="center left",
+        bbox_to_anchor=(1.02, 0.5),
+        fontsize=7,
+        ncol=3
+    )
+
+    plt.tight_layout()
+    _savefig(filename)
+    plt.close()
+
+
+def plot_ranked(df: pd.DataFrame, year: int, rank: int, filename: str):
+    """Top/Bottom ``rank`` cidades com duas legendas (resources/ranked).
+
+    A figura vem de ``templates.ranked_figure``: montada uma vez por
+    processo, com as legendas refeitas a partir do ranking de cada ano.
+    """
+    _require_efficiency(df, year)
+    ranked_figure(rank).render({year: df}, filename)
+
+
+def plot_ranked_all(frames: dict[int, pd.DataFrame], rank: int, filename: str):
+    """Painel 2x2 com o Top/Bottom ``rank`` de cada ano."""
+    for year, df in frames.items():
+        _require_efficiency(df, year)
+    ranked_panels(rank).render(frames, filename)
+
+
+def plot_redistributed(df_real: pd.DataFrame, df_redis: pd.DataFrame, year: int, filename: str):
+    """Eficiência real vs redistribuída das cidades ranqueadas."""
+    if df_real.empty or "efficiency" not in df_real.columns:
+        raise ValueError(f"O JSON real do ano {year} está vazio ou sem 'efficiency'.")
+    if df_redis.empty or "efficiency" not in df_redis.columns:
+        raise ValueError(f"O JSON redistribuído do ano {year} está vazio ou sem 'efficiency'.")
+
+    df_merge = df_real.merge(
+        df_redis,
+        on=["cityId", "bimonthly"],
+        how="inner",
+        suffixes=("_real", "_redis")
+    )
+
+    plt.figure(figsize=(12, 7))
+
+    for city, city_data in df_merge.groupby("cityName"):
+        plt.plot(
+            city_data["bimonthly"],
+            city_data["efficiency_real"],
+            marker="o",
+            linewidth=1.8,
+            label=f"{city} (Real)"
+        )
+        plt.plot(
+            city_data["bimonthly"],
+            city_data["efficiency_redis"],
+            marker="x",
+            linestyle="--",
+            linewidth=1.5,
+            label=f"{city} (Redistribuído)"
+        )
+
+    plt.xlabel("Bimestre")
+    plt.ylabel("Eficiência")
+    plt.title(f"Eficiência Real vs Redistribuída - 1º Semestre {year}")
+    plt.xticks(sorted(df_merge["bimonthly"].unique()))
+    plt.grid(True, linestyle="--", alpha=0.6)
+
+    plt.legend(
+        loc="center left",
+        bbox_to_anchor=(1.02, 0.5),
+        fontsize=9,
+        title="Cidades"
+    )
+
+    plt.tight_layout(rect=[0, 0, 0.8, 1])
+    _savefig(filename)
+    plt.close()
+
+
+def plot_sweep(results: pd.DataFrame, metric: str, filename: str):
+    """Um painel por política: ``metric`` (média entre os anos) por rank, uma linha por teto."""
+    policies = list(dict.fromkeys(results["policy"]))
+    fig, axes = plt.subplots(1, len(policies), figsize=(6 * len(policies), 5), sharey=True, squeeze=False)
+    caps = sorted(results["cap"].dropna().unique())
+    colors = plt.cm.viridis(np.linspace(0, 0.9, max(len(caps), 1)))
+
+    for ax, policy in zip(axes[0], policies):
+        df = results[results["policy"] == policy]
+        for color, (cap, cap_data) in zip(colors, df.groupby("cap", dropna=False)):
+            mean = cap_data.groupby("rank")[metric].mean()
+            label = "servidor" if pd.isna(cap) else f"{cap:g}"
+            ax.plot(mean.index, mean.to_numpy(), marker="o", markersize=3, linewidth=1.5, color=color, label=label)
+        ax.set_title(f"Política: {policy}")
+        ax.set_xlabel("Rank (Top/Bottom N)")
+        ax.grid(True, linestyle="--", alpha=0.6)
+
+    axes[0][0].set_ylabel(metric)
+    axes[0][-1].legend(loc="center left", bbox_to_anchor=(1.02, 0.5), fontsize=9, title="Teto")
+    fig.suptitle(f"Varredura de redistribuição - {metric} (média entre os anos)")
+    plt.tight_layout()
+    _savefig(filename, bbox_inches="tight")
+    plt.close()
+
+
+def _period_labels(periods: list[tuple[int, int]]) -> list[str]:
+    return [f"{year}/{bimonthly}º" for year, bimonthly in periods]
+
+
+def plot_forecast(history: pd.DataFrame, forecasts: pd.DataFrame, model: str, filename: str):
+    """Histórico (linha cheia) e previsão (tracejada) de cada cidade, na mesma cor."""
+    history = history.sort_values(["year", "bimonthly"])
+    forecasts = forecasts.sort_values(["year", "bimonthly"])
+    periods = sorted(set(zip(history["year"], history["bimonthly"])) | set(zip(forecasts["year"], forecasts["bimonthly"])))
+    position = {period: i for i, period in enumerate(periods)}
+    predicted = dict(tuple(forecasts.groupby("cityName")))
+
+    plt.figure(figsize=(14, 8))
+
+    for city, city_data in history.groupby("cityName"):
+        x = [position[period] for period in zip(city_data["year"], city_data["bimonthly"])]
+        line, = plt.plot(x, city_data["efficiency"], marker="o", linewidth=1, label=city)
+        if city in predicted:
+            pred = predicted[city]
+            plt.plot(
+                [x[-1], *(position[period] for period in zip(pred["year"], pred["bimonthly"]))],
+                [city_data["efficiency"].iloc[-1], *pred["forecast"]],
+                marker="x",
+                linestyle="--",
+                linewidth=1,
+                color=line.get_color()
+            )
+
+    plt.axvline(max(position[period] for period in zip(history["year"], history["bimonthly"])) + 0.5,
+                color="gray", linestyle=":")
+    plt.xticks(range(len(periods)), _period_labels(periods), rotation=45)
+    plt.xlabel("Ano/Bimestre")
+    plt.ylabel("Eficiência")
+    plt.title(f"Previsão de Eficiência do Próximo Bimestre - {model}")
+    plt.grid(True)
+
+    plt.legend(
+        loc="center left",
+        bbox_to_anchor=(1.02, 0.5),
+        fontsize=7,
+        ncol=2
+    )
+
+    plt.tight_layout()
+    _savefig(filename)
+    plt.close()
+
+
+def plot_backtest(errors: pd.DataFrame, labels: dict[str, str], filename: str):
+    """MAE do backtest de cada modelo por período previsto (um passo à frente)."""
+    errors = errors[errors["step"] == 1].sort_values(["year", "bimonthly"])
+    periods = list(dict.fromkeys(zip(errors["year"], errors["bimonthly"])))
+    position = {period: i for i, period in enumerate(periods)}
+
+    plt.figure(figsize=(12, 7))
+
+    for model, model_errors in errors.groupby("model", sort=False):
+        plt.plot(
+            [position[period] for period in zip(model_errors["year"], model_errors["bimonthly"])],
+            model_errors["mae"],
+            marker="o",
+            linewidth=1.8,
+            label=labels.get(model, model)
+        )
+
+    plt.xticks(range(len(periods)), _period_labels(periods), rotation=45)
+    plt.xlabel("Bimestre previsto")
+    plt.ylabel("Erro absoluto médio")
+    plt.title("Backtest da Previsão de Eficiência (origem móvel, um bimestre à frente)")
+    plt.grid(True, linestyle="--", alpha=0.6)
+    plt.legend(title="Modelo")
+
+    plt.tight_layout()
+    _savefig(filename)
+    plt.close()
+
+
+def plot_scatter(df: pd.DataFrame, year: int, filename: str):
+    """Dispersão APS per capita vs produtividade, colorida pela eficiência média."""
+    df = df.groupby("cityName", as_index=False).agg({
+        "apsPerCapita": "mean",
+        "productivity": "mean",
+        "efficiency": "mean"
+    })
+
+    plt.figure(figsize=(12, 8))
+    scatter = plt.scatter(
+        df["apsPerCapita"],
+        df["productivity"],
+        c=df["efficiency"],
+        cmap="RdYlGn",
+        s=300,
+        alpha=0.8,
+        edgecolor="k"
+    )
+
+    for i, row in df.iterrows():
+        plt.text(row["apsPerCapita"], row["productivity"], row["cityName"],
+                 fontsize=9, ha="right")
+
+    plt.colorbar(scatter, label="Eficiência")
+    plt.xlabel("Orçamento da APS per capita (input)")
+    plt.ylabel("Produtividade (output)")
+    plt.title(f"Dispersão: APS per capita vs Produtividade - 1º Semestre {year}")
+    plt.grid(True)
+    plt.tight_layout()
+    _savefig(filename)
+    plt.close()
+
+
+def _correlation_annotations(result: CorrelationResult, year: int) -> np.ndarray | bool:
+    """Texto das células: ``r`` e, se houver, o intervalo bootstrap e ``*`` para p < 0,05."""
+    if result.ci_low is None and result.p_values is None:
+        return True
+    y = result.years.index(year)
+    text = np.char.mod("%.2f", result.r[y])
+    if result.p_values is not None:
+        text = np.where(result.p_values[y] < 0.05, np.char.add(text, "*"), text)
+    if result.ci_low is not None:
+        interval = np.char.add(np.char.add("\n[", np.char.mod("%.2f", result.ci_low[y])), ", ")
+        interval = np.char.add(np.char.add(interval, np.char.mod("%.2f", result.ci_high[y])), "]")
+        text = np.char.add(text, interval)
+    return text
+
+
+def _correlation_matrix(result: CorrelationResult, year: int, labels: dict[str, str] | None = None) -> pd.DataFrame:
+    if year not in result.years:
+        raise ValueError(f"Sem matriz de correlação para o ano {year}.")
+    return result.matrix(year, labels)
+
+
+def plot_correlation(result: CorrelationResult, year: int, filename: str):
+    """Mapa de calor da correlação entre inputs, outputs e eficiência de um ano."""
+    matrix = _correlation_matrix(result, year)
+    annot = _correlation_annotations(result, year)
+
+    plt.figure(figsize=(10, 7))
+    sns.heatmap(
+        matrix,
+        annot=annot,
+        cmap="RdYlGn",
+        vmin=-1, vmax=1,
+        fmt=".2f" if annot is True else "", linewidths=0.5
+    )
+    plt.title(f"Correlação entre Inputs, Outputs e Eficiência - 1º Semestre {year}")
+    plt.tight_layout()
+    _savefig(filename)
+    plt.close()
+
+
+def plot_correlation_all(result: CorrelationResult, filename: str):
+    """Painel 2x2 com a correlação de cada ano e uma barra de cores comum."""
+    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    axes = axes.flatten()
+
+    cmap = "RdYlGn"
+    vmin, vmax = -1, 1
+
+    for ax, year in zip(axes, result.years):
+        annot = _correlation_annotations(result, year)
+        sns.heatmap(
+            _correlation_matrix(result, year, CORRELATION_COLS),
+            annot=annot,
+            cmap=cmap,
+            vmin=vmin,
+            vmax=vmax,
+            fmt=".2f" if annot is True else "", linewidths=0.5,
+            ax=ax,
+            cbar=False
+        )
+        ax.set_title(f"Correlação - {year}", fontsize=14)
+
+    cbar_ax = fig.add_axes([0.25, 0.94, 0.5, 0.02])
+    sm = plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(vmin=vmin, vmax=vmax))
+    cbar = fig.colorbar(sm, cax=cbar_ax, orientation="horizontal")
+    cbar.set_label("Correlação (inputs, outputs e eficiência)", fontsize=12, labelpad=6)
+
+    plt.tight_layout(rect=[0, 0, 1, 0.88])
+    _savefig(filename)
+    plt.close()
+
+
+def _warn_unmatched(geo_df, df_eff: pd.DataFrame, year: int):
+    report = check_codes(geo_df, df_eff)
+    if report.missing_geometry:
+        print(f"⚠️ {year}: {report}")
+
+
+def plot_map(df_eff: pd.DataFrame, geo_df, year: int, filename: str):
+    """Mapa temático de eficiência por município de um ano.
+
+    A figura e os polígonos são montados uma vez por processo e
+    reaproveitados pelos anos seguintes; só as cores e o título mudam.
+    """
+    _warn_unmatched(geo_df, df_eff, year)
+    renderer_for(geo_df).render(df_eff, f"Mapa Temático de Eficiência por Município - {year}", filename)
+
+
+def plot_map_stats(frames: dict[int, pd.DataFrame], geo_df, filename: str):
+    """Mapas de todos os anos empilhados, com média e moda da eficiência."""
+    fig, axes = plt.subplots(len(frames), 1, figsize=(12, 20))
+
+    cmap = "RdYlGn"
+    vmin, vmax = 0, 1
+
+    if len(frames) == 1:
+        axes = [axes]
+
+    for ax, (year, df_eff) in zip(axes, frames.items()):
+        _warn_unmatched(geo_df, df_eff, year)
+        collection = add_municipalities(ax, geo_df, cmap, vmin, vmax, linewidth=0.5)
+        collection.set_array(np.ma.masked_invalid(values_by_code(geo_df, df_eff)))
+        ax.set_title(f"Eficiência por Município - {year}", fontsize=14)
+
+        mean_val = df_eff["efficiency"].mean()
+        try:
+            mode_val = mode(round(v, 2) for v in df_eff["efficiency"])
+        except StatisticsError:
+            mode_val = None
+
+        stats_text = (
+            f"Média: {mean_val:.2f}\n"
+            f"Moda: {mode_val:.2f}" if isinstance(mode_val, float) else "Moda: N/A"
+        )
+
+        ax.text(
+            0.02, 0.05, stats_text,
+            transform=ax.transAxes,
+            fontsize=13,
+            fontweight="bold",
+            va="bottom",
+            ha="left",
+            linespacing=1.5,
+            bbox=dict(boxstyle="round,pad=0.5", facecolor="white", edgecolor="black", alpha=0.8)
+        )
+
+    cbar_ax = fig.add_axes([0.25, 0.92, 0.5, 0.01])
+    sm = plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(vmin=vmin, vmax=vmax))
+    cbar = fig.colorbar(sm, cax=cbar_ax, orientation="horizontal")
+    cbar.set_label("Eficiência DEA", fontsize=11)
+
+    plt.tight_layout(rect=[0, 0, 1, 0.9])
+    _savefig(filename)
+    plt.close()
+
+
+# cores dos clusters LISA, na ordem de ``spatial.CLUSTERS``
+LISA_COLORS = ["#eeeeee", "#d7191c", "#abd9e9", "#2c7bb6", "#fdae61"]
+
+
+def plot_lisa(result: SpatialResult, geo_df, filename: str):
+    """Mapa dos clusters LISA de um ano: hot spots (Alto-Alto) e cold spots (Baixo-Baixo)."""
+    fig, ax = plt.subplots(figsize=(14, 7))
+
+    cmap = ListedColormap(LISA_COLORS)
+    collection = add_municipalities(ax, geo_df, cmap, -0.5, len(LISA_COLORS) - 0.5, linewidth=0.5)
+    collection.set_array(np.ma.masked_invalid(values_by_code(geo_df, result.to_frame(), "cluster")))
+    ax.set_title(f"Clusters LISA da Eficiência por Município - {result.year}", fontsize=14)
+
+    counts = np.bincount(result.clusters, minlength=len(CLUSTERS))
+    ax.legend(
+        handles=[Patch(facecolor=color, edgecolor="0.5", label=f"{CLUSTERS[code]} ({counts[code]})")
+                 for code, color in enumerate(LISA_COLORS)],
+        loc="upper center",
+        bbox_to_anchor=(0.5, 0),
+        ncol=3,
+        fontsize=10,
+        title=f"Cluster (p ≤ {result.alpha:g})" if result.p_value is not None else "Cluster"
+    )
+
+    stats_text = f"I de Moran: {result.moran:.3f}\nEsperado: {result.expected:.3f}"
+    if result.p_value is not None:
+        stats_text += f"\np-valor: {result.p_value:.3f}"
+    ax.text(
+        0.98, 0.98, stats_text,
+        transform=ax.transAxes,
+        fontsize=12,
+        va="top",
+        ha="right",
+        linespacing=1.5,
+        bbox=dict(boxstyle="round,pad=0.5", facecolor="white", edgecolor="black", alpha=0.8)
+    )
+
+    plt.tight_layout()
+    _savefig(filename, bbox_inches="tight")
+    plt.close()
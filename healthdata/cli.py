@@ -0,0 +1,317 @@
+"""Linha de comando: ``python -m healthdata render --all --years 2021-2024``.
+
+Os subcomandos importam o que precisam só ao rodar: ``--help`` e
+``export`` não carregam pandas nem matplotlib.
+"""
+import argparse
+
+from healthdata import instrument
+from healthdata.families import DEFAULT_RANKS, FAMILY_NAMES
+from healthdata.output import PROFILES
+
+
+def parse_years(value: str) -> list[int]:
+    """Aceita ``2021-2024``, ``2021,2023`` ou combinações (``2019,2021-2024``)."""
+    years = []
+    for part in value.split(","):
+        start, _, end = part.strip().partition("-")
+        years.extend(range(int(start), int(end or start) + 1))
+    return sorted(set(years))
+
+
+def parse_rank(value: str) -> tuple[str, int]:
+    family, sep, rank = value.partition("=")
+    if not sep or family not in DEFAULT_RANKS:
+        raise argparse.ArgumentTypeError(
+            f"use FAMILIA=N com FAMILIA em {', '.join(DEFAULT_RANKS)}"
+        )
+    return family, int(rank)
+
+
+def parse_profile(value: str) -> tuple[str | None, str]:
+    """``NOME`` (todas as famílias) ou ``FAMILIA=NOME``."""
+    family, sep, name = value.rpartition("=")
+    if name not in PROFILES or (sep and family not in FAMILY_NAMES):
+        raise argparse.ArgumentTypeError(
+            f"use PERFIL ou FAMILIA=PERFIL com PERFIL em {', '.join(PROFILES)}"
+        )
+    return family or None, name
+
+
+def parse_caps(value: str) -> list[float]:
+    """Aceita ``0.8,0.9,1.0`` ou ``INICIO:FIM:PASSO`` (inclusivo), ex.: ``0.8:1.0:0.05``."""
+    caps = []
+    for part in value.split(","):
+        start, _, rest = part.strip().partition(":")
+        if not rest:
+            caps.append(float(start))
+            continue
+        stop, _, step = rest.partition(":")
+        count = round((float(stop) - float(start)) / float(step or 0.05)) + 1
+        caps.extend(float(start) + i * float(step or 0.05) for i in range(count))
+    return caps
+
+
+def parse_families(value: str) -> list[str]:
+    families = [family.strip() for family in value.split(",")]
+    unknown = [family for family in families if family not in FAMILY_NAMES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"famílias desconhecidas: {', '.join(unknown)}")
+    return families
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="healthdata", description="Gera os gráficos de eficiência DEA.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render = commands.add_parser("render", help="busca os dados uma vez e renderiza os gráficos")
+    selection = render.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--all", action="store_true", help="todas as famílias de gráfico")
+    selection.add_argument(
+        "--charts", type=parse_families, metavar="FAMILIAS",
+        help=f"lista separada por vírgula entre: {', '.join(FAMILY_NAMES)}",
+    )
+    render.add_argument("--years", type=parse_years, default=parse_years("2021-2024"),
+                        help="anos, ex.: 2021-2024 ou 2021,2023 (padrão: 2021-2024)")
+    render.add_argument("--rank", type=parse_rank, action="append", default=[], metavar="FAMILIA=N",
+                        help="sobrescreve o rank de uma família, ex.: --rank ranked=5")
+    render.add_argument("--profile", type=parse_profile, action="append", default=[], metavar="[FAMILIA=]PERFIL",
+                        help=f"perfil de saída ({', '.join(PROFILES)}) de todas as famílias ou de uma, "
+                             "ex.: --profile preview --profile map=pdf (padrão: publication)")
+    render.add_argument("--n-boot", type=int, default=0, metavar="N",
+                        help="reamostragens bootstrap do intervalo das correlações (padrão: 0, sem intervalo)")
+    render.add_argument("--n-perm", type=int, default=0, metavar="N",
+                        help="permutações dos p-valores das correlações (padrão: 0, sem p-valores)")
+    render.add_argument("--processes", type=int, default=None, metavar="N",
+                        help="processos de renderização (padrão: número de CPUs; 1 = sem pool)")
+    render.add_argument("--force", action="store_true",
+                        help="renderiza mesmo os gráficos cujas entradas não mudaram")
+    render.add_argument("--report", action="store_true",
+                        help="imprime ao final o tempo por estágio e os jobs mais lentos")
+    render.add_argument("--trace", metavar="ARQUIVO",
+                        help="acrescenta os eventos de instrumentação (JSON lines) a ARQUIVO")
+    render.add_argument("--profile-dir", metavar="DIR",
+                        help="grava um perfil de cada gráfico em DIR")
+    render.add_argument("--profiler", choices=instrument.PROFILERS, default="cprofile",
+                        help="profiler usado com --profile-dir (padrão: cprofile)")
+
+    report = commands.add_parser("report", help="resume um arquivo de trace por estágio, script e job")
+    report.add_argument("trace", metavar="ARQUIVO", help="arquivo JSON lines gravado com --trace")
+    report.add_argument("--top", type=int, default=10, help="quantos jobs mais lentos listar (padrão: 10)")
+
+    export = commands.add_parser("export", help="grava os dados da API em arquivos, sem renderizar")
+    export.add_argument("--dataset", choices=["indicators", "ranked", "redistributed"], default="indicators",
+                        help="dataset a exportar (padrão: indicators)")
+    export.add_argument("--years", type=parse_years, default=parse_years("2021-2024"),
+                        help="anos, ex.: 2021-2024 ou 2021,2023 (padrão: 2021-2024)")
+    export.add_argument("--rank", type=int, default=None, metavar="N",
+                        help="rank dos datasets ranked e redistributed")
+    export.add_argument("--columns", type=lambda value: [col.strip() for col in value.split(",")],
+                        metavar="COLUNAS", help="colunas separadas por vírgula (padrão: todas)")
+    export.add_argument("--format", choices=["csv", "parquet", "arrow", "json"], default="csv",
+                        help="formato dos arquivos (padrão: csv)")
+    export.add_argument("--output", default="exports", metavar="DIR", help="diretório de saída (padrão: exports)")
+
+    sweep = commands.add_parser("sweep", help="varre cenários de redistribuição (rank × teto × política)")
+    sweep.add_argument("--years", type=parse_years, default=parse_years("2021-2024"),
+                       help="anos, ex.: 2021-2024 ou 2021,2023 (padrão: 2021-2024)")
+    sweep.add_argument("--ranks", type=parse_years, default=parse_years("3-50"),
+                       help="ranks, mesma sintaxe dos anos (padrão: 3-50)")
+    sweep.add_argument("--caps", type=parse_caps, default=parse_caps("0.8:1.0:0.05"),
+                       help="tetos de eficiência, ex.: 0.9,1.0 ou 0.8:1.0:0.05 (padrão)")
+    sweep.add_argument("--policies", type=lambda value: [p.strip() for p in value.split(",")],
+                       default=["equal", "gap", "capped"], metavar="POLITICAS",
+                       help="políticas separadas por vírgula (padrão: equal,gap,capped)")
+    sweep.add_argument("--mode", choices=["local", "api"], default="local",
+                       help="local: simula a partir dos indicadores; api: um POST por ano e rank (padrão: local)")
+    sweep.add_argument("--processes", type=int, default=None, metavar="N",
+                       help="processos da simulação local (padrão: número de CPUs; 1 = sem pool)")
+    sweep.add_argument("--concurrency", type=int, default=None, metavar="N",
+                       help="requisições simultâneas (padrão: tamanho do pool de conexões)")
+    sweep.add_argument("--output", default="resources/sweep", metavar="DIR",
+                       help="diretório da tabela, dos gráficos e do checkpoint (padrão: resources/sweep)")
+    sweep.add_argument("--no-plots", action="store_true", help="grava só a tabela")
+
+    forecast = commands.add_parser("forecast", help="prevê a eficiência do próximo bimestre de todas as cidades")
+    forecast.add_argument("--years", type=parse_years, default=parse_years("2021-2024"),
+                          help="anos do histórico, ex.: 2021-2024 ou 2021,2023 (padrão: 2021-2024)")
+    forecast.add_argument("--models", type=lambda value: [m.strip() for m in value.split(",")],
+                          default=None, metavar="MODELOS",
+                          help="modelos separados por vírgula entre: seasonal, ses, linear (padrão: todos)")
+    forecast.add_argument("--horizon", type=int, default=1, metavar="N",
+                          help="quantos bimestres prever (padrão: 1)")
+    forecast.add_argument("--rank", type=int, default=10, metavar="N",
+                          help="cidades Top/Bottom N pela previsão nos gráficos (padrão: 10)")
+    forecast.add_argument("--concurrency", type=int, default=None, metavar="N",
+                          help="requisições simultâneas (padrão: tamanho do pool de conexões)")
+    forecast.add_argument("--output", default="resources/forecast", metavar="DIR",
+                          help="diretório das tabelas e dos gráficos (padrão: resources/forecast)")
+    forecast.add_argument("--no-plots", action="store_true", help="grava só as tabelas")
+
+    dea = commands.add_parser("dea", help="recalcula a eficiência DEA localmente e compara com a da API")
+    dea.add_argument("--years", type=parse_years, default=parse_years("2021-2024"),
+                     help="anos, ex.: 2021-2024 ou 2021,2023 (padrão: 2021-2024)")
+    dea.add_argument("--model", choices=["ccr", "bcc"], default="ccr", help="retornos de escala (padrão: ccr)")
+    dea.add_argument("--orientation", choices=["input", "output"], default="input",
+                     help="orientação do modelo (padrão: input)")
+    dea.add_argument("--super-efficiency", action="store_true",
+                     help="supereficiência: cada DMU fora do próprio conjunto de referência")
+    dea.add_argument("--by", choices=["year", "bimonthly"], default="year",
+                     help="conjunto de referência: o ano inteiro ou cada bimestre (padrão: year)")
+    dea.add_argument("--batch-size", type=int, default=64, metavar="N", help="DMUs por LP em lote (padrão: 64)")
+    dea.add_argument("--workers", type=int, default=None, metavar="N",
+                     help="processos dos lotes (padrão: número de CPUs; 1 = sem pool)")
+    dea.add_argument("--concurrency", type=int, default=None, metavar="N",
+                     help="requisições simultâneas (padrão: tamanho do pool de conexões)")
+    dea.add_argument("--output", default="resources/dea", metavar="DIR",
+                     help="diretório da tabela (padrão: resources/dea)")
+
+    spatial = commands.add_parser("spatial", help="I de Moran e clusters LISA da eficiência de cada ano")
+    spatial.add_argument("--years", type=parse_years, default=parse_years("2021-2024"),
+                         help="anos, ex.: 2021-2024 ou 2021,2023 (padrão: 2021-2024)")
+    spatial.add_argument("--contiguity", choices=["queen", "rook"], default="queen",
+                         help="vizinhos por qualquer ponto (queen) ou por trecho de fronteira (rook) (padrão: queen)")
+    spatial.add_argument("--permutations", type=int, default=999, metavar="N",
+                         help="permutações da inferência (padrão: 999; 0 = sem p-valores)")
+    spatial.add_argument("--alpha", type=float, default=0.05, help="nível de significância dos clusters (padrão: 0.05)")
+    spatial.add_argument("--seed", type=int, default=None, help="semente das permutações")
+    spatial.add_argument("--concurrency", type=int, default=None, metavar="N",
+                         help="requisições simultâneas (padrão: tamanho do pool de conexões)")
+    spatial.add_argument("--output", default="resources/spatial", metavar="DIR",
+                         help="diretório das tabelas e dos mapas (padrão: resources/spatial)")
+    spatial.add_argument("--no-plots", action="store_true", help="grava só as tabelas")
+
+    webmap = commands.add_parser("webmap", help="grava a malha municipal com a eficiência de cada ano em TopoJSON")
+    webmap.add_argument("--years", type=parse_years, default=parse_years("2021-2024"),
+                        help="anos, ex.: 2021-2024 ou 2021,2023 (padrão: 2021-2024)")
+    webmap.add_argument("--tolerance", type=float, default=250.0, metavar="METROS",
+                        help="tolerância da simplificação em metros (padrão: 250; 0 = sem simplificar)")
+    webmap.add_argument("--quantize", type=float, default=30_000, metavar="N",
+                        help="passos da quantização em cada eixo (padrão: 30000)")
+    webmap.add_argument("--tiles", action="store_true",
+                        help="grava também Mapbox Vector Tiles (requer mapbox-vector-tile)")
+    webmap.add_argument("--max-zoom", type=int, default=8, metavar="Z", help="zoom máximo dos tiles (padrão: 8)")
+    webmap.add_argument("--output", default="exports/webmap", metavar="DIR",
+                        help="diretório de saída (padrão: exports/webmap)")
+
+    ingest = commands.add_parser("ingest", help="grava os indicadores dos anos no armazenamento colunar")
+    ingest.add_argument("--years", type=parse_years, default=parse_years("2021-2024"),
+                        help="anos, ex.: 2021-2024 ou 2021,2023 (padrão: 2021-2024)")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "render":
+        from healthdata import pipeline
+
+        families = list(FAMILY_NAMES) if args.all else args.charts
+        profiles = {}
+        for family, name in args.profile:
+            profiles.update({family: name} if family else dict.fromkeys(FAMILY_NAMES, name))
+        charts = pipeline.plan(families, args.years, dict(args.rank), profiles, args.n_boot, args.n_perm)
+        instrument.configure(args.trace, args.profile_dir, args.profiler)
+        errors = pipeline.run(charts, processes=args.processes, force=args.force, report=args.report)
+        return 1 if errors else 0
+
+    if args.command == "export":
+        from healthdata.export import export
+
+        if args.dataset != "indicators" and args.rank is None:
+            build_parser().error(f"--rank é obrigatório para o dataset {args.dataset}")
+        _, errors = export(args.dataset, args.years, args.rank, args.columns, args.format, args.output)
+        return 1 if errors else 0
+
+    if args.command == "sweep":
+        import os
+
+        from healthdata import sweep
+
+        try:
+            scenarios = sweep.grid(args.years, args.ranks, args.caps, args.policies, args.mode)
+        except ValueError as e:
+            build_parser().error(str(e))
+        results = sweep.run_sweep(
+            scenarios, mode=args.mode, processes=args.processes, concurrency=args.concurrency,
+            checkpoint=os.path.join(args.output, "checkpoint.jsonl"),
+        )
+        for path in sweep.save_results(results, args.output, plots=not args.no_plots):
+            print(f"Resultados salvos em {path}")
+        return 0 if len(results) == len(scenarios) else 1
+
+    if args.command == "forecast":
+        from healthdata import forecast
+
+        try:
+            models = forecast.check_models(args.models)
+        except ValueError as e:
+            build_parser().error(str(e))
+        panel = forecast.load_panel(years=args.years, concurrency=args.concurrency)
+        predictions = forecast.forecast(panel, models, args.horizon)
+        errors = forecast.backtest(panel, models, args.horizon)
+        if not errors.empty:
+            print(forecast.summary(errors).to_string(float_format="{:.4f}".format))
+        for path in forecast.save_results(panel, predictions, errors, args.output, args.rank, not args.no_plots):
+            print(f"Resultados salvos em {path}")
+        return 0
+
+    if args.command == "dea":
+        from healthdata import dea
+
+        frames = dea.load_frames(years=args.years, concurrency=args.concurrency)
+        table = dea.score_years(
+            frames, by=None if args.by == "year" else args.by, model=args.model, orientation=args.orientation,
+            super_efficiency=args.super_efficiency, batch_size=args.batch_size, workers=args.workers,
+        )
+        print(dea.summary(table).to_string(index=False, float_format="{:.4f}".format))
+        for path in dea.save_results(table, args.output):
+            print(f"Resultados salvos em {path}")
+        return 0 if len(frames) == len(args.years) else 1
+
+    if args.command == "spatial":
+        from healthdata import spatial
+
+        weights = spatial.load_weights(kind=args.contiguity)
+        frames = spatial.load_frames(years=args.years, concurrency=args.concurrency)
+        results = []
+        for year, df in frames.items():
+            try:
+                results.append(spatial.moran_lisa(weights, df, year, args.permutations, args.alpha, args.seed))
+            except ValueError as e:
+                print(f"[spatial year={year}] Erro: {e}")
+        if not results:
+            return 1
+        print(spatial.summary(results).to_string(index=False, float_format="{:.4f}".format))
+        for path in spatial.save_results(results, args.output, plots=not args.no_plots):
+            print(f"Resultados salvos em {path}")
+        return 0 if len(results) == len(args.years) else 1
+
+    if args.command == "webmap":
+        from healthdata.webmap import export_webmap
+
+        try:
+            written = export_webmap(args.years, args.tolerance, args.quantize, args.output, args.tiles, args.max_zoom)
+        except RuntimeError as e:
+            print(f"[webmap] Erro: {e}")
+            return 1
+        return 0 if len(written) == len(args.years) else 1
+
+    if args.command == "report":
+        print(instrument.summary(instrument.read_trace(args.trace), top=args.top))
+        return 0
+
+    if args.command == "ingest":
+        from healthdata.client import DeaClient
+        from healthdata.fetch import FetchJob, fetch_all
+        from healthdata.store import IndicatorStore
+
+        store = IndicatorStore()
+        jobs = {year: FetchJob("first_semester", year) for year in args.years}
+        results, errors = fetch_all(DeaClient(), list(jobs.values()))
+        for year, job in jobs.items():
+            if job in results:
+                store.ingest(year, results[job])
+                print(f"Ano {year} gravado em {store.path}")
+        return 1 if errors else 0
+    return 0
@@ -0,0 +1,275 @@
+"""Cliente HTTP compartilhado para a API DEA (localhost:8080).
+
+Todas as chamadas passam por uma única ``requests.Session`` com pool de
+conexões keep-alive, timeouts e retentativas com backoff exponencial. As
+respostas GET passam pelo ``ResponseCache`` em disco, quando habilitado.
+
+A sessão (e o ``requests``) só é criada na primeira requisição, e pandas
+só é importado pelas variantes ``*_frame``: um acerto de cache lido com as
+variantes ``*_table`` não carrega nenhum dos dois.
+"""
+import os
+import threading
+from collections.abc import Callable
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from healthdata import instrument
+from healthdata.cache import CacheMissError, ResponseCache
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+    import requests
+
+DEFAULT_BASE_URL = "http://localhost:8080"
+FIRST_SEMESTER_PATH = "/api/dea/indicators/first-semester"
+RANKED_PATH = FIRST_SEMESTER_PATH + "/ranked"
+REDISTRIBUTED_PATH = RANKED_PATH + "/redistributed"
+CITY_PATH = "/api/city"
+LEGACY_EFFICIENCY_PATH = "/api/efficiency"
+LEGACY_RANKED_PATH = LEGACY_EFFICIENCY_PATH + "/ranked"
+LEGACY_REDISTRIBUTE_PATH = LEGACY_RANKED_PATH + "/redistribute"
+
+Records = list[dict[str, Any]]
+
+
+def _arrow_table(df: "pd.DataFrame"):
+    import pyarrow as pa
+
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+
+
+class DeaClient:
+    """Acesso tipado aos endpoints da API DEA sobre uma sessão com pool.
+
+    ``timeout`` segue a convenção do requests: um número ou uma tupla
+    ``(connect, read)`` em segundos. ``retries`` e ``backoff_factor`` valem
+    para falhas de conexão e respostas 429/5xx de métodos idempotentes (o
+    padrão do urllib3; POST nunca é repetido); ``pool_maxsize`` limita o
+    número de conexões simultâneas abertas com o servidor.
+
+    ``cache=True`` usa ``ResponseCache.from_env()``; ``False`` desliga o
+    cache e uma instância de ``ResponseCache`` é usada diretamente.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        timeout: float | tuple[float, float] = (5, 30),
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        pool_maxsize: int = 10,
+        cache: ResponseCache | bool = True,
+    ):
+        self.base_url = (base_url or os.environ.get("HEALTHDATA_API_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_maxsize = pool_maxsize
+        if cache is True:
+            cache = ResponseCache.from_env()
+        self.cache = cache or None
+        self._session: "requests.Session | None" = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> "requests.Session":
+        """Sessão com pool e retentativas, criada no primeiro uso."""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                retry = Retry(
+                    total=self.retries,
+                    backoff_factor=self.backoff_factor,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(max_retries=retry, pool_maxsize=self.pool_maxsize, pool_block=True)
+
+                self._session = requests.Session()
+                self._session.mount("http://", adapter)
+                self._session.mount("https://", adapter)
+            return self._session
+
+    def _request(self, method: str, path: str, params: dict | None = None) -> Any:
+        if method == "GET" and self.cache is not None:
+
+            def from_response(key, response):
+                with instrument.span("decode", bytes=len(response.content)):
+                    data = response.json()
+                self.cache.store(key, path, params, data, response.content, response.headers.get("ETag"))
+                return data
+
+            return self._cached_get(path, params, self.cache.load, from_response)
+        with instrument.request(path, method) as request:
+            response = request.send(
+                lambda: self.session.request(method, self.base_url + path, params=params, timeout=self.timeout)
+            )
+            response.raise_for_status()
+            with instrument.span("decode", bytes=len(response.content)):
+                return response.json()
+
+    def _request_frame(
+        self, method: str, path: str, params: dict | None, columns: list[str] | None, dtypes: dict[str, str] | None
+    ) -> "pd.DataFrame":
+        """Como ``_request``, mas lê o corpo em streaming direto para um DataFrame.
+
+        Com cache, a resposta inteira é gravada e só ``columns`` é lida de
+        volta; sem cache, só ``columns`` chega a ser guardada na memória.
+        """
+        from healthdata import ingest
+
+        if method == "GET" and self.cache is not None:
+
+            def from_cache(key):
+                return ingest.table_frame(self.cache.load_table(key, columns), dtypes=dtypes)
+
+            def from_response(key, response):
+                reader = ingest.HashingReader(response.raw)
+                df = ingest.read_frame(reader)
+                build = partial(_arrow_table, df)
+                self.cache.store_table(key, path, params, build, reader.hexdigest(), response.headers.get("ETag"))
+                return ingest.project(df, columns, dtypes)
+
+            return self._cached_get(path, params, from_cache, from_response)
+
+        with instrument.request(path, method) as request, request.send(
+            lambda: self.session.request(method, self.base_url + path, params=params, timeout=self.timeout, stream=True)
+        ) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            return ingest.read_frame(ingest.HashingReader(response.raw), columns, dtypes)
+
+    def _request_table(self, method: str, path: str, params: dict | None, columns: list[str] | None) -> "pa.Table":
+        """Como ``_request_frame``, mas devolve uma tabela Arrow e não usa pandas."""
+        if method == "GET" and self.cache is not None:
+
+            def from_response(key, response):
+                from healthdata import ingest
+
+                reader = ingest.HashingReader(response.raw)
+                table = ingest.read_table(reader)
+                etag = response.headers.get("ETag")
+                self.cache.store_table(key, path, params, lambda: table, reader.hexdigest(), etag)
+                return ingest.select(table, columns)
+
+            return self._cached_get(path, params, partial(self.cache.load_table, columns=columns), from_response)
+
+        from healthdata import ingest
+
+        with instrument.request(path, method) as request, request.send(
+            lambda: self.session.request(method, self.base_url + path, params=params, timeout=self.timeout, stream=True)
+        ) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            return ingest.read_table(ingest.HashingReader(response.raw), columns)
+
+    def _cached_get(
+        self, path: str, params: dict | None, from_cache: Callable[[str], Any], from_response: Callable[[str, Any], Any]
+    ) -> Any:
+        key = self.cache.key(path, params)
+        meta = self.cache.meta(key)
+        if meta is not None and (self.cache.offline or self.cache.is_fresh(meta)):
+            with instrument.span("cache", endpoint=path):
+                return from_cache(key)
+        if self.cache.offline:
+            raise CacheMissError(f"{path} {params or ''} não está no cache (modo offline)")
+
+        headers = {"If-None-Match": meta["etag"]} if meta and meta.get("etag") else None
+        with instrument.request(path) as request, request.send(
+            lambda: self.session.get(
+                self.base_url + path, params=params, headers=headers, timeout=self.timeout, stream=True
+            )
+        ) as response:
+            if response.status_code == 304 and meta is not None:
+                self.cache.touch(key, meta)
+                with instrument.span("cache", endpoint=path):
+                    return from_cache(key)
+            response.raise_for_status()
+            response.raw.decode_content = True
+            return from_response(key, response)
+
+    def first_semester(self, year: int) -> Records:
+        """GET /api/dea/indicators/first-semester -> indicadores de todas as cidades."""
+        return self._request("GET", FIRST_SEMESTER_PATH, {"year": year})
+
+    def ranked(self, year: int, rank: int) -> Records:
+        """GET .../ranked -> indicadores das ``rank`` melhores e piores cidades."""
+        return self._request("GET", RANKED_PATH, {"year": year, "rank": rank})
+
+    def cached_ranks(self, year: int) -> list[int]:
+        """Ranks de ``ranked`` do ano que o cache serve sem ir à rede (frescos, ou qualquer um offline)."""
+        if self.cache is None:
+            return []
+        return sorted(
+            meta["params"]["rank"]
+            for _, meta in self.cache.entries(RANKED_PATH)
+            if meta["params"].get("year") == year and (self.cache.offline or self.cache.is_fresh(meta))
+        )
+
+    def ranked_redistributed(self, year: int, rank: int) -> Records:
+        """POST .../ranked/redistributed -> eficiência após a redistribuição."""
+        return self._request("POST", REDISTRIBUTED_PATH, {"year": year, "rank": rank})
+
+    def first_semester_frame(
+        self, year: int, columns: list[str] | None = None, dtypes: dict[str, str] | None = None
+    ) -> "pd.DataFrame":
+        """``first_semester`` lido em streaming, só com ``columns`` e convertido para ``dtypes``."""
+        return self._request_frame("GET", FIRST_SEMESTER_PATH, {"year": year}, columns, dtypes)
+
+    def ranked_frame(
+        self, year: int, rank: int, columns: list[str] | None = None, dtypes: dict[str, str] | None = None
+    ) -> "pd.DataFrame":
+        """``ranked`` lido em streaming para um DataFrame."""
+        return self._request_frame("GET", RANKED_PATH, {"year": year, "rank": rank}, columns, dtypes)
+
+    def ranked_redistributed_frame(
+        self, year: int, rank: int, columns: list[str] | None = None, dtypes: dict[str, str] | None = None
+    ) -> "pd.DataFrame":
+        """``ranked_redistributed`` lido em streaming para um DataFrame."""
+        return self._request_frame("POST", REDISTRIBUTED_PATH, {"year": year, "rank": rank}, columns, dtypes)
+
+    def first_semester_table(self, year: int, columns: list[str] | None = None) -> "pa.Table":
+        """``first_semester`` como tabela Arrow (acertos de cache não importam pandas nem requests)."""
+        return self._request_table("GET", FIRST_SEMESTER_PATH, {"year": year}, columns)
+
+    def ranked_table(self, year: int, rank: int, columns: list[str] | None = None) -> "pa.Table":
+        """``ranked`` como tabela Arrow."""
+        return self._request_table("GET", RANKED_PATH, {"year": year, "rank": rank}, columns)
+
+    def ranked_redistributed_table(self, year: int, rank: int, columns: list[str] | None = None) -> "pa.Table":
+        """``ranked_redistributed`` como tabela Arrow."""
+        return self._request_table("POST", REDISTRIBUTED_PATH, {"year": year, "rank": rank}, columns)
+
+    def cities(self) -> Records:
+        """GET /api/city -> lista de cidades com ``id`` e ``name``."""
+        return self._request("GET", CITY_PATH)
+
+    def legacy_efficiency(self, year: int) -> Records:
+        """GET /api/efficiency/{year} -> blocos ``{city, efficiencies[], avgEfficiency}`` de todas as cidades."""
+        return self._request("GET", f"{LEGACY_EFFICIENCY_PATH}/{year}")
+
+    def legacy_ranked(self, year: int) -> dict:
+        """GET /api/efficiency/ranked/{year} -> blocos 'top' e 'down'."""
+        return self._request("GET", f"{LEGACY_RANKED_PATH}/{year}")
+
+    def legacy_redistribute(self, year: int) -> dict:
+        """POST /api/efficiency/ranked/redistribute/{year} -> blocos 'real' e 'redistributed'."""
+        return self._request("POST", f"{LEGACY_REDISTRIBUTE_PATH}/{year}")
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
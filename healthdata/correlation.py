@@ -0,0 +1,202 @@
+"""Correlação de vários anos num único passe vetorizado.
+
+Os anos são empilhados num array ``(ano, observação, variável)``; anos com
+menos linhas são completados com NaN e uma máscara marca os valores
+válidos. Pearson e Spearman (Pearson sobre postos) saem de produtos
+matriciais em lote, com exclusão par a par de ausentes como
+``DataFrame.corr``: se as linhas válidas mudam de uma variável para outra,
+o Spearman ranqueia cada par de novo só nas linhas completas do par.
+Intervalos bootstrap e p-valores de permutação
+reamostram todos os anos de uma vez, em blocos de ``chunk`` reamostragens
+para limitar a memória.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+CORRELATION_COLS = {
+    "apsPerCapita": "Orçamento APS per capita",
+    "teamsDensity": "Densidade de equipes",
+    "healthCareVisitsPerThousandReais": "Qtd consultas por mil R$",
+    "cobertura": "Cobertura (%)",
+    "productivity": "Produtividade",
+    "efficiency": "Eficiência"
+}
+
+METHODS = ("pearson", "spearman")
+
+
+@dataclass
+class CorrelationResult:
+    """Matrizes ``(ano, var, var)`` de correlação e, se pedidos, IC e p-valores."""
+
+    years: list[int]
+    columns: list[str]
+    method: str
+    r: np.ndarray
+    n: np.ndarray
+    ci_low: np.ndarray | None = None
+    ci_high: np.ndarray | None = None
+    p_values: np.ndarray | None = None
+    confidence: float | None = None
+
+    def matrix(self, year: int, labels: dict[str, str] | None = None) -> pd.DataFrame:
+        """Matriz de um ano como DataFrame, com rótulos opcionais (ex.: ``CORRELATION_COLS``)."""
+        names = [labels.get(col, col) for col in self.columns] if labels else self.columns
+        return pd.DataFrame(self.r[self.years.index(year)], index=names, columns=names)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Tabela longa: uma linha por ano e par de variáveis (``i < j``)."""
+        i, j = np.triu_indices(len(self.columns), k=1)
+        rows = {
+            "year": np.repeat(self.years, len(i)),
+            "x": np.tile(np.asarray(self.columns)[i], len(self.years)),
+            "y": np.tile(np.asarray(self.columns)[j], len(self.years)),
+            "r": self.r[:, i, j].ravel(),
+            "n": self.n[:, i, j].ravel(),
+        }
+        for name in ("ci_low", "ci_high", "p_values"):
+            values = getattr(self, name)
+            if values is not None:
+                rows[name] = values[:, i, j].ravel()
+        return pd.DataFrame(rows)
+
+
+def stack_years(frames: dict[int, pd.DataFrame], columns: list[str]) -> tuple[list[int], np.ndarray, np.ndarray]:
+    """``(anos, valores, máscara)`` com ``valores`` de forma ``(ano, obs, var)``."""
+    years = list(frames)
+    rows = max((len(df) for df in frames.values()), default=0)
+    values = np.full((len(years), rows, len(columns)), np.nan)
+    for y, year in enumerate(years):
+        missing = [col for col in columns if col not in frames[year].columns]
+        if missing:
+            raise ValueError(f"Colunas ausentes no DataFrame de {year}: {missing}")
+        values[y, :len(frames[year])] = frames[year][columns].to_numpy(dtype=float)
+    return years, values, ~np.isnan(values)
+
+
+def _ranks(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Postos médios ao longo das observações; ausentes vão para o fim e ficam mascarados."""
+    from scipy.stats import rankdata
+
+    return rankdata(np.where(mask, values, np.inf), method="average", axis=-2)
+
+
+def _pearson(values: np.ndarray, mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Pearson par a par em ``(..., obs, var)`` -> ``(r, n)`` de forma ``(..., var, var)``."""
+    m = mask.astype(float)
+    count = np.maximum(m.sum(axis=-2, keepdims=True), 1)
+    x = np.where(mask, values, 0.0)
+    x = (x - x.sum(axis=-2, keepdims=True) / count) * m  # centra por coluna (melhora a precisão)
+
+    mt = np.swapaxes(m, -1, -2)
+    n = mt @ m
+    sx = np.swapaxes(x, -1, -2) @ m
+    sxy = np.swapaxes(x, -1, -2) @ x
+    sxx = np.swapaxes(x * x, -1, -2) @ m
+    sy = np.swapaxes(sx, -1, -2)
+    syy = np.swapaxes(sxx, -1, -2)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        r = cov / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    r = np.where(n > 1, np.clip(r, -1, 1), np.nan)
+    return r, n
+
+
+def _pearson_pairs(x: np.ndarray, y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Pearson coluna a coluna entre ``x`` e ``y`` de forma ``(..., obs, par)``, só nas linhas de ``mask``."""
+    m = mask.astype(float)
+    n = m.sum(axis=-2)
+    count = np.maximum(n, 1)[..., None, :]
+    x, y = np.where(mask, x, 0.0), np.where(mask, y, 0.0)
+    x = (x - x.sum(axis=-2, keepdims=True) / count) * m
+    y = (y - y.sum(axis=-2, keepdims=True) / count) * m
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (x * y).sum(axis=-2) / np.sqrt((x * x).sum(axis=-2) * (y * y).sum(axis=-2))
+    return np.where(n > 1, np.clip(r, -1, 1), np.nan)
+
+
+def _correlate(values: np.ndarray, mask: np.ndarray, method: str) -> tuple[np.ndarray, np.ndarray]:
+    if method == "pearson":
+        return _pearson(values, mask)
+    r, n = _pearson(_ranks(values, mask), mask)
+    if not (mask == mask[..., :1]).all():
+        # ausências diferentes entre variáveis: postos refeitos nas linhas completas de cada par
+        i, j = np.triu_indices(values.shape[-1], k=1)
+        both = mask[..., i] & mask[..., j]
+        paired = _pearson_pairs(_ranks(values[..., i], both), _ranks(values[..., j], both), both)
+        r[..., i, j] = r[..., j, i] = paired
+    return r, n
+
+
+def _gather(values: np.ndarray, mask: np.ndarray, idx: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Seleciona linhas ``idx`` de forma ``(b, ano, obs)`` ou ``(b, ano, obs, var)``."""
+    years = np.arange(values.shape[0])[None, :, None]
+    if idx.ndim == 3:
+        return values[years, idx], mask[years, idx]
+    cols = np.arange(values.shape[2])
+    return values[years[..., None], idx, cols], mask[years[..., None], idx, cols]
+
+
+def _row_counts(mask: np.ndarray) -> np.ndarray:
+    """Número de linhas de cada ano (as de preenchimento ficam no fim)."""
+    filled = mask.any(axis=-1)
+    return np.where(filled.any(axis=-1), filled.shape[1] - np.argmax(filled[:, ::-1], axis=-1), 0)
+
+
+def correlate(
+    frames: dict[int, pd.DataFrame],
+    columns: list[str] | None = None,
+    method: str = "pearson",
+    n_boot: int = 0,
+    n_perm: int = 0,
+    confidence: float = 0.95,
+    seed: int | None = None,
+    chunk: int = 500,
+) -> CorrelationResult:
+    """Correlação de ``columns`` (padrão ``CORRELATION_COLS``) em todos os anos de ``frames``.
+
+    ``n_boot`` > 0 adiciona o intervalo percentil ``confidence`` por
+    bootstrap de linhas; ``n_perm`` > 0 adiciona p-valores bilaterais de
+    permutação (cada coluna embaralhada de forma independente dentro do ano).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método de correlação desconhecido: {method!r} (use {METHODS})")
+    columns = list(columns or CORRELATION_COLS)
+    years, values, mask = stack_years(frames, columns)
+    r, n = _correlate(values, mask, method)
+    result = CorrelationResult(years, columns, method, r, n)
+
+    rng = np.random.default_rng(seed)
+    rows = _row_counts(mask)
+    shape = values.shape
+
+    if n_boot > 0:
+        samples = []
+        for start in range(0, n_boot, chunk):
+            b = min(chunk, n_boot - start)
+            # índice uniforme em [0, linhas do ano); linhas de preenchimento nunca são sorteadas
+            idx = (rng.random((b, shape[0], shape[1])) * rows[None, :, None]).astype(np.intp)
+            idx_mask = np.arange(shape[1]) < rows[:, None]
+            sample_values, sample_mask = _gather(values, mask, idx)
+            samples.append(_correlate(sample_values, sample_mask & idx_mask[None, :, :, None], method)[0])
+        samples = np.concatenate(samples)
+        alpha = (1 - confidence) / 2
+        result.ci_low, result.ci_high = np.nanquantile(samples, [alpha, 1 - alpha], axis=0)
+        result.confidence = confidence
+
+    if n_perm > 0:
+        exceed = np.zeros_like(r)
+        valid = np.arange(shape[1])[None, :, None] < rows[:, None, None]
+        for start in range(0, n_perm, chunk):
+            b = min(chunk, n_perm - start)
+            # argsort de chaves aleatórias = uma permutação por coluna; preenchimento fica no fim
+            keys = np.where(valid, rng.random((b, *shape)), np.inf)
+            idx = np.argsort(keys, axis=-2)
+            perm_r = _correlate(*_gather(values, mask, idx), method)[0]
+            exceed += (np.abs(perm_r) >= np.abs(r) - 1e-12).sum(axis=0)
+        result.p_values = (exceed + 1) / (n_perm + 1)
+
+    return result
@@ -0,0 +1,208 @@
+"""Solver DEA local (CCR/BCC, orientado a input ou output) com LPs em lote.
+
+Permite recalcular a eficiência das DMUs (cidade × bimestre) a partir das
+mesmas colunas que a API devolve, sem ida ao backend, para rodar cenários
+hipotéticos de ranking, correlação e redistribuição.
+
+``python -m healthdata dea`` recalcula os anos pedidos e compara com a
+eficiência devolvida pela API.
+
+Em vez de um ``linprog`` por DMU, os problemas de envelopamento de
+``batch_size`` DMUs são empilhados num único LP bloco-diagonal esparso e
+resolvidos com o HiGHS numa só chamada; os lotes podem ser distribuídos
+entre processos. O ``linprog`` do SciPy não expõe warm start do HiGHS, então
+o ganho vem de montar a matriz base uma vez e amortizar a chamada por lote.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import linprog
+
+INPUTS = ("apsPerCapita", "teamsDensity")
+OUTPUTS = ("cobertura", "healthCareVisitsPerThousandReais", "productivity")
+MODELS = ("ccr", "bcc")
+ORIENTATIONS = ("input", "output")
+DEA_DIR = "resources/dea"
+DEA_COLUMNS = ("cityId", "cityName", "bimonthly", *INPUTS, *OUTPUTS, "efficiency")
+
+
+def _solve_batch(X, Y, dmus, model, orientation, super_efficiency) -> np.ndarray:
+    """Eficiência das ``dmus`` (índices) resolvendo um LP bloco-diagonal."""
+    m, n = X.shape
+    s = Y.shape[0]
+    base = np.vstack([X, -Y])
+    blocks_ub, b_ub, blocks_eq, bounds = [], [], [], []
+
+    for o in dmus:
+        if orientation == "input":
+            # min θ  s.a.  Xλ - θx_o <= 0,  -Yλ <= -y_o
+            column = np.concatenate([-X[:, o], np.zeros(s)])
+            b_ub.append(np.concatenate([np.zeros(m), -Y[:, o]]))
+        else:
+            # max φ  s.a.  Xλ <= x_o,  φy_o - Yλ <= 0
+            column = np.concatenate([np.zeros(m), Y[:, o]])
+            b_ub.append(np.concatenate([X[:, o], np.zeros(s)]))
+        blocks_ub.append(np.column_stack([column, base]))
+        if model == "bcc":
+            blocks_eq.append(np.concatenate([[0.0], np.ones(n)])[None, :])
+        lam_bounds = [(0, None)] * n
+        if super_efficiency:
+            lam_bounds[o] = (0, 0)
+        bounds.extend([(None, None)] + lam_bounds)
+
+    k = len(dmus)
+    c = np.zeros(k * (n + 1))
+    c[:: n + 1] = 1.0 if orientation == "input" else -1.0
+    result = linprog(
+        c,
+        A_ub=sparse.block_diag(blocks_ub, format="csr"),
+        b_ub=np.concatenate(b_ub),
+        A_eq=sparse.block_diag(blocks_eq, format="csr") if blocks_eq else None,
+        b_eq=np.ones(k) if blocks_eq else None,
+        bounds=bounds,
+        method="highs",
+    )
+    if result.status != 0:
+        if k == 1:
+            return np.array([np.nan])
+        # um problema inviável (ex.: supereficiência BCC) invalida o lote inteiro
+        return np.concatenate([_solve_batch(X, Y, [o], model, orientation, super_efficiency) for o in dmus])
+
+    score = result.x[:: n + 1]
+    return score if orientation == "input" else 1.0 / score
+
+
+def _solve_batch_args(args):
+    return _solve_batch(*args)
+
+
+def _scale(values: np.ndarray) -> np.ndarray:
+    """Média de cada coluna, trocada por 1 onde for zero."""
+    mean = values.mean(axis=0)
+    return np.where(mean != 0, mean, 1.0)
+
+
+def efficiency(
+    X: np.ndarray,
+    Y: np.ndarray,
+    model: str = "ccr",
+    orientation: str = "input",
+    super_efficiency: bool = False,
+    batch_size: int = 64,
+    workers: int | None = 1,
+) -> np.ndarray:
+    """Escores DEA de todas as DMUs.
+
+    ``X`` é (n_dmus, n_inputs) e ``Y`` é (n_dmus, n_outputs). Em orientação a
+    output o escore devolvido é ``1/φ``, de modo que 1 é sempre a fronteira.
+    Com ``super_efficiency`` cada DMU sai do próprio conjunto de referência
+    (escores acima de 1 possíveis; NaN se o LP for inviável). DMUs com
+    algum valor ausente ficam com NaN e fora do conjunto de referência.
+    ``workers`` > 1 (ou ``None`` = número de CPUs) resolve os lotes em
+    paralelo.
+    """
+    if model not in MODELS or orientation not in ORIENTATIONS:
+        raise ValueError(f"Modelo/orientação inválidos: {model}/{orientation}")
+
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    scores = np.full(len(X), np.nan)
+    complete = np.isfinite(X).all(axis=1) & np.isfinite(Y).all(axis=1)
+    if not complete.any():
+        return scores
+    X, Y = X[complete], Y[complete]
+    # DEA é invariante à unidade de cada variável; normalizar melhora o
+    # condicionamento (colunas com média zero, ex.: tudo zero num bimestre, ficam como estão)
+    X = (X / _scale(X)).T
+    Y = (Y / _scale(Y)).T
+
+    n = X.shape[1]
+    batches = [list(range(i, min(i + batch_size, n))) for i in range(0, n, batch_size)]
+    args = [(X, Y, batch, model, orientation, super_efficiency) for batch in batches]
+
+    workers = min(workers or os.cpu_count() or 1, len(batches))
+    if workers <= 1:
+        scores[complete] = np.concatenate([_solve_batch_args(a) for a in args])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            scores[complete] = np.concatenate(list(pool.map(_solve_batch_args, args)))
+    return scores
+
+
+def dea_scores(
+    df: pd.DataFrame,
+    inputs: tuple[str, ...] = INPUTS,
+    outputs: tuple[str, ...] = OUTPUTS,
+    by: str | list[str] | None = None,
+    **kwargs,
+) -> pd.Series:
+    """Eficiência de cada linha de ``df`` (uma DMU por linha).
+
+    Sem ``by`` todas as linhas formam um único conjunto de referência; com
+    ``by="bimonthly"`` cada bimestre é avaliado separadamente. Os demais
+    argumentos vão para ``efficiency``.
+    """
+    if by is None:
+        scores = efficiency(df[list(inputs)].to_numpy(), df[list(outputs)].to_numpy(), **kwargs)
+        return pd.Series(scores, index=df.index, name="efficiency")
+    return pd.concat(
+        dea_scores(group, inputs, outputs, None, **kwargs) for _, group in df.groupby(by, sort=False)
+    ).reindex(df.index)
+
+
+def load_frames(client=None, years: list[int] = (), concurrency: int | None = None) -> dict[int, pd.DataFrame]:
+    """Indicadores de entrada e saída (e a eficiência da API) de cada ano."""
+    from healthdata.client import DeaClient
+    from healthdata.fetch import FetchJob, fetch_all
+
+    jobs = {year: FetchJob("first_semester", year, variant="frame", columns=DEA_COLUMNS) for year in years}
+    results, _ = fetch_all(client or DeaClient(), list(jobs.values()), concurrency)
+    return {year: results[job] for year, job in jobs.items() if job in results}
+
+
+def score_years(frames: dict[int, pd.DataFrame], by: str | None = None, **kwargs) -> pd.DataFrame:
+    """Tabela longa com a eficiência da API (``efficiency``) e a local (``dea``) de cada DMU de cada ano.
+
+    Cada ano é um conjunto de referência separado (e cada bimestre, com
+    ``by="bimonthly"``); os demais argumentos vão para ``efficiency``.
+    """
+    tables = []
+    for year, df in frames.items():
+        scored = df.assign(year=year, dea=dea_scores(df, by=by, **kwargs))
+        if "efficiency" in scored.columns:
+            scored["diff"] = scored["dea"] - scored["efficiency"]
+        tables.append(scored)
+    if not tables:
+        return pd.DataFrame(columns=["year", *DEA_COLUMNS, "dea", "diff"])
+    table = pd.concat(tables, ignore_index=True)
+    return table[["year", *(col for col in table.columns if col != "year")]]
+
+
+def summary(table: pd.DataFrame) -> pd.DataFrame:
+    """Uma linha por ano: DMUs, na fronteira, e a distância para a eficiência da API."""
+    rows = []
+    for year, group in table.groupby("year"):
+        diff = group["diff"].abs() if "diff" in group.columns else pd.Series(dtype=float)
+        rows.append({
+            "year": year,
+            "dmus": len(group),
+            "scored": int(group["dea"].notna().sum()),
+            "frontier": int(np.isclose(group["dea"], 1.0).sum()),
+            "mae": diff.mean(),
+            "max_diff": diff.max(),
+            "spearman": group["dea"].corr(group["efficiency"], method="spearman") if "efficiency" in group else np.nan,
+        })
+    return pd.DataFrame(rows)
+
+
+def save_results(table: pd.DataFrame, directory: str = DEA_DIR) -> list[str]:
+    """Grava ``dea.csv`` em ``directory``; devolve os arquivos."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "dea.csv")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    table.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return [path]
@@ -0,0 +1,83 @@
+"""Exportação dos dados da API para arquivos, sem matplotlib nem pandas.
+
+Busca os datasets pelas variantes ``*_table`` do ``DeaClient``: com o
+cache em disco aquecido, a exportação só lê Arrow IPC (nem ``requests``
+é importado) e grava CSV, Parquet, Arrow ou JSON, um arquivo por ano.
+"""
+import json
+import os
+
+from healthdata.client import DeaClient
+from healthdata.fetch import FetchJob, fetch_all
+
+EXPORT_DIR = "exports"
+FORMATS = ("csv", "parquet", "arrow", "json")
+
+# dataset -> (método do DeaClient, exige rank)
+DATASETS = {
+    "indicators": ("first_semester", False),
+    "ranked": ("ranked", True),
+    "redistributed": ("ranked_redistributed", True),
+}
+
+
+def write_table(table, path: str, fmt: str):
+    """Grava ``table`` em ``path`` no formato ``fmt`` (escrita atômica)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if fmt == "csv":
+        import pyarrow.csv as csv
+
+        csv.write_csv(table, tmp)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, tmp, compression="zstd")
+    elif fmt == "arrow":
+        import pyarrow as pa
+
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif fmt == "json":
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(table.to_pylist(), f, ensure_ascii=False)
+    else:
+        raise ValueError(f"Formato de exportação desconhecido: {fmt!r} (use {FORMATS})")
+    os.replace(tmp, path)
+
+
+def export(
+    dataset: str,
+    years: list[int],
+    rank: int | None = None,
+    columns: list[str] | None = None,
+    fmt: str = "csv",
+    directory: str = EXPORT_DIR,
+    client: DeaClient | None = None,
+) -> tuple[dict[int, str], dict[FetchJob, Exception]]:
+    """Exporta ``dataset`` de cada ano e devolve ``({ano: arquivo}, erros)``."""
+    if dataset not in DATASETS:
+        raise ValueError(f"Dataset desconhecido: {dataset!r} (use {', '.join(DATASETS)})")
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de exportação desconhecido: {fmt!r} (use {FORMATS})")
+    endpoint, needs_rank = DATASETS[dataset]
+    if needs_rank and rank is None:
+        raise ValueError(f"O dataset {dataset!r} precisa de um rank.")
+
+    client = client or DeaClient()
+    jobs = {
+        year: FetchJob(endpoint, year, rank if needs_rank else None, "table", tuple(columns) if columns else None)
+        for year in years
+    }
+    results, errors = fetch_all(client, list(jobs.values()))
+
+    os.makedirs(directory, exist_ok=True)
+    written = {}
+    for year, job in jobs.items():
+        if job not in results:
+            continue
+        suffix = f"_rank{rank}" if needs_rank else ""
+        path = os.path.join(directory, f"{dataset}_{year}{suffix}.{fmt}")
+        write_table(results[job], path, fmt)
+        written[year] = path
+        print(f"Dados salvos em {path}")
+    return written, errors
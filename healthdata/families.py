@@ -0,0 +1,22 @@
+"""Famílias de gráfico e ranks padrão, sem dependências pesadas (usados pela CLI)."""
+
+# as chaves de ``pipeline.FAMILIES``, na mesma ordem
+FAMILY_NAMES = (
+    "line",
+    "ranked",
+    "ranked-all",
+    "redistributed",
+    "scatter",
+    "correlation",
+    "correlation-all",
+    "map",
+    "map-stats",
+)
+
+DEFAULT_RANKS = {
+    "ranked": 10,
+    "redistributed": 3,
+    "scatter": 30,
+    "correlation": 30,
+    "map": 200,
+}
@@ -0,0 +1,71 @@
+"""Busca concorrente de vários endpoints/anos com concorrência limitada.
+
+Os scripts montam a lista de ``FetchJob`` que a execução precisa e chamam
+``fetch_all`` uma vez, em vez de bloquear em cada ano dentro do laço.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any
+
+from healthdata import instrument
+from healthdata.client import DeaClient
+
+
+@dataclass(frozen=True)
+class FetchJob:
+    """Uma chamada a um método do ``DeaClient`` (ex.: ``ranked``, 2021, 10).
+
+    ``variant`` escolhe ``<endpoint>_<variant>``: ``"frame"`` (DataFrame) ou
+    ``"table"`` (tabela Arrow), lidas em streaming só com ``columns``.
+    """
+
+    endpoint: str
+    year: int | None = None
+    rank: int | None = None
+    variant: str | None = None
+    columns: tuple[str, ...] | None = None
+
+    def run(self, client: DeaClient) -> Any:
+        args = [arg for arg in (self.year, self.rank) if arg is not None]
+        with instrument.job(str(self)):
+            if self.variant is not None:
+                columns = list(self.columns) if self.columns is not None else None
+                return getattr(client, f"{self.endpoint}_{self.variant}")(*args, columns=columns)
+            return getattr(client, self.endpoint)(*args)
+
+    def __str__(self):
+        parts = [self.endpoint]
+        if self.year is not None:
+            parts.append(f"year={self.year}")
+        if self.rank is not None:
+            parts.append(f"rank={self.rank}")
+        return " ".join(parts)
+
+
+def fetch_all(
+    client: DeaClient, jobs: list[FetchJob], max_workers: int | None = None
+) -> tuple[dict[FetchJob, Any], dict[FetchJob, Exception]]:
+    """Executa ``jobs`` em paralelo e devolve ``(resultados, erros)``.
+
+    Jobs repetidos são buscados uma única vez. Uma falha é registrada em
+    ``erros`` e impressa, sem interromper os demais jobs. Por padrão a
+    concorrência fica limitada ao tamanho do pool de conexões do cliente.
+    """
+    unique_jobs = list(dict.fromkeys(jobs))
+    results: dict[FetchJob, Any] = {}
+    errors: dict[FetchJob, Exception] = {}
+    if not unique_jobs:
+        return results, errors
+
+    workers = min(max_workers or client.pool_maxsize, len(unique_jobs))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(job.run, client): job for job in unique_jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                results[job] = future.result()
+            except Exception as e:
+                errors[job] = e
+                print(f"[{job}] Erro: {e}")
+
+    return results, errors
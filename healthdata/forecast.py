@@ -0,0 +1,290 @@
+"""Previsão da eficiência do próximo bimestre de todas as cidades de uma vez.
+
+As séries de cada cidade são empilhadas numa matriz ``(cidade, período)``
+(``Panel``), com NaN onde falta valor. Cada modelo registrado em ``MODELS``
+recebe a matriz inteira e devolve as previsões de todas as cidades: os
+laços em Python são só sobre os períodos (uma dúzia), nunca sobre cidades.
+
+Os indicadores cobrem só o 1º semestre, então o período seguinte ao 3º
+bimestre de um ano é o 1º bimestre do ano seguinte; a "estação" é o número
+de bimestres observados por ano.
+
+``backtest`` refaz o ajuste com origem móvel (só os períodos até a origem)
+e compara a previsão com o valor observado depois dela.
+"""
+import os
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from healthdata.client import DeaClient
+from healthdata.fetch import FetchJob, fetch_all
+from healthdata.ranking import top_bottom_ids
+
+FORECAST_DIR = "resources/forecast"
+FORECAST_COLUMNS = ("cityId", "cityName", "bimonthly", "efficiency")
+
+# modelo(valores (cidade, período), índices dos períodos, índices a prever, estação) -> (cidade, horizonte)
+Model = Callable[[np.ndarray, np.ndarray, np.ndarray, int], np.ndarray]
+
+MODELS: dict[str, Model] = {}
+MODEL_LABELS: dict[str, str] = {}
+
+# grade de alfas da suavização exponencial, avaliada para todas as cidades de uma vez
+SES_ALPHAS = np.linspace(0.05, 1.0, 20)
+
+
+def register_model(name: str, label: str):
+    """Registra um modelo de previsão em ``MODELS``."""
+    def decorator(func: Model) -> Model:
+        MODELS[name] = func
+        MODEL_LABELS[name] = label
+        return func
+    return decorator
+
+
+def check_models(names: list[str] | None) -> list[str]:
+    names = list(names or MODELS)
+    unknown = [name for name in names if name not in MODELS]
+    if unknown:
+        raise ValueError(f"Modelos de previsão desconhecidos: {unknown} (use {', '.join(MODELS)})")
+    return names
+
+
+@dataclass
+class Panel:
+    """Séries de todas as cidades: ``values[cidade, período]``.
+
+    ``index`` numera os períodos como ``(ano - first_year) * estação +
+    posição do bimestre``, de modo que anos ausentes deixam buracos no
+    índice em vez de encostar períodos distantes.
+    """
+
+    city_ids: np.ndarray
+    city_names: np.ndarray
+    index: np.ndarray
+    values: np.ndarray
+    first_year: int
+    bimesters: np.ndarray
+
+    @property
+    def season(self) -> int:
+        return len(self.bimesters)
+
+    def periods(self, index: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """``(anos, bimestres)`` de índices de período."""
+        index = np.asarray(index)
+        return self.first_year + index // self.season, self.bimesters[index % self.season]
+
+    def next_index(self, horizon: int = 1) -> np.ndarray:
+        return self.index[-1] + np.arange(1, horizon + 1)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Histórico em formato longo (só valores observados)."""
+        city, col = np.nonzero(~np.isnan(self.values))
+        years, bimesters = self.periods(self.index[col])
+        return pd.DataFrame({
+            "cityId": self.city_ids[city],
+            "cityName": self.city_names[city],
+            "year": years,
+            "bimonthly": bimesters,
+            "efficiency": self.values[city, col],
+        })
+
+
+def build_panel(frames: dict[int, pd.DataFrame]) -> Panel:
+    """Matriz ``(cidade, período)`` a partir dos indicadores de cada ano."""
+    df = pd.concat([frame.assign(year=year) for year, frame in frames.items()], ignore_index=True)
+    if df.empty or "efficiency" not in df.columns:
+        raise ValueError("Os indicadores precisam conter o campo 'efficiency'.")
+    if "cityName" not in df.columns:
+        df["cityName"] = df["cityId"].astype(str)
+
+    codes, city_ids = pd.factorize(df["cityId"], sort=True)
+    names = df.groupby(codes)["cityName"].first().to_numpy(dtype=object)
+    bimesters = np.sort(df["bimonthly"].unique())
+    first_year = int(df["year"].min())
+    position = (df["year"].to_numpy() - first_year) * len(bimesters) + np.searchsorted(bimesters, df["bimonthly"])
+    index = np.unique(position)
+
+    values = np.full((len(city_ids), len(index)), np.nan)
+    values[codes, np.searchsorted(index, position)] = df["efficiency"].to_numpy(dtype=float)
+    return Panel(np.asarray(city_ids), names, index, values, first_year, bimesters)
+
+
+def load_panel(client: DeaClient | None = None, years: list[int] = (), concurrency: int | None = None) -> Panel:
+    """Busca os indicadores dos ``years`` e monta o ``Panel``."""
+    client = client or DeaClient()
+    jobs = {year: FetchJob("first_semester", year, variant="frame", columns=FORECAST_COLUMNS) for year in years}
+    results, _ = fetch_all(client, list(jobs.values()), concurrency)
+    return build_panel({year: results[job] for year, job in jobs.items() if job in results})
+
+
+def _first_observed(values: np.ndarray) -> np.ndarray:
+    observed = ~np.isnan(values)
+    return np.where(observed.any(axis=1), values[np.arange(len(values)), observed.argmax(axis=1)], np.nan)
+
+
+def _last_observed(values: np.ndarray) -> np.ndarray:
+    observed = ~np.isnan(values)
+    last = np.where(observed, np.arange(values.shape[1]), -1).max(axis=1, initial=-1)
+    return np.where(last >= 0, values[np.arange(len(values)), np.maximum(last, 0)], np.nan)
+
+
+@register_model("seasonal", "Ingênuo sazonal")
+def seasonal_naive(values, index, future, season):
+    """Último valor observado no mesmo bimestre; sem histórico do bimestre, o último valor da série."""
+    fallback = _last_observed(values)
+    forecast = np.empty((len(values), len(future)))
+    for step, target in enumerate(future):
+        same = (index % season == target % season) & (index < target)
+        forecast[:, step] = _last_observed(values[:, same])
+    return np.where(np.isnan(forecast), fallback[:, None], forecast)
+
+
+@register_model("ses", "Suavização exponencial simples")
+def exponential_smoothing(values, index, future, season):
+    """Nível suavizado com o alfa de ``SES_ALPHAS`` de menor erro um passo à frente em cada cidade.
+
+    Todos os alfas e todas as cidades são atualizados juntos a cada período;
+    períodos sem valor mantêm o nível.
+    """
+    alpha = SES_ALPHAS[:, None]
+    level = np.broadcast_to(_first_observed(values), (len(SES_ALPHAS), len(values))).copy()
+    sse = np.zeros_like(level)
+    for col in values.T:
+        error = np.nan_to_num(col - level)
+        sse += error ** 2
+        level += alpha * error
+    best = sse.argmin(axis=0)
+    return np.repeat(level[best, np.arange(len(values))][:, None], len(future), axis=1)
+
+
+def _design(index: np.ndarray, season: int) -> np.ndarray:
+    """Tendência linear no índice do período e um indicador por bimestre (menos o primeiro)."""
+    dummies = (index[:, None] % season == np.arange(1, season)).astype(float)
+    return np.column_stack([index.astype(float), dummies])
+
+
+@register_model("linear", "Linear agrupado (tendência + bimestre)")
+def pooled_linear(values, index, future, season):
+    """Intercepto por cidade, tendência e efeito de bimestre comuns a todas as cidades.
+
+    Ajuste "within": valores e regressores são centrados por cidade e a
+    tendência e os efeitos de bimestre saem de um único ``lstsq``.
+    """
+    observed = ~np.isnan(values)
+    X = _design(index, season)
+    count = observed.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        y_mean = np.nansum(values, axis=1, keepdims=True) / count
+        x_mean = observed @ X / count
+    centered_x = (X[None] - x_mean[:, None, :])[observed]
+    centered_y = (values - y_mean)[observed]
+    if not len(centered_y):
+        return np.full((len(values), len(future)), np.nan)
+    beta = np.linalg.lstsq(centered_x, centered_y, rcond=None)[0]
+    intercept = y_mean[:, 0] - x_mean @ beta
+    return intercept[:, None] + _design(np.asarray(future), season) @ beta
+
+
+def forecast(panel: Panel, models: list[str] | None = None, horizon: int = 1) -> pd.DataFrame:
+    """Previsões dos próximos ``horizon`` bimestres: uma linha por cidade × modelo × passo."""
+    future = panel.next_index(horizon)
+    years, bimesters = panel.periods(future)
+    cities = len(panel.city_ids)
+    frames = []
+    for name in check_models(models):
+        predicted = MODELS[name](panel.values, panel.index, future, panel.season)
+        frames.append(pd.DataFrame({
+            "cityId": np.repeat(panel.city_ids, horizon),
+            "cityName": np.repeat(panel.city_names, horizon),
+            "model": name,
+            "step": np.tile(np.arange(1, horizon + 1), cities),
+            "year": np.tile(years, cities),
+            "bimonthly": np.tile(bimesters, cities),
+            "forecast": predicted.ravel(),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def backtest(
+    panel: Panel, models: list[str] | None = None, horizon: int = 1, min_train: int | None = None
+) -> pd.DataFrame:
+    """Erro de previsão com origem móvel: uma linha por modelo × período previsto × passo.
+
+    Cada origem usa os ``min_train`` (padrão: uma estação + 1) ou mais
+    primeiros períodos; ``mae``/``rmse`` são médias sobre as cidades com
+    valor observado no período previsto.
+    """
+    models = check_models(models)
+    min_train = min_train or panel.season + 1
+    rows = []
+    for end in range(min_train, len(panel.index) - horizon + 1):
+        train, actual = panel.values[:, :end], panel.values[:, end:end + horizon]
+        target = panel.index[end:end + horizon]
+        years, bimesters = panel.periods(target)
+        for name in models:
+            error = MODELS[name](train, panel.index[:end], target, panel.season) - actual
+            valid = ~np.isnan(error)
+            count = valid.sum(axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mae = np.nansum(np.abs(error), axis=0) / count
+                rmse = np.sqrt(np.nansum(error ** 2, axis=0) / count)
+            for step in range(len(target)):
+                rows.append({
+                    "model": name, "step": step + 1, "year": int(years[step]), "bimonthly": int(bimesters[step]),
+                    "train": end, "cities": int(count[step]), "mae": mae[step], "rmse": rmse[step],
+                })
+    return pd.DataFrame(rows, columns=["model", "step", "year", "bimonthly", "train", "cities", "mae", "rmse"])
+
+
+def summary(errors: pd.DataFrame) -> pd.DataFrame:
+    """MAE e RMSE médios de cada modelo no backtest, do melhor para o pior."""
+    return errors.groupby("model")[["mae", "rmse"]].mean().sort_values("mae")
+
+
+def save_results(
+    panel: Panel,
+    predictions: pd.DataFrame,
+    errors: pd.DataFrame,
+    directory: str = FORECAST_DIR,
+    rank: int = 10,
+    plots: bool = True,
+) -> list[str]:
+    """Grava ``forecast.csv``, ``backtest.csv`` e os gráficos em ``directory``; devolve os arquivos.
+
+    Os gráficos de previsão mostram as ``rank`` cidades com maior e menor
+    previsão de cada modelo.
+    """
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for name, table in (("forecast", predictions), ("backtest", errors)):
+        path = os.path.join(directory, f"{name}.csv")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        table.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        written.append(path)
+    if not plots or predictions.empty:
+        return written
+
+    from healthdata.charts import plot_backtest, plot_forecast
+
+    history = panel.to_frame()
+    for name, model_predictions in predictions.groupby("model", sort=False):
+        first_step = model_predictions[model_predictions["step"] == 1]
+        top, bottom = top_bottom_ids(first_step.rename(columns={"forecast": "efficiency"}), rank)
+        cities = np.union1d(top, bottom)
+        filename = os.path.join(directory, f"forecast_{name}.png")
+        plot_forecast(
+            history[history["cityId"].isin(cities)], model_predictions[model_predictions["cityId"].isin(cities)],
+            MODEL_LABELS[name], filename,
+        )
+        written.append(filename)
+    if not errors.empty:
+        filename = os.path.join(directory, "backtest.png")
+        plot_backtest(errors, MODEL_LABELS, filename)
+        written.append(filename)
+    return written
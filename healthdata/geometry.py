@@ -0,0 +1,134 @@
+"""Geometria pré-processada dos municípios (resources/data/pe.json).
+
+O GeoJSON é lido uma única vez por versão do arquivo: os nomes são
+normalizados, a geometria projetada e simplificada é calculada e o
+resultado é gravado como GeoParquet (ou pickle, sem pyarrow) em
+``.cache/healthdata/geometry``, com o hash do arquivo de origem no nome.
+As leituras seguintes carregam esse arquivo, via memory map quando possível.
+"""
+import hashlib
+import importlib.util
+import os
+import unicodedata
+from dataclasses import dataclass, field
+
+from healthdata.cache import DEFAULT_CACHE_DIR
+
+GEOJSON_FILE = "resources/data/pe.json"
+GEOMETRY_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, "geometry")
+PROJECTED_CRS = "EPSG:5880"  # SIRGAS 2000 / Brazil Polyconic, em metros
+SIMPLIFY_TOLERANCE = 50.0  # metros
+
+_loaded: dict[str, object] = {}
+
+
+def normalize_name(name: str) -> str:
+    """Nome em maiúsculas e sem acentos, para comparar grafias ('Belém' -> 'BELEM')."""
+    folded = unicodedata.normalize("NFKD", name)
+    return "".join(c for c in folded if not unicodedata.combining(c)).upper().strip()
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_geometry(path: str = GEOJSON_FILE, tolerance: float = SIMPLIFY_TOLERANCE):
+    """Lê o GeoJSON e acrescenta ``code`` (IBGE), ``name_key`` e ``geometry_simplified``.
+
+    A geometria ativa continua a original (EPSG:4326), para os mapas não
+    mudarem; ``geometry_simplified`` está em ``PROJECTED_CRS``.
+    """
+    import geopandas as gpd
+
+    geo_df = gpd.read_file(path)
+    geo_df["code"] = geo_df["id"].astype("int64")
+    geo_df["name_key"] = geo_df["name"].map(normalize_name)
+    geo_df["geometry_simplified"] = geo_df.geometry.to_crs(PROJECTED_CRS).simplify(tolerance, preserve_topology=True)
+    return geo_df
+
+
+def _store_path(path: str, digest: str, tolerance: float) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    ext = "parquet" if importlib.util.find_spec("pyarrow") else "pkl"
+    return os.path.join(GEOMETRY_CACHE_DIR, f"{stem}-{digest[:16]}-{tolerance:g}.{ext}")
+
+
+def load_geometry(path: str = GEOJSON_FILE, tolerance: float = SIMPLIFY_TOLERANCE):
+    """GeoDataFrame dos municípios, do cache em memória, do disco ou do GeoJSON.
+
+    O arquivo pré-processado é refeito sempre que o hash de ``path`` muda.
+    """
+    import geopandas as gpd
+    import pandas as pd
+
+    digest = file_hash(path)
+    store = _store_path(path, digest, tolerance)
+    if store in _loaded:
+        return _loaded[store].copy()
+
+    if os.path.exists(store):
+        if store.endswith(".parquet"):
+            geo_df = gpd.read_parquet(store, memory_map=True)
+        else:
+            geo_df = pd.read_pickle(store)
+    else:
+        geo_df = build_geometry(path, tolerance)
+        os.makedirs(GEOMETRY_CACHE_DIR, exist_ok=True)
+        tmp = f"{store}.{os.getpid()}.tmp"
+        if store.endswith(".parquet"):
+            geo_df.to_parquet(tmp)
+        else:
+            geo_df.to_pickle(tmp)
+        os.replace(tmp, store)
+
+    _loaded[store] = geo_df
+    return geo_df.copy()
+
+
+@dataclass
+class JoinReport:
+    """Códigos que não casaram na junção entre dados DEA e geometria."""
+
+    missing_geometry: list[int] = field(default_factory=list)
+    missing_data: list[int] = field(default_factory=list)
+
+    def __str__(self):
+        return (f"{len(self.missing_geometry)} cidades sem geometria {self.missing_geometry}, "
+                f"{len(self.missing_data)} municípios sem dados {self.missing_data}")
+
+
+def match_codes(geo_df, ids):
+    """Códigos IBGE de ``geo_df`` na mesma convenção dos ``ids`` da API.
+
+    A API usa o código de 6 dígitos (sem o dígito verificador) e o pe.json o
+    de 7; o lado da geometria é reduzido quando os ``ids`` têm 6 dígitos.
+    """
+    codes = geo_df["code"].astype("int64")
+    if len(ids) and ids.max() < 1_000_000:
+        codes = codes // 10
+    return codes.to_numpy()
+
+
+def check_codes(geo_df, df, id_col: str = "cityId") -> JoinReport:
+    """``JoinReport`` da junção entre ``df`` e a geometria, sem montar o merge."""
+    ids = df[id_col].astype("int64")
+    data_codes = set(ids)
+    shape_codes = set(match_codes(geo_df, ids))
+    return JoinReport(sorted(data_codes - shape_codes), sorted(shape_codes - data_codes))
+
+
+def join_by_code(geo_df, df, id_col: str = "cityId"):
+    """Junta ``df`` à geometria pelo código IBGE inteiro, sem comparar nomes.
+
+    Devolve ``(merged, JoinReport)``; ``merged`` mantém só os pares
+    encontrados, na ordem da geometria.
+    """
+    ids = df[id_col].astype("int64")
+    merged = geo_df.assign(_code=match_codes(geo_df, ids)).merge(
+        df.assign(_code=ids.to_numpy()), on="_code", how="inner", validate="one_to_many"
+    ).drop(columns="_code")
+    return merged, check_codes(geo_df, df, id_col)
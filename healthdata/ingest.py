@@ -0,0 +1,174 @@
+"""Leitura em streaming de payloads JSON (lista de registros) direto para colunas.
+
+Em vez de ``response.json()`` (lista de dicts inteira na memória) seguido de
+``pd.DataFrame(data)`` (segunda cópia), o corpo HTTP é lido aos pedaços com
+o ``ijson`` e cada campo vai para um ``array.array`` tipado da sua coluna.
+Só as colunas pedidas são guardadas. Sem ``ijson`` instalado, cai para o
+``json`` da biblioteca padrão, mantendo a projeção de colunas.
+
+``read_table`` monta uma tabela Arrow direto das colunas NumPy, sem
+importar pandas (caminho usado pelas exportações).
+"""
+import hashlib
+import json
+import math
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+import numpy as np
+
+from healthdata import instrument
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - dependência opcional
+    ijson = None
+
+
+class HashingReader:
+    """Envolve um arquivo binário e calcula o SHA-256 e o tamanho do que for lido."""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.digest = hashlib.sha256()
+        self.bytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.raw.read(size)
+        self.digest.update(chunk)
+        self.bytes += len(chunk)
+        return chunk
+
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+
+class _Column:
+    """Acumulador tipado: números em ``array('d')``, texto em lista."""
+
+    def __init__(self, missing: int = 0):
+        self.values: array | list | None = None
+        self.missing = missing
+        self.has_float = False
+
+    def append(self, value: Any):
+        if self.values is None:
+            if value is None:
+                self.missing += 1
+                return
+            numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+            self.values = array("d", [math.nan]) * self.missing if numeric else [None] * self.missing
+
+        if isinstance(self.values, array):
+            if value is None:
+                self.values.append(math.nan)
+                return
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.has_float |= isinstance(value, float)
+                self.values.append(value)
+                return
+            self.values = [None if math.isnan(v) else v for v in self.values]
+        self.values.append(value)
+
+    def size(self) -> int:
+        return self.missing if self.values is None else len(self.values)
+
+    def to_numpy(self, rows: int) -> np.ndarray:
+        if self.values is None:
+            return np.full(rows, np.nan)
+        if isinstance(self.values, array):
+            self.values.extend(array("d", [math.nan]) * (rows - len(self.values)))
+            data = np.frombuffer(self.values, dtype=np.float64)
+            if not self.has_float and not np.isnan(data).any():
+                return data.astype(np.int64)
+            return data
+        self.values.extend([None] * (rows - len(self.values)))
+        return np.array(self.values, dtype=object)
+
+
+def _records(stream: BinaryIO) -> Iterator[dict]:
+    if ijson is not None:
+        return ijson.items(stream, "item", use_float=True)
+    return iter(json.load(stream))
+
+
+def parse_columns(records: Iterable[dict], columns: Iterable[str] | None = None) -> dict[str, np.ndarray]:
+    """Colunas NumPy a partir de registros, guardando só ``columns`` (todas se ``None``).
+
+    Colunas pedidas que não aparecem no payload ficam de fora do resultado.
+    """
+    wanted = set(columns) if columns is not None else None
+    builders: dict[str, _Column] = {}
+    rows = 0
+    for record in records:
+        seen = 0
+        for name, value in record.items():
+            if wanted is not None and name not in wanted:
+                continue
+            builder = builders.get(name)
+            if builder is None:
+                builder = builders[name] = _Column(missing=rows)
+            builder.append(value)
+            seen += 1
+        rows += 1
+        if seen < len(builders):
+            for builder in builders.values():
+                if builder.size() < rows:
+                    builder.append(None)
+    return {name: builder.to_numpy(rows) for name, builder in builders.items()}
+
+
+def read_frame(
+    stream: BinaryIO, columns: Iterable[str] | None = None, dtypes: dict[str, str] | None = None
+) -> "pd.DataFrame":
+    """DataFrame de um corpo JSON lido em streaming, com projeção e dtypes opcionais."""
+    import pandas as pd
+
+    with instrument.span("decode") as fields:
+        parsed = parse_columns(_records(stream), columns)
+        fields["bytes"] = getattr(stream, "bytes", None)
+    with instrument.span("frame"):
+        return apply_dtypes(pd.DataFrame(parsed), dtypes)
+
+
+def read_table(stream: BinaryIO, columns: Iterable[str] | None = None) -> "pa.Table":
+    """Tabela Arrow de um corpo JSON lido em streaming, só com ``columns``."""
+    import pyarrow as pa
+
+    with instrument.span("decode") as fields:
+        parsed = parse_columns(_records(stream), columns)
+        fields["bytes"] = getattr(stream, "bytes", None)
+    return pa.table(parsed)
+
+
+def select(table: "pa.Table", columns: Iterable[str] | None = None) -> "pa.Table":
+    """``table`` só com as ``columns`` existentes (todas se ``None``)."""
+    if columns is None:
+        return table
+    return table.select([name for name in columns if name in table.column_names])
+
+
+def table_frame(
+    table: "pa.Table", columns: Iterable[str] | None = None, dtypes: dict[str, str] | None = None
+) -> "pd.DataFrame":
+    """DataFrame de uma tabela Arrow (do cache), só com as ``columns`` existentes."""
+    return apply_dtypes(select(table, columns).to_pandas(), dtypes)
+
+
+def project(
+    df: "pd.DataFrame", columns: Iterable[str] | None = None, dtypes: dict[str, str] | None = None
+) -> "pd.DataFrame":
+    if columns is not None:
+        df = df[[name for name in columns if name in df.columns]]
+    return apply_dtypes(df, dtypes)
+
+
+def apply_dtypes(df: "pd.DataFrame", dtypes: dict[str, str] | None) -> "pd.DataFrame":
+    if not dtypes:
+        return df
+    return df.astype({name: dtype for name, dtype in dtypes.items() if name in df.columns})
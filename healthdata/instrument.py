@@ -0,0 +1,255 @@
+"""Instrumentação por estágio: latência HTTP, leitura do JSON, DataFrames, plot e savefig.
+
+Cada medição vira um evento ``{time, script, job, stage, seconds, ...}``. O
+``job`` corrente (um ``FetchJob`` ou o arquivo de saída de um gráfico) é
+guardado num ``ContextVar``, então o cliente HTTP e os gráficos não
+precisam recebê-lo como argumento. Com ``configure(trace=...)`` (ou
+HEALTHDATA_TRACE) os eventos são acrescentados como JSON lines ao arquivo;
+``summary()`` imprime a tabela por estágio, por endpoint e os jobs mais
+lentos.
+
+Estágios registrados: ``http`` (até os cabeçalhos, com o ``endpoint`` e os
+``bytes`` da resposta), ``cache`` (leitura do cache em disco), ``decode``
+(JSON -> colunas ou registros, com os ``bytes`` do corpo), ``frame``
+(montagem do DataFrame), ``plot``, ``savefig`` e ``output`` (tamanho do
+arquivo gerado).
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+_current_job: ContextVar[str | None] = ContextVar("healthdata_job", default=None)
+_events: list[dict[str, Any]] = []
+_lock = threading.Lock()
+_config: dict[str, Any] = {"trace": None, "profile_dir": None, "profiler": "cprofile"}
+
+
+def configure(trace: str | None = None, profile_dir: str | None = None, profiler: str = "cprofile"):
+    """Liga o arquivo de eventos ``trace`` e o profiler por gráfico (em ``profile_dir``)."""
+    if profiler not in PROFILERS:
+        raise ValueError(f"Profiler desconhecido: {profiler!r} (use {PROFILERS})")
+    _config.update(trace=trace, profile_dir=profile_dir, profiler=profiler)
+
+
+def configure_from_env():
+    """Configuração via HEALTHDATA_TRACE, HEALTHDATA_PROFILE_DIR e HEALTHDATA_PROFILER."""
+    configure(
+        trace=os.environ.get("HEALTHDATA_TRACE") or _config["trace"],
+        profile_dir=os.environ.get("HEALTHDATA_PROFILE_DIR") or _config["profile_dir"],
+        profiler=os.environ.get("HEALTHDATA_PROFILER", _config["profiler"]),
+    )
+
+
+def settings() -> dict[str, Any]:
+    """Cópia da configuração, para repassar aos processos de renderização."""
+    return dict(_config)
+
+
+def enabled() -> bool:
+    return _config["trace"] is not None
+
+
+@contextmanager
+def job(name: str) -> Iterator[None]:
+    """Atribui a ``name`` os eventos registrados dentro do bloco."""
+    token = _current_job.set(name)
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+def _script() -> str | None:
+    """Script em execução (``healthdata`` para ``python -m healthdata``)."""
+    if not sys.argv or not sys.argv[0]:
+        return None
+    name = os.path.basename(sys.argv[0])
+    return os.path.basename(os.path.dirname(sys.argv[0])) if name == "__main__.py" else name
+
+
+def record(stage: str, seconds: float, **fields):
+    event = {
+        "time": time.time(),
+        "script": _script(),
+        "job": _current_job.get(),
+        "stage": stage,
+        "seconds": seconds,
+        **fields,
+    }
+    with _lock:
+        _events.append(event)
+
+
+@contextmanager
+def span(stage: str, **fields) -> Iterator[dict[str, Any]]:
+    """Mede o bloco; o dicionário devolvido aceita campos extras (ex.: ``bytes``)."""
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        record(stage, time.perf_counter() - start, **fields)
+
+
+class Request:
+    """Requisição aberta por ``request``: ``send`` mede até os cabeçalhos."""
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self.seconds = 0.0
+        self.response = None
+
+    def send(self, call: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            self.response = call()
+            return self.response
+        finally:
+            self.seconds = time.perf_counter() - start
+
+
+@contextmanager
+def request(endpoint: str, method: str = "GET") -> Iterator[Request]:
+    """Evento ``http`` de uma requisição, gravado só ao fim do bloco.
+
+    ``seconds`` é o tempo de ``Request.send`` (até os cabeçalhos); o corpo é
+    lido dentro do bloco, e ``bytes`` é o que veio pela rede até o fim dele.
+    """
+    req = Request(endpoint=endpoint, method=method)
+    try:
+        yield req
+    finally:
+        if req.response is not None:
+            req.fields.update(status=req.response.status_code, bytes=req.response.raw.tell())
+        record("http", req.seconds, **req.fields)
+
+
+def mark() -> int:
+    """Posição atual na lista de eventos (para ``events(since=...)``)."""
+    with _lock:
+        return len(_events)
+
+
+def events(since: int = 0) -> list[dict[str, Any]]:
+    with _lock:
+        return list(_events[since:])
+
+
+def extend(new_events: list[dict[str, Any]]):
+    """Acrescenta eventos vindos de outro processo."""
+    with _lock:
+        _events.extend(new_events)
+
+
+def drain() -> list[dict[str, Any]]:
+    """Devolve e esvazia os eventos deste processo."""
+    with _lock:
+        drained = list(_events)
+        _events.clear()
+    return drained
+
+
+def flush(run_events: list[dict[str, Any]] | None = None):
+    """Acrescenta os eventos (padrão: todos os deste processo) ao arquivo ``trace``."""
+    if _config["trace"] is None:
+        return
+    run_events = events() if run_events is None else run_events
+    os.makedirs(os.path.dirname(_config["trace"]) or ".", exist_ok=True)
+    with open(_config["trace"], "a", encoding="utf-8") as f:
+        for event in run_events:
+            f.write(json.dumps(event, default=str) + "\n")
+
+
+@contextmanager
+def profiled(name: str) -> Iterator[None]:
+    """Roda o bloco sob cProfile/pyinstrument se ``profile_dir`` estiver configurado."""
+    directory = _config["profile_dir"]
+    if directory is None:
+        yield
+        return
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, name.replace(os.sep, "_"))
+
+    if _config["profiler"] == "pyinstrument":
+        from pyinstrument import Profiler
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(f"{base}.html", "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(f"{base}.prof")
+
+
+def read_trace(path: str) -> list[dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _stats_line(name: str, stage_events: list[dict[str, Any]], width: int) -> str:
+    seconds = [e["seconds"] for e in stage_events]
+    size = sum(e.get("bytes") or 0 for e in stage_events) / 1e6
+    return (
+        f"{name[:width]:<{width}} {len(seconds):>5} {sum(seconds):>10.2f} {sum(seconds) / len(seconds) * 1000:>11.1f}"
+        f" {max(seconds) * 1000:>10.1f} {size:>9.2f}"
+    )
+
+
+def summary(run_events: list[dict[str, Any]] | None = None, top: int = 10) -> str:
+    """Tabelas por estágio e por endpoint (n, total, média, máximo, MB), por script e os ``top`` jobs mais lentos."""
+    run_events = events() if run_events is None else run_events
+    by_stage: dict[str, list[dict]] = defaultdict(list)
+    by_endpoint: dict[str, list[dict]] = defaultdict(list)
+    by_script: dict[str, float] = defaultdict(float)
+    by_job: dict[str, float] = defaultdict(float)
+    for event in run_events:
+        by_stage[event["stage"]].append(event)
+        if event["stage"] == "http":
+            by_endpoint[event.get("endpoint") or "-"].append(event)
+        if event["stage"] != "output":
+            by_script[event.get("script") or "-"] += event["seconds"]
+            by_job[event["job"] or "-"] += event["seconds"]
+
+    def total(item):
+        return -sum(e["seconds"] for e in item[1])
+
+    columns = f"{'n':>5} {'total (s)':>10} {'média (ms)':>11} {'máx (ms)':>10} {'MB':>9}"
+    lines = [f"{'estágio':<10} {columns}"]
+    lines.extend(_stats_line(stage, stage_events, 10) for stage, stage_events in sorted(by_stage.items(), key=total))
+    if by_endpoint:
+        lines.append("")
+        lines.append(f"{'endpoint':<48} {columns}")
+        lines.extend(_stats_line(name, endpoint_events, 48)
+                     for name, endpoint_events in sorted(by_endpoint.items(), key=total))
+    if len(by_script) > 1:
+        lines.append("")
+        lines.append(f"{'script':<60} {'total (s)':>10}")
+        for name, seconds in sorted(by_script.items(), key=lambda item: -item[1]):
+            lines.append(f"{name[:60]:<60} {seconds:>10.2f}")
+    if by_job:
+        lines.append("")
+        lines.append(f"{'job':<60} {'total (s)':>10}")
+        for name, seconds in sorted(by_job.items(), key=lambda item: -item[1])[:top]:
+            lines.append(f"{name[:60]:<60} {seconds:>10.2f}")
+    return "\n".join(lines)
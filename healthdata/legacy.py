@@ -0,0 +1,96 @@
+"""Normalização dos payloads aninhados antigos de ``/api/efficiency``.
+
+Três formatos convivem nos endpoints antigos e nos payloads arquivados:
+
+- ``/api/efficiency/{ano}``: lista de blocos ``{city, efficiencies[], avgEfficiency}``;
+- ``/api/efficiency/ranked/{ano}``: ``{top: [blocos], down: [blocos]}``;
+- ``/api/efficiency/ranked/redistribute/{ano}``: ``{real: {top, down}, redistributed: {top, down}}``.
+
+``flatten`` percorre os blocos uma única vez e enche uma lista por coluna
+(nada de um dict por linha), devolvendo um DataFrame longo com ``cityId``,
+``city``, ``month``, os campos pedidos de cada mês, ``group`` (``top``/
+``down``) e ``source`` (``real``/``redistributed``). ``paired`` alinha real
+e redistribuído por ``(cityId, month)`` com um join, em vez de procurar a
+cidade na outra lista pelo nome.
+"""
+import json
+from collections.abc import Iterator
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+GROUPS = ("top", "down")
+SOURCES = ("real", "redistributed")
+
+
+def _blocks(payload) -> Iterator[tuple[str | None, str | None, list[dict]]]:
+    """``(source, group, blocos)`` de qualquer um dos três formatos."""
+    if isinstance(payload, list):
+        yield None, None, payload
+        return
+    if any(source in payload for source in SOURCES):
+        for source in SOURCES:
+            for _, group, blocks in _blocks(payload.get(source) or {}):
+                yield source, group, blocks
+        return
+    for group in GROUPS:
+        yield None, group, payload.get(group) or []
+
+
+def flatten(payload, fields: tuple[str, ...] = ("efficiency",)) -> pd.DataFrame:
+    """Uma linha por cidade × mês, na ordem do payload; ``fields`` ausentes viram NaN.
+
+    Os campos por cidade (id, nome, grupo, origem) são repetidos com
+    ``np.repeat`` pela contagem de meses de cada bloco; os campos por mês saem
+    de uma única lista plana de entradas com ``np.fromiter``.
+    """
+    counts, ids, names, groups, sources, entries = [], [], [], [], [], []
+    for source, group, blocks in _blocks(payload):
+        for block in blocks:
+            block_entries = block.get("efficiencies") or []
+            counts.append(len(block_entries))
+            ids.append(block["city"]["id"])
+            names.append(block["city"]["name"])
+            groups.append(group)
+            sources.append(source)
+            entries.append(block_entries)
+
+    rows = sum(counts)
+    flat = list(chain.from_iterable(entries))
+    data = {
+        "cityId": np.repeat(np.asarray(ids, dtype=np.int64), counts),
+        "city": np.repeat(np.asarray(names, dtype=object), counts),
+        "month": np.fromiter(map(itemgetter("month"), flat), dtype=np.int64, count=rows),
+    }
+    for name in fields:
+        values = (entry.get(name) for entry in flat)
+        data[name] = np.fromiter((np.nan if v is None else v for v in values), dtype=float, count=rows)
+    for name, labels in (("group", groups), ("source", sources)):
+        if any(label is not None for label in labels):
+            data[name] = pd.Categorical(np.repeat(np.asarray(labels, dtype=object), counts))
+    return pd.DataFrame(data)
+
+
+def paired(payload, value: str = "efficiency") -> pd.DataFrame:
+    """Real e redistribuído lado a lado: ``cityId``, ``city``, ``group``, ``month``, ``real``, ``redistributed``.
+
+    As linhas seguem a ordem das cidades no bloco ``real`` e, dentro de cada
+    cidade, os meses em ordem; meses sem par redistribuído ficam NaN.
+    """
+    df = flatten(payload, (value,))
+    if "source" not in df.columns:
+        raise ValueError("O payload não tem os blocos 'real' e 'redistributed'.")
+    real = df[df["source"] == "real"].drop(columns="source").rename(columns={value: "real"})
+    redistributed = df.loc[df["source"] == "redistributed", ["cityId", "month", value]]
+    merged = real.merge(redistributed.rename(columns={value: "redistributed"}), on=["cityId", "month"], how="left")
+    merged["order"] = merged.groupby("cityId", sort=False).ngroup()
+    merged = merged.sort_values(["order", "month"], kind="stable").reset_index(drop=True)
+    return merged[["cityId", "city", "group", "month", "real", "redistributed"]]
+
+
+def load(path: str, fields: tuple[str, ...] = ("efficiency",)) -> pd.DataFrame:
+    """``flatten`` de um payload arquivado em JSON."""
+    with open(path, encoding="utf-8") as f:
+        return flatten(json.load(f), fields)
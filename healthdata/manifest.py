@@ -0,0 +1,70 @@
+"""Manifesto de build: pula gráficos cujas entradas não mudaram.
+
+Para cada arquivo de saída guarda um hash que combina o conteúdo dos
+datasets de entrada, os parâmetros do gráfico (incluindo o perfil de
+saída, com formato e dpi) e o código da função que o desenha, com os
+módulos de estilo de que ela depende (onde ficam cmap e tamanho da
+figura). Se o hash bate e o arquivo existe, o gráfico não é renderizado de
+novo.
+"""
+import hashlib
+import inspect
+import json
+import os
+from collections.abc import Callable
+from typing import Any
+
+import pandas as pd
+
+MANIFEST_FILE = "resources/.build-manifest.json"
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """Hash do conteúdo de um DataFrame (colunas e valores, sem o índice)."""
+    digest = hashlib.sha256(",".join(map(str, df.columns)).encode())
+    plain = df.drop(columns=[col for col in df.columns if str(df[col].dtype) == "geometry"])
+    digest.update(pd.util.hash_pandas_object(plain, index=False).to_numpy().tobytes())
+    for col in df.columns.difference(plain.columns):
+        digest.update(b"".join(df[col].to_wkb()))
+    return digest.hexdigest()
+
+
+def function_hash(func: Callable) -> str:
+    """Hash do código de ``func`` (ou de ``func.source()``, p. ex. ``pipeline.ChartFunction``)."""
+    if callable(getattr(func, "source", None)):
+        return hashlib.sha256(f"{func.qualname}\n{func.source()}".encode()).hexdigest()
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = getattr(func, "__qualname__", repr(func))
+    return hashlib.sha256(f"{func.__module__}.{func.__qualname__}\n{source}".encode()).hexdigest()
+
+
+def chart_hash(render: Callable, params: dict[str, Any], input_hashes: list[str]) -> str:
+    payload = json.dumps([function_hash(render), params, input_hashes], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Manifest:
+    """``{arquivo de saída: hash}`` persistido em JSON."""
+
+    def __init__(self, path: str = MANIFEST_FILE):
+        self.path = path
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries: dict[str, str] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def is_current(self, output: str, digest: str) -> bool:
+        return self.entries.get(output) == digest and os.path.exists(output)
+
+    def record(self, output: str, digest: str):
+        self.entries[output] = digest
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
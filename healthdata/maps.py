@@ -0,0 +1,113 @@
+"""Mapas coropléticos que montam a geometria uma vez e só trocam as cores.
+
+``municipality_paths`` converte os polígonos em ``Path`` do matplotlib uma
+única vez por geometria. ``MapRenderer`` mantém uma figura com a coleção de
+municípios já desenhada: cada ano só troca o array de cores (``set_array``)
+e o título antes de salvar.
+"""
+import numpy as np
+import pandas as pd
+from matplotlib.collections import PatchCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
+
+from healthdata import output
+from healthdata.geometry import match_codes
+
+_paths_cache: dict[tuple, list[Path]] = {}
+_renderers: dict[tuple, "MapRenderer"] = {}
+
+
+def _geometry_key(geo_df) -> tuple:
+    return tuple(geo_df["code"]), tuple(geo_df.total_bounds)
+
+
+def municipality_paths(geo_df) -> list[Path]:
+    """Um ``Path`` composto (exterior + buracos) por linha de ``geo_df``, memoizado."""
+    key = _geometry_key(geo_df)
+    if key not in _paths_cache:
+        paths = []
+        for geom in geo_df.geometry:
+            rings = []
+            for part in getattr(geom, "geoms", [geom]):
+                rings.append(Path(np.asarray(part.exterior.coords)[:, :2], closed=True))
+                rings.extend(Path(np.asarray(ring.coords)[:, :2], closed=True) for ring in part.interiors)
+            paths.append(Path.make_compound_path(*rings))
+        _paths_cache.clear()
+        _paths_cache[key] = paths
+    return _paths_cache[key]
+
+
+def municipality_collection(paths: list[Path], cmap: str, vmin: float, vmax: float, **kwargs) -> PatchCollection:
+    """Coleção de municípios sem cores; preencha com ``set_array``."""
+    collection = PatchCollection([PathPatch(path) for path in paths], cmap=cmap, **kwargs)
+    collection.set_clim(vmin, vmax)
+    collection.set_array(np.full(len(paths), np.nan))
+    return collection
+
+
+def _geographic_aspect(ax, geo_df):
+    """Mesmo ajuste de proporção que o ``GeoDataFrame.plot`` aplica em lat/lon."""
+    if geo_df.crs is not None and geo_df.crs.is_geographic:
+        bounds = geo_df.total_bounds
+        ax.set_aspect(1 / np.cos(np.mean([bounds[1], bounds[3]]) * np.pi / 180))
+    else:
+        ax.set_aspect("equal")
+
+
+def values_by_code(geo_df, df_eff: pd.DataFrame, column: str = "efficiency") -> np.ndarray:
+    """Valor de cada município de ``geo_df`` (NaN se ausente), alinhado pelo código IBGE.
+
+    Com vários bimestres por cidade vale o último informado, que era o
+    polígono que ficava por cima nos mapas desenhados com ``merged.plot``.
+    """
+    ids = df_eff["cityId"].astype("int64")
+    last = df_eff.assign(_code=ids.to_numpy()).groupby("_code", sort=False)[column].last()
+    return last.reindex(match_codes(geo_df, ids)).to_numpy(dtype=float)
+
+
+def add_municipalities(ax, geo_df, cmap: str = "RdYlGn", vmin: float = 0, vmax: float = 1,
+                       linewidth: float = 0.8, edgecolor: str = "0.8") -> PatchCollection:
+    """Adiciona a coleção de municípios a ``ax`` reaproveitando os ``Path`` já montados."""
+    collection = municipality_collection(
+        municipality_paths(geo_df), cmap, vmin, vmax, linewidth=linewidth, edgecolor=edgecolor
+    )
+    ax.add_collection(collection, autolim=True)
+    ax.autoscale_view()
+    _geographic_aspect(ax, geo_df)
+    ax.axis("off")
+    return collection
+
+
+class MapRenderer:
+    """Figura de mapa reaproveitada entre anos: só cores e título mudam.
+
+    A figura não é registrada no pyplot, então sobrevive aos ``plt.close()``
+    dos outros gráficos do mesmo processo.
+    """
+
+    def __init__(self, geo_df, figsize=(12, 10), cmap="RdYlGn", vmin=0, vmax=1,
+                 linewidth=0.8, edgecolor="0.8", label="Eficiência DEA"):
+        self.geo_df = geo_df
+        self.fig = Figure(figsize=figsize)
+        self.ax = self.fig.subplots(1, 1)
+        self.collection = add_municipalities(self.ax, geo_df, cmap, vmin, vmax, linewidth, edgecolor)
+        # escores DEA podem passar de 1 (supereficiência), daí a seta no topo
+        self.fig.colorbar(self.collection, ax=self.ax, label=label, shrink=0.6, extend="max")
+        self.title = self.ax.set_title("", fontsize=14)
+        self.fig.tight_layout()
+
+    def render(self, df_eff: pd.DataFrame, title: str, filename: str):
+        values = values_by_code(self.geo_df, df_eff)
+        self.collection.set_array(np.ma.masked_invalid(values))
+        self.title.set_text(title)
+        output.save(self.fig, filename)
+
+
+def renderer_for(geo_df, **kwargs) -> MapRenderer:
+    """``MapRenderer`` reaproveitado no processo para a mesma geometria e estilo."""
+    key = (_geometry_key(geo_df), tuple(sorted(kwargs.items())))
+    if key not in _renderers:
+        _renderers[key] = MapRenderer(geo_df, **kwargs)
+    return _renderers[key]
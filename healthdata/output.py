@@ -0,0 +1,114 @@
+"""Perfis de saída dos gráficos: formato, dpi, compressão e rasterização.
+
+O perfil corrente fica num ``ContextVar`` (como o job em ``instrument``):
+``RenderJob`` ativa o perfil do gráfico com ``use`` e ``save`` o aplica ao
+``savefig``, sem que as funções de ``charts`` recebam mais um argumento.
+``publication`` reproduz a saída de sempre (PNG a 300 dpi); ``preview``
+desenha a 100 dpi com compressão zlib mínima, para iterar rápido.
+"""
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from healthdata import instrument
+
+VECTOR_FORMATS = ("pdf", "svg")
+FORMATS = ("png", "webp", *VECTOR_FORMATS)
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """Como salvar um gráfico.
+
+    ``compress_level`` é o nível zlib do PNG (``None`` = padrão do
+    matplotlib) e ``quality`` o do WebP. Em PDF/SVG, as camadas de um eixo
+    com mais de ``rasterize_above`` linhas (ou polígonos numa coleção) são
+    rasterizadas em ``dpi``; textos e eixos continuam vetoriais.
+    """
+
+    name: str
+    format: str = "png"
+    dpi: int = 300
+    compress_level: int | None = None
+    quality: int | None = None
+    rasterize_above: int | None = None
+
+    def __post_init__(self):
+        if self.format not in FORMATS:
+            raise ValueError(f"Formato de saída desconhecido: {self.format!r} (use {FORMATS})")
+
+    @property
+    def vector(self) -> bool:
+        return self.format in VECTOR_FORMATS
+
+    def path(self, filename: str) -> str:
+        """``filename`` com a extensão do formato do perfil."""
+        return f"{os.path.splitext(filename)[0]}.{self.format}"
+
+    def savefig_kwargs(self) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {"format": self.format, "dpi": self.dpi}
+        if self.format == "png" and self.compress_level is not None:
+            kwargs["pil_kwargs"] = {"compress_level": self.compress_level}
+        elif self.format == "webp":
+            kwargs["pil_kwargs"] = {"quality": self.quality or 90}
+        elif self.format == "pdf":
+            kwargs["metadata"] = {"CreationDate": None}  # saída reprodutível
+        elif self.format == "svg":
+            kwargs["metadata"] = {"Date": None}
+        return kwargs
+
+
+PUBLICATION = OutputProfile("publication")
+
+PROFILES = {
+    "publication": PUBLICATION,
+    "preview": OutputProfile("preview", dpi=100, compress_level=1),
+    "web": OutputProfile("web", format="webp", dpi=150, quality=85),
+    "pdf": OutputProfile("pdf", format="pdf", dpi=200, rasterize_above=50),
+    "svg": OutputProfile("svg", format="svg", dpi=150, rasterize_above=50),
+}
+
+_current: ContextVar[OutputProfile] = ContextVar("healthdata_output", default=PUBLICATION)
+
+
+def get_profile(name: str) -> OutputProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Perfil de saída desconhecido: {name!r} (use {', '.join(PROFILES)})") from None
+
+
+def current() -> OutputProfile:
+    return _current.get()
+
+
+@contextmanager
+def use(profile: OutputProfile) -> Iterator[OutputProfile]:
+    """Salva com ``profile`` os gráficos desenhados dentro do bloco."""
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+def rasterize_dense(fig, threshold: int):
+    """Rasteriza, eixo a eixo, as linhas e coleções com mais de ``threshold`` elementos."""
+    for ax in fig.axes:
+        dense_lines = len(ax.lines) > threshold
+        for line in ax.lines:
+            line.set_rasterized(dense_lines)
+        for collection in ax.collections:
+            collection.set_rasterized(len(collection.get_paths()) > threshold)
+
+
+def save(fig, filename: str, **kwargs):
+    """Salva ``fig`` com o perfil corrente; ``kwargs`` vão ao ``savefig`` (ex.: ``bbox_inches``)."""
+    profile = current()
+    if profile.vector and profile.rasterize_above is not None:
+        rasterize_dense(fig, profile.rasterize_above)
+    with instrument.span("savefig", format=profile.format):
+        fig.savefig(filename, **profile.savefig_kwargs(), **kwargs)
@@ -0,0 +1,533 @@
+"""Grafo de datasets e gráficos: busca cada dataset uma vez e renderiza tudo.
+
+Um ``Chart`` declara os ``Dataset`` de que depende; ``run`` reúne o conjunto
+de datasets distintos de todos os gráficos selecionados, busca-os de uma vez
+com ``fetch_all`` e distribui os DataFrames para cada gráfico. Recortes
+``ranked`` de um mesmo ano saem todos do maior ``rank`` pedido (ou de um
+ainda maior que já esteja no cache). Cada
+dataset é lido em streaming só com as colunas que seus gráficos usam.
+"""
+import ast
+import importlib.util
+import os
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field, replace
+from functools import cache
+from typing import Any
+
+import pandas as pd
+
+from healthdata import instrument
+from healthdata.client import DeaClient
+from healthdata.correlation import CORRELATION_COLS, CorrelationResult, correlate
+from healthdata.families import DEFAULT_RANKS
+from healthdata.fetch import FetchJob, fetch_all
+from healthdata.geometry import load_geometry
+from healthdata.manifest import Manifest, chart_hash, frame_hash
+from healthdata.output import PUBLICATION, OutputProfile, get_profile
+from healthdata.ranking import top_bottom
+from healthdata.render import RenderJob, render_all
+
+OUTPUT_ROOT = "resources"
+
+# Dataset.kind -> método do DeaClient
+_ENDPOINTS = {
+    "indicators": "first_semester",
+    "ranked": "ranked",
+    "redistributed": "ranked_redistributed",
+    "cities": "cities",
+}
+# kinds cujo método tem a variante ``*_frame`` (streaming com projeção)
+_FRAME_KINDS = {"indicators", "ranked", "redistributed"}
+
+# colunas lidas por família de gráfico
+LINE_COLUMNS = ("cityName", "bimonthly", "efficiency")
+RANKED_COLUMNS = ("cityId", "cityName", "bimonthly", "efficiency")
+SCATTER_COLUMNS = ("cityName", "apsPerCapita", "productivity", "efficiency")
+CORRELATION_COLUMNS = tuple(CORRELATION_COLS)
+MAP_COLUMNS = ("cityId", "efficiency")
+# semente do bootstrap/permutação: o mesmo pedido gera o mesmo resultado (e hash)
+CORRELATION_SEED = 0
+# ``ranking.top_bottom`` precisa destas para recortar ranks menores
+_DERIVE_COLUMNS = ("cityId", "efficiency")
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """Um insumo de gráfico: ``indicators``, ``ranked``, ``redistributed``, ``cities`` ou ``geometry``.
+
+    ``correlation`` é derivado: a ``CorrelationResult`` dos ``ranked`` de
+    ``rank`` em todos os ``years``, calculada uma vez para todos os gráficos,
+    com ``n_boot`` reamostragens bootstrap e ``n_perm`` permutações.
+    """
+
+    kind: str
+    year: int | None = None
+    rank: int | None = None
+    years: tuple[int, ...] = ()
+    n_boot: int = 0
+    n_perm: int = 0
+
+    def __str__(self):
+        years = ",".join(map(str, self.years)) or None
+        boot = f"boot={self.n_boot}" if self.n_boot else None
+        perm = f"perm={self.n_perm}" if self.n_perm else None
+        return "@".join(str(part) for part in (self.kind, self.year, self.rank, years, boot, perm) if part is not None)
+
+    def sources(self) -> list["Dataset"]:
+        """Datasets buscados para derivar este (ele mesmo, se não for derivado)."""
+        if self.kind == "correlation":
+            return [Dataset("ranked", year, self.rank) for year in self.years]
+        return [self]
+
+
+@dataclass
+class Chart:
+    """Um arquivo de saída, os datasets que consome e a função que o desenha.
+
+    ``render`` é chamada como ``render(*inputs, **params, filename=output)``.
+    Entradas de ``inputs`` que são tuplas de datasets viram um dicionário
+    ``{ano: DataFrame}`` (gráficos que combinam vários anos). ``columns``
+    são as colunas que ``render`` lê dos DataFrames (``None`` = todas).
+    ``profile`` define formato, dpi e compressão do arquivo salvo.
+    """
+
+    family: str
+    output: str
+    inputs: tuple
+    render: Callable
+    params: dict[str, Any] = field(default_factory=dict)
+    columns: tuple[str, ...] | None = None
+    profile: OutputProfile = PUBLICATION
+
+    def datasets(self) -> list[Dataset]:
+        found = []
+        for item in self.inputs:
+            found.extend(item if isinstance(item, tuple) else [item])
+        return found
+
+
+# módulos de estilo usados pelas funções de ``healthdata.charts`` (figura,
+# painéis, cmap dos mapas, gravação); mudar qualquer um re-renderiza tudo
+STYLE_MODULES = ("healthdata.templates", "healthdata.maps", "healthdata.output")
+
+
+@cache
+def _module_source(name: str) -> str:
+    """Código de um módulo de ``healthdata``, lido sem importá-lo."""
+    with open(importlib.util.find_spec(name).origin, encoding="utf-8") as f:
+        return f.read()
+
+
+@cache
+def _charts_source() -> dict[str, str]:
+    """Código de cada função de ``healthdata/charts.py``, lido sem importar o módulo.
+
+    Em ``""`` fica o restante do módulo (imports, constantes e helpers
+    privados), compartilhado por todos os gráficos.
+    """
+    text = _module_source("healthdata.charts")
+    functions, shared = {}, []
+    for node in ast.parse(text).body:
+        segment = ast.get_source_segment(text, node)
+        if isinstance(node, ast.FunctionDef) and not node.name.startswith("_"):
+            functions[node.name] = segment
+        else:
+            shared.append(segment)
+    return {**functions, "": "\n".join(shared)}
+
+
+@dataclass(frozen=True)
+class ChartFunction:
+    """Função de ``healthdata.charts`` referenciada pelo nome.
+
+    O módulo (matplotlib, seaborn) só é importado quando o gráfico é
+    desenhado; ``source`` deixa o ``Manifest`` calcular o hash sem importá-lo.
+    O código inclui os helpers de ``charts`` e os ``STYLE_MODULES``, onde
+    ficam tamanho da figura, painéis e cmap.
+    """
+
+    name: str
+
+    @property
+    def qualname(self) -> str:
+        return f"healthdata.charts.{self.name}"
+
+    def source(self) -> str:
+        charts = _charts_source()
+        return "\n".join([charts[self.name], charts[""], *map(_module_source, STYLE_MODULES)])
+
+    def __call__(self, *args, **kwargs):
+        from healthdata import charts
+
+        return getattr(charts, self.name)(*args, **kwargs)
+
+
+def _out(family_dir: str, name: str) -> str:
+    return os.path.join(OUTPUT_ROOT, family_dir, name)
+
+
+def _line(years, ranks):
+    return [
+        Chart("line", _out("all", f"efficiency_{year}.png"), (Dataset("indicators", year),),
+              ChartFunction("plot_line"), {"year": year}, LINE_COLUMNS)
+        for year in years
+    ]
+
+
+def _ranked(years, ranks):
+    rank = ranks["ranked"]
+    return [
+        Chart("ranked", _out("ranked", f"efficiency_{year}.png"), (Dataset("ranked", year, rank),),
+              ChartFunction("plot_ranked"), {"year": year, "rank": rank}, RANKED_COLUMNS)
+        for year in years
+    ]
+
+
+def _ranked_all(years, ranks):
+    rank = ranks["ranked"]
+    frames = tuple(Dataset("ranked", year, rank) for year in years)
+    return [Chart("ranked-all", _out("ranked", "efficiency_all_years.png"), (frames,),
+                  ChartFunction("plot_ranked_all"), {"rank": rank}, RANKED_COLUMNS)]
+
+
+def _redistributed(years, ranks):
+    rank = ranks["redistributed"]
+    return [
+        Chart("redistributed", _out("ranked", f"efficiency_comparison_{year}.png"),
+              (Dataset("ranked", year, rank), Dataset("redistributed", year, rank)),
+              ChartFunction("plot_redistributed"), {"year": year}, RANKED_COLUMNS)
+        for year in years
+    ]
+
+
+def _scatter(years, ranks):
+    rank = ranks["scatter"]
+    return [
+        Chart("scatter", _out("scatter", f"dispersion_{year}.png"), (Dataset("ranked", year, rank),),
+              ChartFunction("plot_scatter"), {"year": year}, SCATTER_COLUMNS)
+        for year in years
+    ]
+
+
+def _correlation(years, ranks):
+    result = Dataset("correlation", rank=ranks["correlation"], years=tuple(years))
+    return [
+        Chart("correlation", _out("correlation", f"correlation_{year}.png"), (result,),
+              ChartFunction("plot_correlation"), {"year": year}, CORRELATION_COLUMNS)
+        for year in years
+    ]
+
+
+def _correlation_all(years, ranks):
+    result = Dataset("correlation", rank=ranks["correlation"], years=tuple(years))
+    return [Chart("correlation-all", _out("correlation", "correlation_all_years.png"), (result,),
+                  ChartFunction("plot_correlation_all"), {}, CORRELATION_COLUMNS)]
+
+
+def _map(years, ranks):
+    rank = ranks["map"]
+    return [
+        Chart("map", _out("map", f"map_{year}.png"),
+              (Dataset("ranked", year, rank), Dataset("geometry")),
+              ChartFunction("plot_map"), {"year": year}, MAP_COLUMNS)
+        for year in years
+    ]
+
+
+def _map_stats(years, ranks):
+    frames = tuple(Dataset("ranked", year, ranks["map"]) for year in years)
+    return [Chart("map-stats", _out("map", "map_stats_text.png"),
+                  (frames, Dataset("geometry")),
+                  ChartFunction("plot_map_stats"), {}, MAP_COLUMNS)]
+
+
+FAMILIES: dict[str, Callable[[list[int], dict[str, int]], list[Chart]]] = {
+    "line": _line,
+    "ranked": _ranked,
+    "ranked-all": _ranked_all,
+    "redistributed": _redistributed,
+    "scatter": _scatter,
+    "correlation": _correlation,
+    "correlation-all": _correlation_all,
+    "map": _map,
+    "map-stats": _map_stats,
+}
+
+
+def plan(
+    families: list[str],
+    years: list[int],
+    ranks: dict[str, int] | None = None,
+    profiles: dict[str, str] | None = None,
+    n_boot: int = 0,
+    n_perm: int = 0,
+) -> list[Chart]:
+    """Monta a lista de gráficos das famílias pedidas para os anos dados.
+
+    ``profiles`` escolhe o perfil de saída por família (padrão:
+    ``publication``); a extensão do arquivo segue o formato do perfil.
+    ``n_boot``/``n_perm`` > 0 anotam os gráficos de correlação com o
+    intervalo bootstrap e a significância por permutação.
+    """
+    ranks = {**DEFAULT_RANKS, **(ranks or {})}
+    unknown = [family for family in families if family not in FAMILIES]
+    if unknown:
+        raise ValueError(f"Famílias de gráfico desconhecidas: {unknown}")
+    charts = []
+    for family in families:
+        profile = get_profile(profiles[family]) if profiles and family in profiles else PUBLICATION
+        for chart in FAMILIES[family](years, ranks):
+            inputs = tuple(
+                replace(item, n_boot=n_boot, n_perm=n_perm)
+                if isinstance(item, Dataset) and item.kind == "correlation" else item
+                for item in chart.inputs
+            )
+            charts.append(replace(chart, inputs=inputs, output=profile.path(chart.output), profile=profile))
+    return charts
+
+
+def _widest_ranked(datasets: list[Dataset], cached: dict[int, list[int]] | None = None) -> dict[Dataset, Dataset]:
+    """Mapeia cada dataset ``ranked`` para o de maior ``rank`` do mesmo ano.
+
+    Se ``cached[ano]`` tem um rank já em cache que cobre esse maior, o
+    menor deles é usado no lugar e nada desse ano vai à rede.
+    """
+    widest: dict[int, int] = {}
+    for ds in datasets:
+        if ds.kind == "ranked":
+            widest[ds.year] = max(widest.get(ds.year, 0), ds.rank)
+    for year, rank in widest.items():
+        covering = [cached_rank for cached_rank in (cached or {}).get(year, ()) if cached_rank >= rank]
+        if covering:
+            widest[year] = min(covering)
+    return {ds: Dataset("ranked", ds.year, widest[ds.year]) for ds in datasets if ds.kind == "ranked"}
+
+
+def columns_by_dataset(charts_to_render: list[Chart]) -> dict[Dataset, tuple[str, ...] | None]:
+    """União das colunas que cada dataset precisa (``None`` se algum gráfico lê todas)."""
+    needed: dict[Dataset, set[str] | None] = {}
+    for chart in charts_to_render:
+        for ds in chart.datasets():
+            current = needed.get(ds, set())
+            if current is None or chart.columns is None:
+                needed[ds] = None
+            else:
+                needed[ds] = current | set(chart.columns)
+    return {ds: None if cols is None else tuple(sorted(cols)) for ds, cols in needed.items()}
+
+
+def _union(a: tuple[str, ...] | None, b: tuple[str, ...] | None) -> tuple[str, ...] | None:
+    return None if a is None or b is None else tuple(sorted(set(a) | set(b)))
+
+
+@dataclass
+class LoadPlan:
+    """Como os datasets pedidos saem das buscas: jobs HTTP, recortes locais e derivados."""
+
+    requested: list[Dataset]
+    datasets: list[Dataset]
+    widest: dict[Dataset, Dataset]
+    columns: dict[Dataset, tuple[str, ...] | None]
+    jobs: dict[Dataset, FetchJob]
+
+
+def plan_loads(
+    datasets: list[Dataset],
+    derive_ranks: bool = True,
+    columns: dict[Dataset, tuple[str, ...] | None] | None = None,
+    cached: dict[int, list[int]] | None = None,
+) -> LoadPlan:
+    """Resolve derivados e recortes e monta um ``FetchJob`` por dataset a buscar.
+
+    ``cached`` (ano -> ranks de ``ranked`` em cache) deixa um recorte sair
+    de um payload mais largo já gravado, em vez de uma nova busca.
+    """
+    requested = list(dict.fromkeys(datasets))
+    columns = dict(columns or {})
+    for ds in requested:
+        for source in ds.sources():
+            if source != ds:
+                inherited = columns.get(ds)
+                if source in columns or source in requested:
+                    inherited = _union(columns.get(source), inherited)
+                columns[source] = inherited
+    datasets = list(dict.fromkeys(source for ds in requested for source in ds.sources()))
+    widest = _widest_ranked(datasets, cached) if derive_ranks else {}
+    to_fetch = list(dict.fromkeys(widest.get(ds, ds) for ds in datasets))
+
+    fetch_columns: dict[Dataset, set[str] | None] = {}
+    for ds in datasets:
+        source = widest.get(ds, ds)
+        cols = columns.get(ds)
+        if cols is None or (source in fetch_columns and fetch_columns[source] is None):
+            fetch_columns[source] = None
+            continue
+        merged = fetch_columns.get(source, set()) | set(cols)
+        if source != ds:
+            merged |= set(_DERIVE_COLUMNS)
+        fetch_columns[source] = merged
+
+    jobs = {}
+    for ds in to_fetch:
+        if ds.kind not in _ENDPOINTS:
+            continue
+        cols = fetch_columns.get(ds)
+        frame = ds.kind in _FRAME_KINDS
+        jobs[ds] = FetchJob(_ENDPOINTS[ds.kind], ds.year, ds.rank, "frame" if frame else None,
+                            tuple(sorted(cols)) if frame and cols is not None else None)
+    return LoadPlan(requested, datasets, widest, columns, jobs)
+
+
+def fetch_datasets(client: DeaClient, load_plan: LoadPlan) -> dict[Dataset, pd.DataFrame]:
+    """Executa os jobs do plano; falhas ficam de fora do resultado."""
+    results, _ = fetch_all(client, list(load_plan.jobs.values()))
+    fetched = {}
+    for ds, job in load_plan.jobs.items():
+        if job not in results:
+            continue
+        if isinstance(results[job], pd.DataFrame):
+            fetched[ds] = results[job]
+            continue
+        with instrument.job(str(job)), instrument.span("frame"):
+            fetched[ds] = pd.DataFrame(results[job])
+    return fetched
+
+
+def derive_datasets(load_plan: LoadPlan, fetched: dict[Dataset, pd.DataFrame]) -> dict[Dataset, Any]:
+    """Acrescenta aos dados buscados os recortes de rank, a geometria e os derivados."""
+    loaded: dict[Dataset, Any] = dict(fetched)
+    columns = load_plan.columns
+    for ds, source in load_plan.widest.items():
+        if ds != source and source in loaded:
+            derived = top_bottom(loaded[source], ds.rank)
+            if columns.get(ds) is not None:
+                derived = derived[[col for col in columns[ds] if col in derived.columns]]
+            loaded[ds] = derived
+    if Dataset("geometry") in load_plan.datasets:
+        loaded[Dataset("geometry")] = load_geometry()
+
+    for ds in load_plan.requested:
+        if ds.kind == "correlation":
+            frames = {source.year: loaded[source] for source in ds.sources() if source in loaded}
+            if not frames:
+                continue
+            try:
+                loaded[ds] = correlate(frames, list(CORRELATION_COLS), n_boot=ds.n_boot, n_perm=ds.n_perm,
+                                       seed=CORRELATION_SEED)
+            except ValueError as e:
+                print(f"[{ds}] Erro: {e}")
+    return loaded
+
+
+def load_datasets(
+    client: DeaClient,
+    datasets: list[Dataset],
+    derive_ranks: bool = True,
+    columns: dict[Dataset, tuple[str, ...] | None] | None = None,
+) -> dict[Dataset, Any]:
+    """Busca cada dataset distinto uma única vez; falhas ficam de fora do resultado.
+
+    Com ``derive_ranks``, só o maior ``rank`` de cada ano vai ao servidor e
+    os menores são recortados localmente com ``ranking.top_bottom``; um
+    ``ranked`` em cache com rank igual ou maior dispensa a busca.
+    ``columns`` restringe as colunas lidas de cada dataset (ausente = todas).
+    Datasets derivados (``correlation``) são calculados depois da busca.
+    """
+    years = {source.year for ds in datasets for source in ds.sources() if source.kind == "ranked"}
+    cached = {year: client.cached_ranks(year) for year in years} if derive_ranks else None
+    load_plan = plan_loads(datasets, derive_ranks, columns, cached)
+    return derive_datasets(load_plan, fetch_datasets(client, load_plan))
+
+
+def _resolve(item, loaded: dict[Dataset, Any]):
+    if isinstance(item, tuple):
+        return {ds.year: loaded[ds] for ds in item if ds in loaded}
+    return loaded[item]
+
+
+def missing_datasets(chart: Chart, loaded: dict[Dataset, Any]) -> list[Dataset]:
+    """Datasets de ``chart`` (e as fontes dos derivados) que não foram carregados.
+
+    Um ano que falhou numa entrada de vários anos também conta: o gráfico
+    não é desenhado com só uma parte dos anos.
+    """
+    missing = []
+    for ds in chart.datasets():
+        sources = [ds] if ds.kind == "geometry" else [ds, *ds.sources()]
+        missing.extend(source for source in sources if source not in loaded)
+    return list(dict.fromkeys(missing))
+
+
+def render_job(chart: Chart, loaded: dict[Dataset, Any]) -> RenderJob:
+    inputs = [_resolve(item, loaded) for item in chart.inputs]
+    return RenderJob(chart.output, chart.render, inputs, chart.params, chart.profile)
+
+
+def chart_digest(chart: Chart, loaded: dict[Dataset, Any], hashes: dict[Dataset, str]) -> str:
+    """Hash das entradas, parâmetros, perfil de saída e código de renderização de ``chart``."""
+    input_hashes = []
+    for ds in chart.datasets():
+        if ds in loaded:
+            if ds not in hashes:
+                value = loaded[ds]
+                hashes[ds] = frame_hash(value.to_frame() if isinstance(value, CorrelationResult) else value)
+            input_hashes.append(f"{ds}:{hashes[ds]}")
+    return chart_hash(chart.render, {**chart.params, "profile": asdict(chart.profile)}, input_hashes)
+
+
+def run(
+    charts_to_render: list[Chart],
+    client: DeaClient | None = None,
+    processes: int | None = None,
+    force: bool = False,
+    report: bool = False,
+) -> dict[str, Exception]:
+    """Busca os datasets de todos os gráficos e renderiza os que mudaram.
+
+    Devolve os erros por arquivo de saída; um gráfico cujo dataset falhou
+    é pulado sem interromper os demais e entra nos erros com um
+    ``LookupError``. A renderização é distribuída em até
+    ``processes`` processos (``1`` renderiza no processo atual). Gráficos
+    cujo hash no ``Manifest`` bate com as entradas atuais são pulados, a
+    menos que ``force`` seja verdadeiro.
+
+    Os eventos de ``instrument`` da execução vão para o arquivo de trace
+    configurado; com ``report`` (ou trace ligado) a tabela-resumo é impressa.
+    """
+    instrument.configure_from_env()
+    since = instrument.mark()
+    client = client or DeaClient()
+    datasets = [ds for chart in charts_to_render for ds in chart.datasets()]
+    loaded = load_datasets(client, datasets, columns=columns_by_dataset(charts_to_render))
+    print(f"{len(loaded)} datasets carregados para {len(charts_to_render)} gráficos.")
+
+    manifest = Manifest()
+    hashes: dict[Dataset, str] = {}
+    digests: dict[str, str] = {}
+    skipped: dict[str, Exception] = {}
+    jobs = []
+    for chart in charts_to_render:
+        missing = [str(ds) for ds in missing_datasets(chart, loaded)]
+        if missing:
+            print(f"[{chart.output}] Pulado: datasets indisponíveis {missing}")
+            skipped[chart.output] = LookupError(f"datasets indisponíveis {missing}")
+            continue
+        digest = chart_digest(chart, loaded, hashes)
+        if not force and manifest.is_current(chart.output, digest):
+            continue
+        digests[chart.output] = digest
+        jobs.append(render_job(chart, loaded))
+
+    print(f"{len(jobs)} gráficos a renderizar, {len(charts_to_render) - len(jobs)} inalterados ou pulados.")
+    errors = {**skipped, **render_all(jobs, processes)}
+    for output, digest in digests.items():
+        if output not in errors:
+            manifest.record(output, digest)
+    manifest.save()
+
+    run_events = instrument.events(since)
+    instrument.flush(run_events)
+    if report or instrument.enabled():
+        print(instrument.summary(run_events))
+    return errors
@@ -0,0 +1,114 @@
+"""Redistribuição vetorizada de eficiência entre cidades Top e Bottom.
+
+Substitui os laços por mês com ``iterrows``/``df.at`` de
+``old/redistribute.py`` e ``old/predict.py``. Para cada período (ex.: ano ×
+mês) o excedente das cidades Top acima do teto é cortado e repassado às
+cidades Bottom segundo uma política registrada em ``POLICIES``. Tudo é feito
+com ``groupby().ngroup()`` e ``np.bincount``, sem laço em Python por
+período ou por cidade.
+"""
+from collections.abc import Callable, Collection
+
+import numpy as np
+import pandas as pd
+
+from healthdata.ranking import top_bottom_ids
+
+# política(eficiência dos receptores, grupo de cada receptor, excedente por grupo, teto) -> ganho por receptor
+Policy = Callable[[np.ndarray, np.ndarray, np.ndarray, float], np.ndarray]
+
+POLICIES: dict[str, Policy] = {}
+
+
+def register_policy(name: str):
+    """Registra uma política de redistribuição em ``POLICIES``."""
+    def decorator(func: Policy) -> Policy:
+        POLICIES[name] = func
+        return func
+    return decorator
+
+
+@register_policy("equal")
+def equal_share(efficiency, groups, surplus, cap):
+    """Cada receptor do período recebe a mesma parte do excedente (regra original)."""
+    counts = np.bincount(groups, minlength=len(surplus))
+    return surplus[groups] / counts[groups]
+
+
+@register_policy("gap")
+def proportional_to_gap(efficiency, groups, surplus, cap):
+    """Excedente dividido na proporção da distância de cada receptor até o teto."""
+    gap = np.clip(cap - efficiency, 0, None)
+    total_gap = np.bincount(groups, weights=gap, minlength=len(surplus))
+    share = np.divide(gap, total_gap[groups], out=np.zeros_like(gap), where=total_gap[groups] > 0)
+    return surplus[groups] * share
+
+
+@register_policy("capped")
+def capped_share(efficiency, groups, surplus, cap):
+    """Parte igual, mas nenhum receptor passa do teto; o que sobra não é repassado."""
+    return np.minimum(equal_share(efficiency, groups, surplus, cap), np.clip(cap - efficiency, 0, None))
+
+
+def _as_mask(df: pd.DataFrame, cities, city_col: str) -> np.ndarray:
+    """Máscara booleana a partir de uma coleção de cidades ou de uma máscara pronta."""
+    if isinstance(cities, (pd.Series, np.ndarray)) and cities.dtype == bool:
+        return np.asarray(cities)
+    return df[city_col].isin(cities).to_numpy()
+
+
+def redistribute(
+    df: pd.DataFrame,
+    top_cities: Collection | np.ndarray,
+    bottom_cities: Collection | np.ndarray,
+    max_efficiency: float = 1.0,
+    policy: str | Policy = "equal",
+    by: str | list[str] = "month",
+    city_col: str = "city",
+    value_col: str = "efficiency",
+) -> pd.DataFrame:
+    """Cópia de ``df`` com a eficiência redistribuída dentro de cada período ``by``.
+
+    ``top_cities``/``bottom_cities`` são coleções de cidades (valem para
+    todos os períodos) ou máscaras booleanas alinhadas às linhas de ``df``,
+    o que permite conjuntos diferentes por ano. Com ``by=["year", "month"]``
+    vários anos são simulados numa única passada.
+    """
+    policy_func = POLICIES[policy] if isinstance(policy, str) else policy
+    adjusted_df = df.copy()
+    if df.empty:
+        return adjusted_df
+
+    efficiency = df[value_col].to_numpy(dtype=float)
+    groups = df.groupby(by, sort=False).ngroup().to_numpy()
+    n_groups = groups.max() + 1
+    top = _as_mask(df, top_cities, city_col)
+    bottom = _as_mask(df, bottom_cities, city_col) & ~top
+
+    surplus = np.bincount(
+        groups[top], weights=np.clip(efficiency[top] - max_efficiency, 0, None), minlength=n_groups
+    )
+
+    result = efficiency.copy()
+    result[top] = np.minimum(efficiency[top], max_efficiency)
+    if bottom.any():
+        result[bottom] += policy_func(efficiency[bottom], groups[bottom], surplus, max_efficiency)
+
+    adjusted_df[value_col] = result
+    return adjusted_df
+
+
+def redistribute_ranked(
+    df: pd.DataFrame, rank: int, max_efficiency: float = 1.0, policy: str | Policy = "equal"
+) -> pd.DataFrame:
+    """Simulação local equivalente ao POST ``/ranked/redistributed`` de um ano.
+
+    ``df`` são os indicadores do ano (``cityId``, ``bimonthly``,
+    ``efficiency``), p.ex. o payload ``ranked`` mais largo. Devolve só as
+    linhas das ``rank`` melhores e piores cidades, já redistribuídas.
+    """
+    top_ids, bottom_ids = top_bottom_ids(df, rank)
+    ranked = df[df["cityId"].isin(np.union1d(top_ids, bottom_ids))].reset_index(drop=True)
+    return redistribute(
+        ranked, top_ids, bottom_ids, max_efficiency, policy, by="bimonthly", city_col="cityId"
+    )
@@ -0,0 +1,96 @@
+"""Renderização paralela dos gráficos em um pool de processos.
+
+Cada ``RenderJob`` já carrega os DataFrames de que precisa (nada de URLs),
+então os workers só desenham e salvam. Os workers sobem com o backend Agg
+e o cache de fontes do matplotlib aquecidos.
+"""
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any
+
+from healthdata import instrument, output
+from healthdata.output import PUBLICATION, OutputProfile
+
+
+@dataclass
+class RenderJob:
+    """Chamada ``render(*inputs, **params, filename=output)`` pronta para ir a um worker.
+
+    O gráfico é salvo com ``profile`` (formato, dpi, compressão).
+    """
+
+    output: str
+    render: Callable
+    inputs: list[Any]
+    params: dict[str, Any] = field(default_factory=dict)
+    profile: OutputProfile = PUBLICATION
+
+    def run(self):
+        """Renderiza e registra os eventos ``plot`` (sem o savefig) e ``output``."""
+        os.makedirs(os.path.dirname(self.output) or ".", exist_ok=True)
+        with instrument.job(self.output), instrument.profiled(self.output), output.use(self.profile):
+            since = instrument.mark()
+            start = time.perf_counter()
+            self.render(*self.inputs, **self.params, filename=self.output)
+            elapsed = time.perf_counter() - start
+            saving = sum(e["seconds"] for e in instrument.events(since) if e["stage"] == "savefig")
+            instrument.record("plot", elapsed - saving)
+            instrument.record("output", 0.0, bytes=os.path.getsize(self.output))
+
+
+def _init_worker(settings: dict[str, Any]):
+    instrument.configure(**settings)
+
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from matplotlib import font_manager
+
+    font_manager.findfont(font_manager.FontProperties())
+    font_manager.findfont(font_manager.FontProperties(weight="bold"))
+
+    import healthdata.charts  # noqa: F401
+
+
+def _run_job(job: RenderJob) -> list[dict[str, Any]]:
+    """Roda ``job`` num worker e devolve os eventos de instrumentação gerados."""
+    instrument.drain()
+    job.run()
+    return instrument.drain()
+
+
+def render_all(jobs: list[RenderJob], processes: int | None = None) -> dict[str, Exception]:
+    """Renderiza ``jobs`` e devolve os erros por arquivo de saída.
+
+    ``processes=1`` (ou um único job) renderiza no próprio processo; caso
+    contrário usa até ``processes`` workers (padrão: número de CPUs).
+    """
+    errors: dict[str, Exception] = {}
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+
+    if processes <= 1:
+        for job in jobs:
+            try:
+                job.run()
+                print(f"Gráfico salvo em {job.output}")
+            except Exception as e:
+                errors[job.output] = e
+                print(f"[{job.output}] Erro: {e}")
+        return errors
+
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(instrument.settings(),)
+    ) as pool:
+        futures = {pool.submit(_run_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                instrument.extend(future.result())
+                print(f"Gráfico salvo em {job.output}")
+            except Exception as e:
+                errors[job.output] = e
+                print(f"[{job.output}] Erro: {e}")
+    return errors
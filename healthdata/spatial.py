@@ -0,0 +1,283 @@
+"""Autocorrelação espacial da eficiência: I de Moran global e clusters LISA.
+
+A matriz de contiguidade dos municípios sai de uma consulta em lote a um
+``STRtree`` (só pares cujos retângulos se tocam são testados, sem comparar
+todos os polígonos entre si) e é gravada esparsa em
+``.cache/healthdata/weights``, com o hash do GeoJSON no nome, como a
+geometria de ``geometry.load_geometry``.
+
+A inferência é por permutação, em blocos de ``chunk`` permutações:
+
+- global: valores embaralhados entre os municípios, com todas as
+  defasagens espaciais de um bloco num único produto esparso;
+- local: permutação condicional (o valor do município fica fixo e os
+  vizinhos são sorteados entre os demais), com um mesmo sorteio
+  reaproveitado por todos os municípios, como o ``crand`` do PySAL.
+"""
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from healthdata.geometry import GEOJSON_FILE, GEOMETRY_CACHE_DIR, file_hash, load_geometry, match_codes
+
+WEIGHTS_CACHE_DIR = os.path.join(os.path.dirname(GEOMETRY_CACHE_DIR), "weights")
+SPATIAL_DIR = "resources/spatial"
+SPATIAL_COLUMNS = ("cityId", "efficiency")
+CONTIGUITY = ("queen", "rook")
+
+# código do cluster LISA -> rótulo (0 = não significativo)
+CLUSTERS = {
+    0: "Não significativo",
+    1: "Alto-Alto (hot spot)",
+    2: "Baixo-Alto",
+    3: "Baixo-Baixo (cold spot)",
+    4: "Alto-Baixo",
+}
+
+_loaded: dict[str, "Weights"] = {}
+
+
+@dataclass
+class Weights:
+    """Contiguidade binária esparsa (CSR) entre os municípios, na ordem de ``codes``."""
+
+    codes: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    kind: str = "queen"
+
+    @property
+    def cardinalities(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    @property
+    def islands(self) -> np.ndarray:
+        """Códigos sem nenhum vizinho."""
+        return self.codes[self.cardinalities == 0]
+
+    def matrix(self, keep: np.ndarray | None = None):
+        """``scipy.sparse.csr_matrix`` padronizada por linha, opcionalmente só com as linhas/colunas ``keep``."""
+        from scipy import sparse
+
+        n = len(self.codes)
+        w = sparse.csr_matrix((np.ones(len(self.indices)), self.indices, self.indptr), shape=(n, n))
+        if keep is not None:
+            w = w[keep][:, keep]
+        rows = np.asarray(w.sum(axis=1)).ravel()
+        return sparse.diags(np.divide(1.0, rows, out=np.zeros_like(rows), where=rows > 0)) @ w
+
+
+def contiguity(geoms: np.ndarray, kind: str = "queen") -> tuple[np.ndarray, np.ndarray]:
+    """``(indptr, indices)`` CSR da contiguidade ``queen`` (qualquer ponto em comum) ou ``rook`` (trecho de fronteira).
+
+    Um ``STRtree`` devolve em lote os pares cujos retângulos se cruzam e só
+    eles passam pelo teste exato, em vez de todos os n² pares de polígonos.
+    """
+    import shapely
+
+    if kind not in CONTIGUITY:
+        raise ValueError(f"Contiguidade desconhecida: {kind!r} (use {CONTIGUITY})")
+    left, right = shapely.STRtree(geoms).query(geoms, predicate="intersects")
+    pairs = left != right
+    left, right = left[pairs], right[pairs]
+    if kind == "rook":
+        boundaries = shapely.boundary(geoms)
+        shared = shapely.length(shapely.intersection(boundaries[left], boundaries[right])) > 0
+        left, right = left[shared], right[shared]
+
+    order = np.lexsort((right, left))
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(left, minlength=len(geoms)))])
+    return indptr, right[order].astype(np.int32)
+
+
+def build_weights(path: str = GEOJSON_FILE, kind: str = "queen") -> Weights:
+    """``Weights`` dos municípios de ``path``, na ordem do GeoJSON."""
+    geo_df = load_geometry(path)
+    indptr, indices = contiguity(np.asarray(geo_df.geometry), kind)
+    return Weights(geo_df["code"].to_numpy(dtype=np.int64), indptr, indices, kind)
+
+
+def _store_path(path: str, digest: str, kind: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(WEIGHTS_CACHE_DIR, f"{stem}-{digest[:16]}-{kind}.npz")
+
+
+def load_weights(path: str = GEOJSON_FILE, kind: str = "queen") -> Weights:
+    """``Weights`` do cache em memória, do disco ou montados do GeoJSON (refeitos se o hash mudar)."""
+    store = _store_path(path, file_hash(path), kind)
+    if store in _loaded:
+        return _loaded[store]
+
+    if os.path.exists(store):
+        with np.load(store) as data:
+            weights = Weights(data["codes"], data["indptr"], data["indices"], kind)
+    else:
+        weights = build_weights(path, kind)
+        os.makedirs(WEIGHTS_CACHE_DIR, exist_ok=True)
+        tmp = f"{store}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, codes=weights.codes, indptr=weights.indptr, indices=weights.indices)
+        os.replace(tmp, store)
+
+    _loaded[store] = weights
+    return weights
+
+
+@dataclass
+class SpatialResult:
+    """Moran global e LISA de um ano, nos municípios com valor (``codes`` no formato da API)."""
+
+    year: int
+    codes: np.ndarray
+    values: np.ndarray
+    moran: float
+    expected: float
+    p_value: float | None
+    local: np.ndarray
+    lag: np.ndarray
+    local_p: np.ndarray | None
+    clusters: np.ndarray
+    alpha: float = 0.05
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "year": self.year,
+            "cityId": self.codes,
+            "efficiency": self.values,
+            "lag": self.lag,
+            "local_i": self.local,
+            "p_value": self.local_p if self.local_p is not None else np.nan,
+            "cluster": self.clusters,
+            "label": [CLUSTERS[c] for c in self.clusters],
+        })
+
+
+def _pseudo_p(exceed: np.ndarray, permutations: int) -> np.ndarray:
+    """p-valor de permutação unilateral, na cauda em que o observado está (como o PySAL)."""
+    return (np.minimum(exceed, permutations - exceed) + 1) / (permutations + 1)
+
+
+def _global_exceed(w, z: np.ndarray, observed: float, permutations: int, chunk: int, rng) -> int:
+    """Quantas permutações têm I de Moran ≥ ``observed``."""
+    exceed = 0
+    scale = len(z) / w.sum() / (z @ z)
+    for start in range(0, permutations, chunk):
+        b = min(chunk, permutations - start)
+        shuffled = z[np.argsort(rng.random((b, len(z))), axis=1)].T  # (n, b)
+        exceed += int((scale * np.einsum("nb,nb->b", shuffled, w @ shuffled) >= observed).sum())
+    return exceed
+
+
+def _local_exceed(w, z: np.ndarray, observed: np.ndarray, permutations: int, chunk: int, rng) -> np.ndarray:
+    """Por município, quantas permutações condicionais têm I local ≥ o observado."""
+    n = len(z)
+    counts = np.diff(w.indptr)
+    k = int(counts.max(initial=0))
+    # pesos de cada linha alinhados à esquerda e completados com zero até ``k``
+    padded = np.zeros((n, k))
+    padded[np.repeat(np.arange(n), counts), np.arange(len(w.data)) - np.repeat(w.indptr[:-1], counts)] = w.data
+    m2 = z @ z / n
+    exceed = np.zeros(n, dtype=np.int64)
+    chunk = max(1, min(chunk, 2_000_000 // max(n * k, 1)))  # limita o bloco (b, n, k) de sorteios
+    for start in range(0, permutations, chunk):
+        b = min(chunk, permutations - start)
+        # ``k`` sorteios sem reposição entre os ``n - 1`` outros; índices >= i pulam o próprio i
+        draws = np.argsort(rng.random((b, n - 1)), axis=1)[:, :k]
+        neighbors = draws[:, None, :] + (draws[:, None, :] >= np.arange(n)[None, :, None])
+        lag = np.einsum("nk,bnk->bn", padded, z[neighbors])
+        exceed += (z / m2 * lag >= observed).sum(axis=0)
+    return exceed
+
+
+def moran_lisa(
+    weights: Weights,
+    df: pd.DataFrame,
+    year: int,
+    permutations: int = 999,
+    alpha: float = 0.05,
+    seed: int | None = None,
+    chunk: int = 200,
+) -> SpatialResult:
+    """I de Moran global e local da eficiência média de cada cidade em ``df``.
+
+    Só entram os municípios com valor; a matriz é recortada e
+    re-padronizada sobre eles. Ilhas (sem vizinhos) ficam fora dos clusters.
+    Com ``permutations=0`` não há p-valores e nenhum cluster é marcado.
+    """
+    means = df.groupby("cityId")["efficiency"].mean().dropna()
+    ids = means.index.to_numpy(dtype=np.int64)
+    codes = match_codes(pd.DataFrame({"code": weights.codes}), ids)
+    keep = np.isin(codes, ids)
+    codes = codes[keep]
+    values = means.reindex(codes).to_numpy(dtype=float)
+    w = weights.matrix(keep).tocsr()
+
+    n = len(values)
+    if n < 3:
+        raise ValueError(f"Poucos municípios com valor em {year} para a autocorrelação espacial ({n}).")
+    z = values - values.mean()
+    lag = w @ z
+    moran = n / w.sum() * (z @ lag) / (z @ z)
+    local = z / (z @ z / n) * lag
+
+    result = SpatialResult(year, codes, values, moran, -1 / (n - 1), None, local, w @ values, None,
+                           np.zeros(n, dtype=np.int64), alpha)
+    if permutations > 0:
+        rng = np.random.default_rng(seed)
+        result.p_value = float(_pseudo_p(_global_exceed(w, z, moran, permutations, chunk, rng), permutations))
+        has_neighbors = np.diff(w.indptr) > 0
+        local_p = _pseudo_p(_local_exceed(w, z, local, permutations, chunk, rng), permutations)
+        result.local_p = np.where(has_neighbors, local_p, np.nan)
+        quadrant = np.where(z > 0, np.where(lag > 0, 1, 4), np.where(lag > 0, 2, 3))
+        result.clusters = np.where(has_neighbors & (local_p <= alpha), quadrant, 0)
+    return result
+
+
+def load_frames(client=None, years: list[int] = (), concurrency: int | None = None) -> dict[int, pd.DataFrame]:
+    """Indicadores (só ``cityId`` e ``efficiency``) de cada ano."""
+    from healthdata.client import DeaClient
+    from healthdata.fetch import FetchJob, fetch_all
+
+    jobs = {year: FetchJob("first_semester", year, variant="frame", columns=SPATIAL_COLUMNS) for year in years}
+    results, _ = fetch_all(client or DeaClient(), list(jobs.values()), concurrency)
+    return {year: results[job] for year, job in jobs.items() if job in results}
+
+
+def summary(results: list[SpatialResult]) -> pd.DataFrame:
+    """Uma linha por ano: I de Moran, esperado sob aleatoriedade, p-valor e contagem por cluster."""
+    rows = []
+    for result in results:
+        counts = np.bincount(result.clusters, minlength=len(CLUSTERS))
+        rows.append({
+            "year": result.year, "cities": len(result.codes), "moran_i": result.moran,
+            "expected": result.expected, "p_value": result.p_value,
+            "hot_spots": int(counts[1]), "cold_spots": int(counts[3]),
+            "low_high": int(counts[2]), "high_low": int(counts[4]),
+        })
+    return pd.DataFrame(rows)
+
+
+def save_results(results: list[SpatialResult], directory: str = SPATIAL_DIR, plots: bool = True) -> list[str]:
+    """Grava ``moran.csv``, ``lisa.csv`` e um mapa de hot/cold spots por ano; devolve os arquivos."""
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    tables = {"moran": summary(results), "lisa": pd.concat([result.to_frame() for result in results], ignore_index=True)}
+    for name, table in tables.items():
+        path = os.path.join(directory, f"{name}.csv")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        table.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        written.append(path)
+    if not plots:
+        return written
+
+    from healthdata.charts import plot_lisa
+
+    geo_df = load_geometry()
+    for result in results:
+        filename = os.path.join(directory, f"lisa_{result.year}.png")
+        plot_lisa(result, geo_df, filename)
+        written.append(filename)
+    return written
@@ -0,0 +1,131 @@
+"""Armazenamento colunar dos indicadores de todos os anos.
+
+Cada ingestão grava uma partição Parquet ``<raiz>/<dataset>/year=<ano>/``
+com tipos compactos: ``cityName`` como dicionário, ``cityId`` int32 (o
+Parquet já o codifica em dicionário no disco e a consulta o devolve
+categórico), ``bimonthly`` int8 e métricas float32. ``rankTop``/``rankBottom``
+guardam a posição de cada cidade pela eficiência média do ano (nula para
+cidades sem eficiência), para filtrar faixas de ranking sem recalcular. As
+consultas devolvem DataFrames com dtypes Arrow.
+"""
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from healthdata.cache import DEFAULT_CACHE_DIR
+from healthdata.ranking import city_means
+
+DEFAULT_STORE_DIR = os.path.join(DEFAULT_CACHE_DIR, "store")
+
+METRICS = (
+    "apsPerCapita",
+    "teamsDensity",
+    "healthCareVisitsPerThousandReais",
+    "cobertura",
+    "productivity",
+    "efficiency",
+)
+
+SCHEMA = pa.schema(
+    [
+        ("cityId", pa.int32()),
+        ("cityName", pa.dictionary(pa.int32(), pa.string())),
+        ("bimonthly", pa.int8()),
+        *[(metric, pa.float32()) for metric in METRICS],
+        ("rankTop", pa.int32()),
+        ("rankBottom", pa.int32()),
+    ]
+)
+
+
+def _rank_positions(df: pd.DataFrame) -> tuple[pa.Array, pa.Array]:
+    """Posição de cada linha no ranking do ano (1 = melhor / 1 = pior).
+
+    Cidades sem eficiência média ficam fora do ranking: a posição é nula e
+    nenhum filtro de ``rank_band`` as seleciona.
+    """
+    means = city_means(df)
+    positions = []
+    for ascending in (False, True):
+        rank = df["cityId"].map(means.rank(ascending=ascending, method="first")).to_numpy("float64")
+        missing = np.isnan(rank)
+        positions.append(pa.array(np.where(missing, 0, rank).astype("int32"), mask=missing))
+    return positions[0], positions[1]
+
+
+def to_table(records: list[dict] | pd.DataFrame) -> pa.Table:
+    """Converte um payload da API na tabela tipada de ``SCHEMA``."""
+    df = pd.DataFrame(records)
+    rank_top, rank_bottom = _rank_positions(df)
+    columns = {
+        "cityId": pa.array(df["cityId"].astype("int32")),
+        "cityName": pa.array(df["cityName"].astype(str)).dictionary_encode().cast(SCHEMA.field("cityName").type),
+        "bimonthly": pa.array(df["bimonthly"].astype("int8")),
+        **{metric: pa.array(df[metric].astype("float32")) for metric in METRICS},
+        "rankTop": rank_top,
+        "rankBottom": rank_bottom,
+    }
+    return pa.Table.from_pydict(columns, schema=SCHEMA)
+
+
+class IndicatorStore:
+    """Parquet particionado por ano, com ingestão incremental e consulta filtrada."""
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, dataset: str = "indicators"):
+        self.path = os.path.join(root, dataset)
+
+    def _partition(self, year: int) -> str:
+        return os.path.join(self.path, f"year={year}")
+
+    def years(self) -> list[int]:
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(int(name.split("=", 1)[1]) for name in os.listdir(self.path) if name.startswith("year="))
+
+    def ingest(self, year: int, records: list[dict] | pd.DataFrame):
+        """Grava (ou substitui) a partição de ``year``; as demais não são tocadas."""
+        table = to_table(records)
+        partition = self._partition(year)
+        tmp = f"{partition}.{os.getpid()}.tmp"
+        os.makedirs(tmp, exist_ok=True)
+        pq.write_table(table, os.path.join(tmp, "part-0.parquet"), compression="zstd")
+        shutil.rmtree(partition, ignore_errors=True)
+        os.replace(tmp, partition)
+
+    def query(
+        self,
+        years: list[int] | None = None,
+        cities: list[int] | None = None,
+        rank_band: tuple[str, int] | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Linhas filtradas por ano, ``cityId`` e faixa de ranking.
+
+        ``rank_band`` é ``("top", N)``, ``("bottom", N)`` ou ``("both", N)``
+        (o recorte do endpoint ``ranked``). Só as colunas pedidas são lidas
+        do disco; o resultado usa ``pd.ArrowDtype`` sem cópia para NumPy.
+        """
+        if not self.years():
+            return pd.DataFrame(columns=columns or ["year", *SCHEMA.names])
+
+        dataset = ds.dataset(self.path, format="parquet", partitioning="hive")
+        expr = ds.scalar(True)
+        if years is not None:
+            expr &= ds.field("year").isin(list(years))
+        if cities is not None:
+            expr &= ds.field("cityId").isin(list(cities))
+        if rank_band is not None:
+            side, n = rank_band
+            top, bottom = ds.field("rankTop") <= n, ds.field("rankBottom") <= n
+            expr &= {"top": top, "bottom": bottom, "both": top | bottom}[side]
+
+        table = dataset.to_table(columns=columns, filter=expr)
+        if "cityId" in table.column_names:
+            index = table.column_names.index("cityId")
+            table = table.set_column(index, "cityId", table.column(index).dictionary_encode())
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
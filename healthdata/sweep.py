@@ -0,0 +1,261 @@
+"""Varredura de cenários de redistribuição: grade de rank × teto × política × ano.
+
+``grid`` expande a grade e descarta cenários repetidos; ``run_sweep``
+executa os que ainda não estão no checkpoint e devolve uma tabela com uma
+linha por cenário (médias antes/depois de Top e Bottom, excedente cortado,
+repassado e retido).
+
+Há dois modos:
+
+- ``local``: busca uma vez os indicadores de cada ano e simula com
+  ``redistribution.redistribute``. Os cenários de um mesmo ``(ano, rank)``
+  compartilham o recorte Top/Bottom e vão juntos para um processo do pool;
+- ``api``: um POST ``/ranked/redistributed`` por ``(ano, rank)``, com
+  concorrência limitada (``fetch_all``). O servidor só aceita o rank, então
+  teto e política ficam como ``None``/``"server"``.
+
+Cada cenário concluído é acrescentado ao checkpoint (JSON lines) junto com
+o hash dos dados do ano; ao retomar, só os cenários que faltam (ou cujos
+dados mudaram) são recalculados.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from healthdata.client import DeaClient
+from healthdata.fetch import FetchJob, fetch_all
+from healthdata.manifest import frame_hash
+from healthdata.ranking import top_bottom_ids
+from healthdata.redistribution import POLICIES, redistribute
+
+SWEEP_DIR = "resources/sweep"
+MODES = ("local", "api")
+SERVER_POLICY = "server"
+# colunas lidas de cada ano no modo local
+SWEEP_COLUMNS = ("cityId", "bimonthly", "efficiency")
+
+
+@dataclass(frozen=True, order=True)
+class Scenario:
+    """Uma célula da grade. ``cap=None`` com ``policy="server"`` = regra do servidor."""
+
+    year: int
+    rank: int
+    cap: float | None = 1.0
+    policy: str = "equal"
+
+
+def grid(
+    years: list[int],
+    ranks: list[int],
+    caps: list[float] | None = None,
+    policies: list[str] | None = None,
+    mode: str = "local",
+) -> list[Scenario]:
+    """Produto cartesiano da grade, sem repetições e em ordem."""
+    if mode not in MODES:
+        raise ValueError(f"Modo de varredura desconhecido: {mode!r} (use {MODES})")
+    if mode == "api":
+        return sorted({Scenario(year, rank, None, SERVER_POLICY) for year, rank in product(years, ranks)})
+    policies = policies or ["equal"]
+    unknown = [policy for policy in policies if policy not in POLICIES]
+    if unknown:
+        raise ValueError(f"Políticas de redistribuição desconhecidas: {unknown} (use {', '.join(POLICIES)})")
+    # arredonda o teto para que 0.9 e 0.9000000001 (de um ``arange``) sejam o mesmo cenário
+    caps = [round(float(cap), 6) for cap in caps or [1.0]]
+    return sorted({Scenario(*cell) for cell in product(years, ranks, caps, policies)})
+
+
+def scenario_metrics(
+    before: np.ndarray, after: np.ndarray, top: np.ndarray, bottom: np.ndarray, cap: float | None
+) -> dict[str, float]:
+    """Resumo de um cenário a partir das eficiências alinhadas antes/depois e das máscaras."""
+    cut = float(np.sum(before[top] - after[top]))
+    transferred = float(np.sum(after[bottom] - before[bottom]))
+    return {
+        "top_rows": int(top.sum()),
+        "bottom_rows": int(bottom.sum()),
+        "top_before": float(before[top].mean()) if top.any() else np.nan,
+        "top_after": float(after[top].mean()) if top.any() else np.nan,
+        "bottom_before": float(before[bottom].mean()) if bottom.any() else np.nan,
+        "bottom_after": float(after[bottom].mean()) if bottom.any() else np.nan,
+        "bottom_gain": transferred / bottom.sum() if bottom.any() else np.nan,
+        "bottom_at_cap": float(np.mean(after[bottom] >= cap - 1e-9)) if bottom.any() and cap is not None else np.nan,
+        "surplus": cut,
+        "transferred": transferred,
+        "retained": cut - transferred,
+    }
+
+
+def _ranked_masks(df: pd.DataFrame, rank: int) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """Linhas Top/Bottom de ``rank`` e as máscaras (Bottom sem as cidades que também são Top)."""
+    top_ids, bottom_ids = top_bottom_ids(df, rank)
+    ranked = df[df["cityId"].isin(np.union1d(top_ids, bottom_ids))].reset_index(drop=True)
+    top = ranked["cityId"].isin(top_ids).to_numpy()
+    bottom = ranked["cityId"].isin(bottom_ids).to_numpy() & ~top
+    return ranked, top, bottom
+
+
+def _simulate(df: pd.DataFrame, scenarios: list[Scenario]) -> list[dict]:
+    """Roda no worker os cenários de um mesmo ``(ano, rank)``."""
+    ranked, top, bottom = _ranked_masks(df, scenarios[0].rank)
+    before = ranked["efficiency"].to_numpy(dtype=float)
+    rows = []
+    for scenario in scenarios:
+        adjusted = redistribute(ranked, top, bottom, scenario.cap, scenario.policy, by="bimonthly", city_col="cityId")
+        after = adjusted["efficiency"].to_numpy(dtype=float)
+        rows.append({**asdict(scenario), **scenario_metrics(before, after, top, bottom, scenario.cap)})
+    return rows
+
+
+def _server_metrics(real: pd.DataFrame, redistributed: pd.DataFrame, scenario: Scenario) -> dict:
+    """Métricas de um POST ``/ranked/redistributed`` contra o ``ranked`` do mesmo ano e rank."""
+    ranked, top, bottom = _ranked_masks(real, scenario.rank)
+    merged = ranked.merge(
+        redistributed[["cityId", "bimonthly", "efficiency"]], on=["cityId", "bimonthly"], how="left",
+        suffixes=("", "_redis"),
+    )
+    before = merged["efficiency"].to_numpy(dtype=float)
+    after = merged["efficiency_redis"].fillna(merged["efficiency"]).to_numpy(dtype=float)
+    return {**asdict(scenario), **scenario_metrics(before, after, top, bottom, None)}
+
+
+class Checkpoint:
+    """Cenários concluídos em JSON lines, válidos enquanto o hash dos dados do ano não mudar."""
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self.rows: dict[tuple, dict] = {}
+        if path is None:
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        row = json.loads(line)
+                        self.rows[self._key(row)] = row
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _key(row: dict) -> tuple:
+        return row["year"], row["rank"], row["cap"], row["policy"], row["input"]
+
+    def get(self, scenario: Scenario, input_hash: str) -> dict | None:
+        return self.rows.get((*asdict(scenario).values(), input_hash))
+
+    def append(self, rows: list[dict]):
+        for row in rows:
+            self.rows[self._key(row)] = row
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=float) + "\n")
+
+
+def _load_years(client: DeaClient, years: list[int], concurrency: int | None) -> dict[int, pd.DataFrame]:
+    jobs = {year: FetchJob("first_semester", year, variant="frame", columns=SWEEP_COLUMNS) for year in years}
+    results, _ = fetch_all(client, list(jobs.values()), concurrency)
+    return {year: results[job] for year, job in jobs.items() if job in results}
+
+
+def _run_local(frames, pending, hashes, checkpoint, processes):
+    by_cell: dict[tuple[int, int], list[Scenario]] = {}
+    for scenario in pending:
+        by_cell.setdefault((scenario.year, scenario.rank), []).append(scenario)
+
+    def done(rows):
+        checkpoint.append([{**row, "input": hashes[row["year"]]} for row in rows])
+
+    processes = min(processes or os.cpu_count() or 1, len(by_cell))
+    if processes <= 1:
+        for (year, _), scenarios in by_cell.items():
+            done(_simulate(frames[year], scenarios))
+        return
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {pool.submit(_simulate, frames[cell[0]], scenarios): cell for cell, scenarios in by_cell.items()}
+        for future in as_completed(futures):
+            year, rank = futures[future]
+            try:
+                done(future.result())
+            except Exception as e:
+                print(f"[sweep year={year} rank={rank}] Erro: {e}")
+
+
+def _run_api(client, pending, concurrency, checkpoint, hashes):
+    jobs = {}
+    for scenario in pending:
+        jobs[scenario] = (
+            FetchJob("ranked", scenario.year, scenario.rank, "frame"),
+            FetchJob("ranked_redistributed", scenario.year, scenario.rank, "frame"),
+        )
+    results, _ = fetch_all(client, [job for pair in jobs.values() for job in pair], concurrency)
+    for scenario, (real_job, redis_job) in jobs.items():
+        if real_job in results and redis_job in results:
+            row = _server_metrics(results[real_job], results[redis_job], scenario)
+            checkpoint.append([{**row, "input": hashes.get(scenario.year, "")}])
+
+
+def run_sweep(
+    scenarios: list[Scenario],
+    client: DeaClient | None = None,
+    mode: str = "local",
+    processes: int | None = None,
+    concurrency: int | None = None,
+    checkpoint: str | None = None,
+) -> pd.DataFrame:
+    """Executa os cenários que faltam no ``checkpoint`` e devolve a tabela de resultados.
+
+    ``processes`` limita o pool do modo local (``1`` = sem pool) e
+    ``concurrency`` as requisições simultâneas.
+    """
+    client = client or DeaClient()
+    scenarios = sorted(set(scenarios))
+    years = sorted({scenario.year for scenario in scenarios})
+    store = Checkpoint(checkpoint)
+
+    if mode == "local":
+        frames = _load_years(client, years, concurrency)
+        hashes = {year: frame_hash(df) for year, df in frames.items()}
+        scenarios = [scenario for scenario in scenarios if scenario.year in frames]
+    elif mode == "api":
+        # sem dados locais para hashear: no modo api o checkpoint vale até ser apagado
+        hashes = {}
+    else:
+        raise ValueError(f"Modo de varredura desconhecido: {mode!r} (use {MODES})")
+
+    pending = [scenario for scenario in scenarios if store.get(scenario, hashes.get(scenario.year, "")) is None]
+    print(f"{len(scenarios)} cenários, {len(scenarios) - len(pending)} já no checkpoint.")
+    if pending and mode == "local":
+        _run_local(frames, pending, hashes, store, processes)
+    elif pending:
+        _run_api(client, pending, concurrency, store, hashes)
+
+    rows = [store.get(scenario, hashes.get(scenario.year, "")) for scenario in scenarios]
+    table = pd.DataFrame([row for row in rows if row is not None])
+    return table.drop(columns="input", errors="ignore")
+
+
+def save_results(table: pd.DataFrame, directory: str = SWEEP_DIR, plots: bool = True) -> list[str]:
+    """Grava ``sweep.csv`` e os gráficos-resumo em ``directory``; devolve os arquivos."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "sweep.csv")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    table.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    written = [path]
+    if plots and not table.empty:
+        from healthdata.charts import plot_sweep
+
+        for metric in ("bottom_gain", "retained"):
+            filename = os.path.join(directory, f"sweep_{metric}.png")
+            plot_sweep(table, metric, filename)
+            written.append(filename)
+    return written
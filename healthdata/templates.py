@@ -0,0 +1,129 @@
+"""Modelos de figura reaproveitados entre anos, como o ``maps.MapRenderer``.
+
+Eixos, grade, ticks, rótulos e um pool fixo de ``Line2D`` são criados uma
+vez por processo; cada ano só atualiza as linhas com ``set_data`` e refaz
+as legendas Top/Bottom a partir do ranking explícito de
+``ranking.top_bottom_ids`` (a ordem alfabética do ``groupby`` não diz quem
+está no topo).
+"""
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from healthdata import output
+from healthdata.ranking import top_bottom_ids
+
+# slot da legenda -> (loc, bbox_to_anchor)
+LEGEND_SLOTS = {
+    "Top": ("upper left", (1.02, 1)),
+    "Bottom": ("lower left", (1.02, 0)),
+}
+
+_templates: dict[tuple, "RankedFigure"] = {}
+
+
+class RankedPanel:
+    """Um eixo Top/Bottom: ``2 * rank`` linhas pré-criadas e os dois slots de legenda."""
+
+    def __init__(self, ax, rank: int, title: str, legend_title: str, ylim: tuple[float, float] | None = None,
+                 **legend_kwargs):
+        self.ax = ax
+        self.rank = rank
+        self.title_format = title
+        self.legend_title = legend_title
+        self.legend_kwargs = legend_kwargs
+        self.ylim = ylim
+        self.lines = [ax.plot([], [], marker="o", linewidth=1, color=f"C{i}")[0] for i in range(2 * rank)]
+        self.legends: list = []
+
+        ax.set_xlabel("Bimestre")
+        ax.set_ylabel("Eficiência")
+        ax.grid(True)
+        ax.set_xticks([1, 2, 3])
+        if ylim is not None:
+            ax.set_ylim(*ylim)
+        self.title = ax.set_title("")
+
+    def update(self, df: pd.DataFrame, year: int):
+        """Mostra as cidades ranqueadas de ``df``, com as legendas na ordem do ranking."""
+        top, bottom = top_bottom_ids(df, self.rank)
+        bottom = bottom[~np.isin(bottom, top)]  # com poucas cidades, os recortes se sobrepõem
+        cities = {cid: city for cid, city in df.sort_values("bimonthly").groupby("cityId")}
+
+        ranked = [("Top", cid) for cid in top] + [("Bottom", cid) for cid in bottom]
+        slots: dict[str, list] = {slot: [] for slot in LEGEND_SLOTS}
+        for line, (slot, cid) in zip(self.lines, ranked):
+            city = cities[cid]
+            line.set_data(city["bimonthly"].to_numpy(), city["efficiency"].to_numpy())
+            line.set_label(city["cityName"].iloc[0])
+            line.set_visible(True)
+            slots[slot].append(line)
+        for line in self.lines[len(ranked):]:
+            line.set_data([], [])
+            line.set_visible(False)
+
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view(scaley=self.ylim is None)
+        self.title.set_text(self.title_format.format(year=year))
+
+        for legend in self.legends:
+            legend.remove()
+        self.legends = []
+        for slot, (loc, anchor) in LEGEND_SLOTS.items():
+            # ``ax.legend`` troca a legenda anterior do eixo; ela é mantida como artista
+            if self.ax.get_legend() is not None:
+                self.ax.add_artist(self.ax.get_legend())
+            legend = self.ax.legend(
+                slots[slot], [line.get_label() for line in slots[slot]],
+                title=self.legend_title.format(slot=slot, rank=self.rank, year=year),
+                loc=loc, bbox_to_anchor=anchor, **self.legend_kwargs,
+            )
+            self.legends.append(legend)
+
+
+class RankedFigure:
+    """Figura com um ou mais ``RankedPanel`` (um por ano), fora do pyplot."""
+
+    def __init__(self, rank: int, shape: tuple[int, int], figsize: tuple[float, float],
+                 layout_rect: tuple[float, ...] | None = None, right: float | None = None,
+                 savefig_kwargs: dict | None = None, **panel_kwargs):
+        self.fig = Figure(figsize=figsize)
+        axes = np.atleast_1d(self.fig.subplots(*shape)).flatten()
+        self.panels = [RankedPanel(ax, rank, **panel_kwargs) for ax in axes]
+        self.layout_rect = layout_rect
+        self.right = right
+        self.savefig_kwargs = savefig_kwargs or {}
+
+    def render(self, frames: dict[int, pd.DataFrame], filename: str):
+        for i, panel in enumerate(self.panels):
+            panel.ax.set_visible(i < len(frames))
+        for panel, (year, df) in zip(self.panels, frames.items()):
+            panel.update(df, year)
+        self.fig.tight_layout(rect=self.layout_rect)
+        if self.right is not None:
+            self.fig.subplots_adjust(right=self.right)
+        output.save(self.fig, filename, **self.savefig_kwargs)
+
+
+def ranked_figure(rank: int) -> RankedFigure:
+    """Modelo de ``charts.plot_ranked`` (um ano) reaproveitado no processo."""
+    key = ("ranked", rank)
+    if key not in _templates:
+        _templates[key] = RankedFigure(
+            rank, (1, 1), (10, 8), right=0.75,
+            title="Eficiência por Cidade ao longo dos Bimestres - 1º Semestre {year}",
+            legend_title="{slot} {rank}", ylim=(0, 1), fontsize=10, title_fontsize=12,
+        )
+    return _templates[key]
+
+
+def ranked_panels(rank: int) -> RankedFigure:
+    """Modelo 2x2 de ``charts.plot_ranked_all`` reaproveitado no processo."""
+    key = ("ranked-all", rank)
+    if key not in _templates:
+        _templates[key] = RankedFigure(
+            rank, (2, 2), (18, 12), layout_rect=(0, 0, 0.85, 1), savefig_kwargs={"bbox_inches": "tight"},
+            title="Eficiência por Cidade - 1º Semestre {year}",
+            legend_title="{slot} {rank} ({year})", fontsize=8, title_fontsize=10, frameon=True,
+        )
+    return _templates[key]
@@ -0,0 +1,238 @@
+"""Malha municipal para mapas web: TopoJSON quantizado e, opcionalmente, vector tiles.
+
+A topologia (fronteiras compartilhadas viram um único arco, simplificado
+uma vez para os dois lados, sem abrir buracos entre municípios) é montada
+com o pacote ``topojson`` a partir de resources/data/pe.json e gravada em
+``.cache/healthdata/topology`` com o hash do GeoJSON, a tolerância e a
+quantização no nome. Cada ano só troca as propriedades das geometrias
+(eficiência média do semestre e de cada bimestre) antes de gravar um
+``municipios_<ano>.topo.json`` compacto.
+
+Com ``mapbox_vector_tile`` instalado, ``write_tiles`` grava também uma
+pirâmide ``<z>/<x>/<y>.pbf`` por ano.
+"""
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from healthdata.export import EXPORT_DIR
+from healthdata.geometry import GEOJSON_FILE, GEOMETRY_CACHE_DIR, file_hash, load_geometry, match_codes
+
+WEBMAP_DIR = os.path.join(EXPORT_DIR, "webmap")
+TOPOLOGY_CACHE_DIR = os.path.join(os.path.dirname(GEOMETRY_CACHE_DIR), "topology")
+WEBMAP_COLUMNS = ("cityId", "bimonthly", "efficiency")
+OBJECT_NAME = "municipios"
+DEFAULT_TOLERANCE = 250.0  # metros
+DEFAULT_QUANTIZE = 30_000  # ~20 m por passo na extensão de Pernambuco
+METERS_PER_DEGREE = 111_320.0
+DECIMALS = 4
+# metade da largura do mundo em Web Mercator (EPSG:3857), em metros
+MERCATOR_ORIGIN = 20_037_508.342789244
+TILE_EXTENT = 4096
+
+_loaded: dict[str, dict] = {}
+
+
+def build_topology(path: str = GEOJSON_FILE, tolerance: float = DEFAULT_TOLERANCE,
+                   quantize: float = DEFAULT_QUANTIZE) -> dict:
+    """TopoJSON (dict) dos municípios com arcos compartilhados, quantizado e simplificado.
+
+    ``tolerance`` em metros é convertida para graus (aproximação de 1° ≈
+    111 km, suficiente na latitude de Pernambuco); ``0`` não simplifica.
+    Cada geometria leva ``id`` = código IBGE e a propriedade ``name``.
+    """
+    try:
+        import topojson
+    except ImportError:
+        raise RuntimeError("A exportação TopoJSON precisa do pacote 'topojson' (pip install topojson).") from None
+
+    geo_df = load_geometry(path)[["code", "name", "geometry"]]
+    topology = topojson.Topology(
+        geo_df,
+        prequantize=quantize,
+        toposimplify=tolerance / METERS_PER_DEGREE if tolerance else False,
+        object_name=OBJECT_NAME,
+    ).to_dict()
+    for geometry in topology["objects"][OBJECT_NAME]["geometries"]:
+        geometry["id"] = int(geometry["properties"]["code"])
+        geometry["properties"] = {"name": geometry["properties"]["name"]}
+    # ``transform`` vem com floats do NumPy
+    return json.loads(json.dumps(topology, default=float))
+
+
+def _store_path(path: str, digest: str, tolerance: float, quantize: float) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(TOPOLOGY_CACHE_DIR, f"{stem}-{digest[:16]}-{tolerance:g}-{quantize:g}.topo.json")
+
+
+def load_topology(path: str = GEOJSON_FILE, tolerance: float = DEFAULT_TOLERANCE,
+                  quantize: float = DEFAULT_QUANTIZE) -> dict:
+    """Topologia do cache em memória, do disco ou montada do GeoJSON (refeita se o hash mudar)."""
+    store = _store_path(path, file_hash(path), tolerance, quantize)
+    if store in _loaded:
+        return _loaded[store]
+
+    if os.path.exists(store):
+        with open(store, encoding="utf-8") as f:
+            topology = json.load(f)
+    else:
+        topology = build_topology(path, tolerance, quantize)
+        os.makedirs(TOPOLOGY_CACHE_DIR, exist_ok=True)
+        write_json(topology, store)
+
+    _loaded[store] = topology
+    return topology
+
+
+def write_json(data, path: str):
+    """JSON compacto (sem espaços, UTF-8) com escrita atômica."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+    os.replace(tmp, path)
+
+
+def attributes(codes: np.ndarray, df: pd.DataFrame) -> list[dict]:
+    """Propriedades de cada código IBGE de ``codes``, na mesma ordem: ``efficiency`` (média) e ``b1``…``bN`` por bimestre.
+
+    Valores ausentes viram ``null``; os números são arredondados em ``DECIMALS`` casas.
+    """
+    ids = df["cityId"].astype("int64")
+    keys = match_codes(pd.DataFrame({"code": codes}), ids)
+    by_bimester = df.pivot_table(index="cityId", columns="bimonthly", values="efficiency", aggfunc="mean")
+    table = pd.DataFrame({"efficiency": df.groupby("cityId")["efficiency"].mean()})
+    for bimester in by_bimester.columns:
+        table[f"b{int(bimester)}"] = by_bimester[bimester]
+    table = table.reindex(keys).round(DECIMALS).astype(object)
+    table = table.where(table.notna(), None)
+    return table.to_dict("records")
+
+
+def year_topology(topology: dict, df: pd.DataFrame) -> dict:
+    """Cópia rasa de ``topology`` com as propriedades de ``df`` (arcos compartilhados, não copiados)."""
+    geometries = topology["objects"][OBJECT_NAME]["geometries"]
+    codes = np.array([geometry["id"] for geometry in geometries], dtype=np.int64)
+    properties = attributes(codes, df)
+    return {
+        **topology,
+        "objects": {OBJECT_NAME: {
+            **topology["objects"][OBJECT_NAME],
+            "geometries": [
+                {**geometry, "properties": {**geometry["properties"], **props}}
+                for geometry, props in zip(geometries, properties)
+            ],
+        }},
+    }
+
+
+def _tile(lon: float, lat: float, zoom: int) -> tuple[int, int]:
+    """Tile XYZ que contém ``(lon, lat)``."""
+    n = 2 ** zoom
+    x = int((lon + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def _tile_encoder():
+    try:
+        import mapbox_vector_tile
+    except ImportError:
+        raise RuntimeError(
+            "Os vector tiles precisam do pacote 'mapbox-vector-tile' (pip install mapbox-vector-tile)."
+        ) from None
+    return mapbox_vector_tile
+
+
+def write_tiles(geo_df, properties: list[dict], directory: str, min_zoom: int = 0, max_zoom: int = 8) -> int:
+    """Grava a pirâmide ``<z>/<x>/<y>.pbf`` (Mapbox Vector Tiles) e devolve quantos tiles gravou.
+
+    Em cada zoom a geometria é simplificada em um pixel do tile e só os
+    municípios que o ``STRtree`` aponta como vizinhos do tile são recortados.
+    """
+    mapbox_vector_tile = _tile_encoder()
+    import shapely
+
+    mercator = np.asarray(geo_df.geometry.to_crs("EPSG:3857"))
+    tree = shapely.STRtree(mercator)
+    # o encoder não aceita propriedades nulas
+    properties = [{key: value for key, value in props.items() if value is not None} for props in properties]
+    min_lon, min_lat, max_lon, max_lat = geo_df.to_crs("EPSG:4326").total_bounds
+
+    written = 0
+    for zoom in range(min_zoom, max_zoom + 1):
+        size = 2 * MERCATOR_ORIGIN / 2 ** zoom
+        simplified = shapely.simplify(mercator, size / TILE_EXTENT, preserve_topology=True)
+        (x0, y0), (x1, y1) = _tile(min_lon, max_lat, zoom), _tile(max_lon, min_lat, zoom)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                bounds = (-MERCATOR_ORIGIN + x * size, MERCATOR_ORIGIN - (y + 1) * size,
+                          -MERCATOR_ORIGIN + (x + 1) * size, MERCATOR_ORIGIN - y * size)
+                hits = tree.query(shapely.box(*bounds))
+                if not len(hits):
+                    continue
+                margin = size / 64  # evita traços de recorte nas bordas do tile
+                clipped = shapely.clip_by_rect(simplified[hits], bounds[0] - margin, bounds[1] - margin,
+                                               bounds[2] + margin, bounds[3] + margin)
+                features = [
+                    {"geometry": geometry, "properties": properties[i]}
+                    for i, geometry in zip(hits, clipped) if not geometry.is_empty
+                ]
+                if not features:
+                    continue
+                tile = mapbox_vector_tile.encode(
+                    [{"name": OBJECT_NAME, "features": features}],
+                    default_options={"quantize_bounds": bounds, "extents": TILE_EXTENT},
+                )
+                path = os.path.join(directory, str(zoom), str(x), f"{y}.pbf")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(tile)
+                os.replace(tmp, path)
+                written += 1
+    return written
+
+
+def load_frames(client=None, years: list[int] = (), concurrency: int | None = None) -> dict[int, pd.DataFrame]:
+    """Eficiência por bimestre (``cityId``, ``bimonthly``, ``efficiency``) de cada ano."""
+    from healthdata.client import DeaClient
+    from healthdata.fetch import FetchJob, fetch_all
+
+    jobs = {year: FetchJob("first_semester", year, variant="frame", columns=WEBMAP_COLUMNS) for year in years}
+    results, _ = fetch_all(client or DeaClient(), list(jobs.values()), concurrency)
+    return {year: results[job] for year, job in jobs.items() if job in results}
+
+
+def export_webmap(
+    years: list[int],
+    tolerance: float = DEFAULT_TOLERANCE,
+    quantize: float = DEFAULT_QUANTIZE,
+    directory: str = WEBMAP_DIR,
+    tiles: bool = False,
+    max_zoom: int = 8,
+    client=None,
+) -> dict[int, str]:
+    """Grava ``municipios_<ano>.topo.json`` (e os tiles, se pedidos) de cada ano; devolve ``{ano: arquivo}``."""
+    if tiles:
+        _tile_encoder()  # falha antes de gravar qualquer ano
+    topology = load_topology(GEOJSON_FILE, tolerance, quantize)
+    frames = load_frames(client, years)
+    geo_df = load_geometry() if tiles else None
+    os.makedirs(directory, exist_ok=True)
+    written = {}
+    for year, df in frames.items():
+        data = year_topology(topology, df)
+        path = os.path.join(directory, f"{OBJECT_NAME}_{year}.topo.json")
+        write_json(data, path)
+        written[year] = path
+        print(f"Dados salvos em {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+        if tiles:
+            properties = attributes(geo_df["code"].to_numpy(dtype=np.int64), df)
+            for props, code, name in zip(properties, geo_df["code"], geo_df["name"]):
+                props.update(code=int(code), name=name)
+            count = write_tiles(geo_df, properties, os.path.join(directory, "tiles", str(year)), max_zoom=max_zoom)
+            print(f"{count} tiles salvos em {os.path.join(directory, 'tiles', str(year))}")
+    return written
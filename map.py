@@ -1,55 +1,10 @@
-import os
-import requests
-import geopandas as gpd
-import pandas as pd
-import matplotlib.pyplot as plt
+"""Atalho para ``python -m healthdata render --charts map --rank map=200``."""
+import sys
 
-YEAR = [2021, 2022, 2023, 2024]
-BASE_URL_EFF = "http://localhost:8080/api/dea/indicators/first-semester/ranked?year={year}&rank=200"
-BASE_URL_CITY = "http://localhost:8080/api/city"
-GEOJSON_FILE = "resources/data/pe.json"
-OUTPUT_FILE = "resources/map/"
+from healthdata import pipeline
 
-os.makedirs("resources/map", exist_ok=True)
+YEARS = [2021, 2022, 2023, 2024]
+RANK = 200
 
-for year in YEAR:
-    print("Buscando lista de cidades...")
-    resp_cities = requests.get(BASE_URL_CITY.format(year=year))
-    resp_cities.raise_for_status()
-    city_map = {str(c["id"]): c["name"].upper() for c in resp_cities.json()}
-
-    print(f"Consultando dados de eficiência do ano {YEAR}...")
-    resp_eff = requests.get(BASE_URL_EFF.format(year=year))
-    resp_eff.raise_for_status()
-    eff_data = resp_eff.json()
-    df_eff = pd.DataFrame(eff_data)
-
-    df_eff["cityId"] = df_eff["cityId"].astype(str)
-    df_eff["cityName"] = df_eff["cityId"].map(city_map)
-    df_eff["cityName"] = df_eff["cityName"].str.upper()
-
-    geo_df = gpd.read_file(GEOJSON_FILE)
-    geo_df["name"] = geo_df["name"].str.upper()
-
-    merged = geo_df.merge(df_eff, left_on="name", right_on="cityName")
-
-    fig, ax = plt.subplots(1, 1, figsize=(12, 10))
-    merged.plot(
-        column="efficiency",
-        cmap="RdYlGn",
-        linewidth=0.8,
-        ax=ax,
-        edgecolor="0.8",
-        legend=True,
-        legend_kwds={"label": "Eficiência DEA", "shrink": 0.6},
-        vmin=0,
-        vmax=1
-    )
-
-    ax.set_title(f"Mapa Temático de Eficiência por Município - {YEAR}", fontsize=14)
-    ax.axis("off")
-
-    plt.tight_layout()
-    filename = os.path.join(OUTPUT_FILE, f"map_{year}.png")
-    plt.savefig(filename, dpi=300)
-    print(f"✅ Mapa salvo em {OUTPUT_FILE}")
+errors = pipeline.run(pipeline.plan(["map"], YEARS, {"map": RANK}))
+sys.exit(1 if errors else 0)
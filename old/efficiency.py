@@ -1,30 +1,23 @@
 import os
+import sys
 
-import requests
-import pandas as pd
 import matplotlib.pyplot as plt
 
-for year in range(2021, 2025):
-    url = f"http://localhost:8080/api/efficiency/{year}"
-    response = requests.get(url)
-
-    if response.status_code != 200:
-        print(f"Erro ao buscar dados de {year}: {response.status_code}")
-        continue
+# Permite importar o pacote healthdata ao rodar o script de dentro de old/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from healthdata.client import DeaClient  # noqa: E402
+from healthdata.legacy import flatten  # noqa: E402
 
-    data = response.json()
+client = DeaClient()
 
-    rows = []
-    for city in data:
-        city_name = city['city']['name']
-        for efficiency in city['efficiencies']:
-            rows.append({
-                'city': city_name,
-                'month': efficiency['month'],
-                'efficiency': efficiency['efficiency']
-            })
+for year in range(2021, 2025):
+    try:
+        payload = client.legacy_efficiency(year)
+    except Exception as e:
+        print(f"Erro ao buscar dados de {year}: {e}")
+        continue
 
-    df = pd.DataFrame(rows)
+    df = flatten(payload)
 
     plt.clf()
 
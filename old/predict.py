@@ -1,58 +1,23 @@
 import os
-import requests
-import pandas as pd
+import sys
 import matplotlib.pyplot as plt
 
-def redistribuir_eficiencia(original_df, top_cities, down_cities, max_efficiency=1.0):
-    df_novo = original_df.copy()
+# Permite importar o pacote healthdata ao rodar o script de dentro de old/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from healthdata.client import DeaClient  # noqa: E402
+from healthdata.legacy import flatten  # noqa: E402
+from healthdata.redistribution import redistribute  # noqa: E402
 
-    for month in range(1, 13):
-        month_mask = df_novo['month'] == month
-        top_mask = df_novo['city'].isin(top_cities) & month_mask
-        down_mask = df_novo['city'].isin(down_cities) & month_mask
-
-        top_month = df_novo[top_mask]
-        down_month = df_novo[down_mask]
-
-        top_month = top_month.copy()
-        top_month['excedente'] = (top_month['efficiency'] - max_efficiency).clip(lower=0)
-        total_excedente = top_month['excedente'].sum()
-
-        for idx, row in top_month.iterrows():
-            nova = min(row['efficiency'], max_efficiency)
-            df_novo.at[idx, 'efficiency'] = nova
-
-        if not down_month.empty and total_excedente > 0:
-            ganho_por_cidade = total_excedente / len(down_month)
-            for idx, row in down_month.iterrows():
-                nova = row['efficiency'] + ganho_por_cidade
-                df_novo.at[idx, 'efficiency'] = nova
-
-    return df_novo
+client = DeaClient()
 
 for year in range(2021, 2025):
-    url = f"http://localhost:8080/api/efficiency/ranked/{year}"
-    response = requests.get(url)
-
-    if response.status_code != 200:
-        print(f"Erro ao buscar dados de {year}: {response.status_code}")
+    try:
+        payload = client.legacy_ranked(year)
+    except Exception as e:
+        print(f"Erro ao buscar dados de {year}: {e}")
         continue
 
-    ranked_data = response.json()
-    rows = []
-
-    for group in ['top', 'down']:
-        for city_data in ranked_data.get(group, []):
-            city_name = city_data['city']['name']
-            for efficiency in city_data['efficiencies']:
-                rows.append({
-                    'city': city_name,
-                    'month': efficiency['month'],
-                    'efficiency': efficiency['efficiency'],
-                    'group': group
-                })
-
-    df = pd.DataFrame(rows)
+    df = flatten(payload)
     top_cities = df[df['group'] == 'top']['city'].unique()
     down_cities = df[df['group'] == 'down']['city'].unique()
 
@@ -70,7 +35,7 @@ for year in range(2021, 2025):
     plt.savefig(f"resources/predictions/original_efficiency_{year}.png")
     plt.close()
 
-    df_ajustado = redistribuir_eficiencia(df, top_cities, down_cities, max_efficiency=1.0)
+    df_ajustado = redistribute(df, top_cities, down_cities, max_efficiency=1.0)
 
     plt.figure(figsize=(12, 6))
     for city, group_df in df_ajustado.groupby('city'):
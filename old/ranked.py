@@ -1,32 +1,23 @@
 import os
+import sys
 
-import requests
-import pandas as pd
 import matplotlib.pyplot as plt
 
-for year in range(2021, 2025):
-    url = f"http://localhost:8080/api/efficiency/ranked/{year}"
-    response = requests.get(url)
+# Permite importar o pacote healthdata ao rodar o script de dentro de old/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from healthdata.client import DeaClient  # noqa: E402
+from healthdata.legacy import flatten  # noqa: E402
+
+client = DeaClient()
 
-    if response.status_code != 200:
-        print(f"Erro ao buscar dados de {year}: {response.status_code}")
+for year in range(2021, 2025):
+    try:
+        payload = client.legacy_ranked(year)
+    except Exception as e:
+        print(f"Erro ao buscar dados de {year}: {e}")
         continue
 
-    ranked_data = response.json()
-    rows = []
-
-    for group in ['top', 'down']:
-        for city_data in ranked_data.get(group, []):
-            city_name = city_data['city']['name']
-            for efficiency in city_data['efficiencies']:
-                rows.append({
-                    'city': city_name,
-                    'month': efficiency['month'],
-                    'efficiency': efficiency['efficiency'],
-                    'group': group
-                })
-
-    df = pd.DataFrame(rows)
+    df = flatten(payload)
 
     plt.figure(figsize=(10, 6))
     for city, group_df in df.groupby('city'):
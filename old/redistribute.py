@@ -1,62 +1,30 @@
 import os
-import requests
-import pandas as pd
+import sys
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
 
-def redistribute_efficiency(original_df, top_cities, bottom_cities, max_efficiency=1.0):
-    adjusted_df = original_df.copy()
-
-    for month in range(1, 13):
-        month_mask = adjusted_df['month'] == month
-        top_mask = adjusted_df['city'].isin(top_cities) & month_mask
-        bottom_mask = adjusted_df['city'].isin(bottom_cities) & month_mask
-
-        top_month = adjusted_df[top_mask].copy()
-        bottom_month = adjusted_df[bottom_mask]
-
-        top_month['surplus'] = (top_month['efficiency'] - max_efficiency).clip(lower=0)
-        total_surplus = top_month['surplus'].sum()
-
-        for idx, row in top_month.iterrows():
-            adjusted_df.at[idx, 'efficiency'] = min(row['efficiency'], max_efficiency)
-
-        if not bottom_month.empty and total_surplus > 0:
-            gain_per_city = total_surplus / len(bottom_month)
-            for idx, row in bottom_month.iterrows():
-                adjusted_df.at[idx, 'efficiency'] = row['efficiency'] + gain_per_city
-
-    return adjusted_df
+# Permite importar o pacote healthdata ao rodar o script de dentro de old/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from healthdata.client import DeaClient  # noqa: E402
+from healthdata.legacy import flatten  # noqa: E402
+from healthdata.redistribution import redistribute  # noqa: E402
 
 output_dir = "comparative"
 os.makedirs(output_dir, exist_ok=True)
 
-for year in range(2021, 2025):
-    url = f"http://localhost:8080/api/efficiency/ranked/{year}"
-    response = requests.get(url)
+client = DeaClient()
 
-    if response.status_code != 200:
-        print(f"Failed to fetch data for {year}: {response.status_code}")
+for year in range(2021, 2025):
+    try:
+        payload = client.legacy_ranked(year)
+    except Exception as e:
+        print(f"Failed to fetch data for {year}: {e}")
         continue
 
-    ranked_data = response.json()
-    records = []
-
-    for group in ['top', 'down']:
-        for city_data in ranked_data.get(group, []):
-            city_name = city_data['city']['name']
-            for efficiency in city_data['efficiencies']:
-                records.append({
-                    'city': city_name,
-                    'month': efficiency['month'],
-                    'efficiency': efficiency['efficiency'],
-                    'group': group
-                })
-
-    df_actual = pd.DataFrame(records)
+    df_actual = flatten(payload)
     top_cities = df_actual[df_actual['group'] == 'top']['city'].unique()
     bottom_cities = df_actual[df_actual['group'] == 'down']['city'].unique()
-    df_predicted = redistribute_efficiency(df_actual, top_cities, bottom_cities)
+    df_predicted = redistribute(df_actual, top_cities, bottom_cities)
 
     plt.figure(figsize=(12, 6))
     colors = plt.cm.tab10.colors
@@ -1,16 +1,12 @@
-import requests
 import pandas as pd
 import matplotlib.pyplot as plt
 
-# URL do endpoint
-url = "http://localhost:8080/api/dea/indicators/first-semester?year=2023"
+from healthdata.client import DeaClient
 
-# Fazendo a requisição GET
-response = requests.get(url)
-response.raise_for_status()  # lança erro se não for 200
+# Consulta o endpoint (lança erro se não for 200)
+data = DeaClient().first_semester(2023)
 
 # Converte JSON em DataFrame
-data = response.json()
 df = pd.DataFrame(data)
 
 # Exibe primeiras linhas no terminal (debug)
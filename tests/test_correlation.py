@@ -0,0 +1,44 @@
+"""Correlação em lote contra ``DataFrame.corr`` ano a ano, com e sem ausentes."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from healthdata.correlation import CORRELATION_COLS, METHODS, correlate
+
+
+def frames(missing: float, seed: int = 0) -> dict[int, pd.DataFrame]:
+    """Anos com número de linhas diferente, empates e uma fração ``missing`` de NaN."""
+    rng = np.random.default_rng(seed)
+    cols = list(CORRELATION_COLS)
+    result = {}
+    for year, rows in ((2021, 180), (2022, 150), (2023, 40)):
+        data = np.round(rng.normal(size=(rows, len(cols))), 1)
+        data[:, -1] += 0.5 * data[:, -2]
+        data[rng.random(data.shape) < missing] = np.nan
+        result[year] = pd.DataFrame(data, columns=cols)
+    return result
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("missing", [0.0, 0.1])
+def test_matches_dataframe_corr(method, missing):
+    data = frames(missing)
+    result = correlate(data, method=method)
+    for year, df in data.items():
+        np.testing.assert_allclose(result.matrix(year).to_numpy(), df.corr(method=method).to_numpy(), atol=1e-12)
+
+
+def test_single_missing_value_spearman():
+    data = frames(0.0)
+    data[2021].iloc[0, 0] = np.nan
+    result = correlate(data, method="spearman")
+    np.testing.assert_allclose(result.matrix(2021).to_numpy(), data[2021].corr("spearman").to_numpy(), atol=1e-12)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_resampling_with_missing_values(method):
+    result = correlate(frames(0.1), method=method, n_boot=200, n_perm=200, seed=0)
+    table = result.to_frame()
+    assert table[["ci_low", "ci_high", "p_values"]].notna().all().all()
+    assert (table["ci_low"] <= table["ci_high"]).all()
+    assert ((table["p_values"] > 0) & (table["p_values"] <= 1)).all()
@@ -0,0 +1,91 @@
+"""LPs em lote do solver DEA contra um ``linprog`` por DMU."""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import linprog
+
+from healthdata.dea import INPUTS, MODELS, ORIENTATIONS, OUTPUTS, dea_scores, efficiency, save_results, score_years, summary
+
+
+def reference(X, Y, model, orientation, super_efficiency) -> np.ndarray:
+    """Forma do envelopamento resolvida DMU a DMU, sem normalizar os dados."""
+    n = len(X)
+    scores = np.full(n, np.nan)
+    for o in range(n):
+        if orientation == "input":
+            c = np.r_[1.0, np.zeros(n)]
+            A_ub = np.vstack([np.column_stack([-X[o], X.T]), np.column_stack([np.zeros(Y.shape[1]), -Y.T])])
+            b_ub = np.r_[np.zeros(X.shape[1]), -Y[o]]
+        else:
+            c = np.r_[-1.0, np.zeros(n)]
+            A_ub = np.vstack([np.column_stack([np.zeros(X.shape[1]), X.T]), np.column_stack([Y[o], -Y.T])])
+            b_ub = np.r_[X[o], np.zeros(Y.shape[1])]
+        bounds = [(None, None)] + [(0, 0) if super_efficiency and j == o else (0, None) for j in range(n)]
+        A_eq, b_eq = (np.r_[0.0, np.ones(n)][None, :], [1.0]) if model == "bcc" else (None, None)
+        result = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=bounds, method="highs")
+        if result.status == 0:
+            scores[o] = result.x[0] if orientation == "input" else 1.0 / result.x[0]
+    return scores
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    return rng.uniform(1, 100, (40, 2)), rng.uniform(1, 5000, (40, 3))
+
+
+@pytest.mark.parametrize("model,orientation,super_efficiency",
+                         list(itertools.product(MODELS, ORIENTATIONS, (False, True))))
+def test_batched_matches_reference(data, model, orientation, super_efficiency):
+    X, Y = data
+    batched = efficiency(X, Y, model, orientation, super_efficiency, batch_size=16)
+    expected = reference(X, Y, model, orientation, super_efficiency)
+    np.testing.assert_array_equal(np.isnan(batched), np.isnan(expected))
+    np.testing.assert_allclose(batched, expected, rtol=1e-8, equal_nan=True)
+    if not super_efficiency:
+        assert np.nanmax(batched) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("orientation", ORIENTATIONS)
+def test_zero_column_is_not_scaled(data, orientation):
+    X, Y = data
+    zero = np.column_stack([Y, np.zeros(len(Y))])
+    np.testing.assert_allclose(efficiency(X, zero, orientation=orientation), efficiency(X, Y, orientation=orientation))
+
+
+def test_incomplete_dmus_are_nan_and_excluded(data):
+    X, Y = data
+    X = X.copy()
+    X[3, 1] = np.nan
+    scores = efficiency(X, Y, "bcc")
+    keep = np.arange(len(X)) != 3
+    assert np.isnan(scores[3])
+    np.testing.assert_allclose(scores[keep], efficiency(X[keep], Y[keep], "bcc"))
+
+
+def test_by_group_with_missing_group(data):
+    X, Y = data
+    df = pd.DataFrame(np.column_stack([X, Y]), columns=["apsPerCapita", "teamsDensity", "cobertura",
+                                                        "healthCareVisitsPerThousandReais", "productivity"])
+    df["bimonthly"] = np.repeat([1, 2], len(df) // 2)
+    df.loc[df["bimonthly"] == 2, "teamsDensity"] = np.nan
+    scores = dea_scores(df, by="bimonthly")
+    assert scores[df["bimonthly"] == 2].isna().all()
+    assert scores[df["bimonthly"] == 1].notna().all()
+
+
+def test_score_years_compares_with_api(data, tmp_path):
+    X, Y = data
+    df = pd.DataFrame(np.column_stack([X, Y]), columns=[*INPUTS, *OUTPUTS])
+    df["cityId"] = np.arange(len(df))
+    df["efficiency"] = efficiency(X, Y)
+    table = score_years({2022: df, 2023: df.assign(efficiency=df["efficiency"] / 2)})
+    assert table.columns[0] == "year" and len(table) == 2 * len(df)
+    rows = summary(table).set_index("year")
+    assert rows.loc[2022, "mae"] == pytest.approx(0.0, abs=1e-9)
+    assert rows.loc[2023, "mae"] > 0
+    assert rows.loc[2023, "spearman"] == pytest.approx(1.0)
+    assert save_results(table, str(tmp_path)) == [str(tmp_path / "dea.csv")]
+    assert len(pd.read_csv(tmp_path / "dea.csv")) == len(table)
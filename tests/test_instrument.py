@@ -0,0 +1,21 @@
+"""Eventos ``http`` por endpoint, contra a API falsa."""
+from benchmarks.fake_api import serve
+from healthdata import instrument
+from healthdata.cache import ResponseCache
+from healthdata.client import FIRST_SEMESTER_PATH, RANKED_PATH, DeaClient
+
+
+def test_http_events_carry_endpoint_and_bytes(tmp_path):
+    since = instrument.mark()
+    with serve(cities=20) as url:
+        cached = DeaClient(base_url=url, cache=ResponseCache(str(tmp_path)))
+        cached.first_semester(2021)
+        cached.ranked_frame(2021, 5)
+        DeaClient(base_url=url, cache=None).first_semester(2022)
+    requests = [event for event in instrument.events(since) if event["stage"] == "http"]
+
+    assert [event["endpoint"] for event in requests] == [FIRST_SEMESTER_PATH, RANKED_PATH, FIRST_SEMESTER_PATH]
+    assert all(event["status"] == 200 and event["bytes"] > 0 for event in requests)
+    report = instrument.summary(instrument.events(since))
+    endpoints = report.split("endpoint", 1)[1]
+    assert f"{FIRST_SEMESTER_PATH} " in endpoints and RANKED_PATH in endpoints
@@ -0,0 +1,99 @@
+"""Planejamento das buscas e manifesto de build."""
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+from healthdata.cache import ResponseCache
+from healthdata.client import RANKED_PATH, DeaClient
+from healthdata.fetch import FetchJob
+from healthdata import pipeline
+from healthdata.pipeline import Chart, ChartFunction, Dataset, load_datasets, plan_loads
+from healthdata.ranking import top_bottom
+from tests.test_correlation import frames as correlation_frames
+from tests.test_ranking import frame
+
+
+def _ranks(load_plan) -> list[int]:
+    return sorted(job.rank for job in load_plan.jobs.values())
+
+
+def test_plan_fetches_widest_requested_rank():
+    datasets = [Dataset("ranked", 2021, 10), Dataset("ranked", 2021, 50)]
+    assert _ranks(plan_loads(datasets)) == [50]
+    assert _ranks(plan_loads(datasets, derive_ranks=False)) == [10, 50]
+
+
+def test_plan_reuses_wider_cached_rank():
+    datasets = [Dataset("ranked", 2021, 10), Dataset("ranked", 2022, 10)]
+    load_plan = plan_loads(datasets, cached={2021: [5, 100, 200], 2022: [8]})
+    assert set(load_plan.jobs.values()) == {FetchJob("ranked", 2021, 100, "frame"), FetchJob("ranked", 2022, 10, "frame")}
+
+
+def offline_client(root, tables: dict[tuple[int, int], pd.DataFrame]) -> DeaClient:
+    """Cliente sem rede servindo ``tables[(ano, rank)]`` do cache como respostas ``ranked``."""
+    cache = ResponseCache(str(root), offline=True)
+    for (year, rank), df in tables.items():
+        params = {"year": year, "rank": rank}
+        cache.store_table(cache.key(RANKED_PATH, params), RANKED_PATH, params,
+                          lambda df=df: pa.Table.from_pandas(df, preserve_index=False), "fixture", None)
+    return DeaClient(base_url="http://127.0.0.1:9", cache=cache)
+
+
+def test_offline_rank_served_from_wider_cache_entry(tmp_path):
+    df = frame({city: (city * 37 % 100) / 100 for city in range(1, 101)})
+    client = offline_client(tmp_path, {(2021, 40): top_bottom(df, 40)})
+    assert client.cached_ranks(2021) == [40]
+    loaded = load_datasets(client, [Dataset("ranked", 2021, 10)])
+    expected = top_bottom(df, 10)
+    assert sorted(loaded[Dataset("ranked", 2021, 10)]["cityId"].unique()) == sorted(expected["cityId"].unique())
+
+
+def rendered(charts_to_render: list[Chart], client: DeaClient, capsys) -> str:
+    assert pipeline.run(charts_to_render, client, processes=1) == {}
+    return capsys.readouterr().out
+
+
+def test_template_edit_rerenders_charts(tmp_path, monkeypatch, capsys):
+    df = frame({city: (city * 37 % 100) / 100 for city in range(1, 41)})
+    df["cityName"] = "Cidade " + df["cityId"].astype(str)
+    client = offline_client(tmp_path / "cache", {(2021, 10): top_bottom(df, 10)})
+    chart = Chart("ranked", "resources/ranked/efficiency_2021.png", (Dataset("ranked", 2021, 10),),
+                  ChartFunction("plot_ranked"), {"year": 2021, "rank": 10})
+    monkeypatch.chdir(tmp_path)
+
+    assert "1 gráficos a renderizar" in rendered([chart], client, capsys)
+    assert "0 gráficos a renderizar" in rendered([chart], client, capsys)
+
+    original = pipeline._module_source
+    edited = original("healthdata.templates").replace("figsize", "figsize ", 1)
+    monkeypatch.setattr(pipeline, "_module_source",
+                        lambda name: edited if name == "healthdata.templates" else original(name))
+    assert "1 gráficos a renderizar" in rendered([chart], client, capsys)
+
+
+def test_correlation_chart_annotated_with_interval_and_significance(tmp_path, monkeypatch, capsys):
+    from healthdata import charts
+
+    df = correlation_frames(0.0)[2021]
+    df["cityId"] = range(len(df))
+    client = offline_client(tmp_path / "cache", {(2021, 10): df})
+    monkeypatch.chdir(tmp_path)
+    annotations = []
+    original = charts._correlation_annotations
+    monkeypatch.setattr(charts, "_correlation_annotations",
+                        lambda result, year: annotations.append(original(result, year)) or annotations[-1])
+
+    plain = pipeline.plan(["correlation"], [2021], {"correlation": 10})
+    assert "1 gráficos a renderizar" in rendered(plain, client, capsys)
+    assert annotations.pop() is True
+
+    annotated = pipeline.plan(["correlation"], [2021], {"correlation": 10}, n_boot=50, n_perm=50)
+    assert "1 gráficos a renderizar" in rendered(annotated, client, capsys)
+    text = annotations.pop()
+    assert all("\n[" in cell for cell in text.ravel())
+    assert any("*" in cell for cell in text.ravel())
+    assert "0 gráficos a renderizar" in rendered(annotated, client, capsys)
+    assert "1 gráficos a renderizar" in rendered(
+        pipeline.plan(["correlation"], [2021], {"correlation": 10}, n_boot=60, n_perm=50), client, capsys)
+    assert os.path.exists(annotated[0].output)
@@ -0,0 +1,59 @@
+"""Recortes Top-N/Bottom-N derivados localmente, com empates no limite."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.fake_api import FakeData
+from healthdata.ranking import top_bottom, top_bottom_ids
+
+
+def frame(means: dict[int, float]) -> pd.DataFrame:
+    """Três bimestres por cidade, com a média ``means[cityId]``."""
+    ids = np.repeat(list(means), 3)
+    offsets = np.tile([-0.1, 0.0, 0.1], len(means))
+    return pd.DataFrame({"cityId": ids, "bimonthly": np.tile([1, 2, 3], len(means)),
+                         "efficiency": np.repeat(list(means.values()), 3) + offsets})
+
+
+def test_ties_break_by_city_id():
+    df = frame({40: 0.9, 30: 0.5, 10: 0.5, 20: 0.5, 50: 0.1, 60: 0.1})
+    top, bottom = top_bottom_ids(df, 2)
+    assert top.tolist() == [40, 10]
+    assert bottom.tolist() == [50, 60]
+    top, bottom = top_bottom_ids(df, 4)
+    assert top.tolist() == [40, 10, 20, 30]
+    assert bottom.tolist() == [50, 60, 10, 20]
+
+
+def test_cities_without_mean_are_not_ranked():
+    df = frame({1: 0.9, 2: 0.2, 3: 0.5})
+    df.loc[df["cityId"] == 3, "efficiency"] = np.nan
+    top, bottom = top_bottom_ids(df, 5)
+    assert top.tolist() == [1, 2]
+    assert bottom.tolist() == [2, 1]
+
+
+def test_derived_keeps_all_bimesters():
+    df = frame({city: city / 100 for city in range(1, 41)})
+    derived = top_bottom(df, 5)
+    assert (derived.groupby("cityId").size() == 3).all()
+    assert sorted(derived["cityId"].unique()) == [1, 2, 3, 4, 5, 36, 37, 38, 39, 40]
+
+
+@pytest.mark.parametrize("rank", [1, 3, 7, 15, 30])
+def test_derived_from_wider_matches_direct(rank):
+    rng = np.random.default_rng(rank)
+    df = frame(dict(enumerate(rng.choice([0.2, 0.5, 0.8], 60), start=1000)))
+    assert top_bottom(top_bottom(df, 30), rank).equals(top_bottom(df, rank))
+
+
+@pytest.mark.parametrize("rank", [1, 5, 20, 60])
+def test_fake_api_uses_the_same_tie_break(rank):
+    data = FakeData(60)
+    values = data.indicators(2021)["efficiency"]
+    values[:] = np.repeat(np.random.default_rng(0).choice([0.25, 0.5, 0.75], 60), 3)  # muitos empates
+    df = pd.DataFrame(data.records(2021))
+    top, bottom = data.ranked_cities(2021, rank)
+    expected_top, expected_bottom = top_bottom_ids(df, rank)
+    assert data.ids[top].tolist() == expected_top.tolist()
+    assert data.ids[bottom].tolist() == expected_bottom.tolist()
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from healthdata.store import METRICS, SCHEMA, IndicatorStore, to_table
+
+
+def records(means: dict[int, float]) -> pd.DataFrame:
+    rows = [
+        {"cityId": city, "cityName": f"Cidade {city}", "bimonthly": bimonthly,
+         **{metric: 1.0 for metric in METRICS}, "efficiency": mean}
+        for city, mean in means.items()
+        for bimonthly in (1, 2)
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_city_without_efficiency_has_no_rank():
+    table = to_table(records({1: 0.9, 2: np.nan, 3: 0.5}))
+    assert table.schema == SCHEMA
+    assert table.column("rankTop").to_pylist() == [1, 1, None, None, 2, 2]
+    assert table.column("rankBottom").to_pylist() == [2, 2, None, None, 1, 1]
+
+
+def test_rank_band_skips_city_without_efficiency(tmp_path):
+    store = IndicatorStore(str(tmp_path))
+    store.ingest(2022, records({1: 0.9, 2: np.nan, 3: 0.5, 4: 0.7}))
+    for side in ("top", "bottom", "both"):
+        cities = store.query(rank_band=(side, 1), columns=["cityId"])["cityId"]
+        assert 2 not in set(cities.astype(int))
+    assert set(store.query(rank_band=("both", 1))["cityId"].astype(int)) == {1, 3}